@@ -4,28 +4,20 @@ import os
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app.monday_client import fetch_deals, fetch_work_orders, fetch_deals_columns, fetch_work_orders_columns
-from app.cleaner import clean_deals, clean_work_orders
+from app.snapshot import get_deals_snapshot, get_work_orders_snapshot, invalidate, preload
 from app.metrics import compute_deals_metrics, compute_work_orders_metrics, get_leadership_summary
-from app.llm import parse_intent, generate_summary, generate_leadership_summary
-from app.agent import run_agent
+from app.llm import parse_intent, stream_summary, stream_leadership_summary
+from app.lazy import lazy_import
+from app.tracing import trace
+from app.profiling import maybe_profiled
 
-# Cache expensive calls to avoid re-fetching on every Streamlit rerun
-@st.cache_data(ttl=300)
-def cached_fetch_deals():
-    return fetch_deals()
+# the agent (and LangChain behind it) loads on the first chat question
+agent = lazy_import('app.agent')
 
-@st.cache_data(ttl=300)
-def cached_fetch_deals_columns():
-    return fetch_deals_columns()
-
-@st.cache_data(ttl=300)
-def cached_fetch_work_orders():
-    return fetch_work_orders()
-
-@st.cache_data(ttl=300)
-def cached_fetch_work_orders_columns():
-    return fetch_work_orders_columns()
+# Board data comes from the process-wide snapshot cache, so every Streamlit
+# session (and the agent tools) share one TTL-bounded copy of each board.
+# On a fresh process the last persisted snapshot is served right away.
+preload()
 
 st.set_page_config(page_title="Monday.com BI Agent", page_icon="📊", layout="wide")
 
@@ -40,6 +32,9 @@ with st.sidebar:
     - **Dashboard** - Key metrics overview
     - **Chat** - Ask AI questions
     """)
+    if st.button("Refresh data"):
+        invalidate()
+    profile_next = st.checkbox("Profile questions", help="Save a cProfile and a sampled flamegraph profile of each question")
 
 tab1, tab2, tab3 = st.tabs(["📊 Data", "📈 Dashboard", "💬 Chat"])
 
@@ -47,12 +42,8 @@ with tab1:
     st.subheader("Data from Monday.com")
 
     try:
-        deals_raw = cached_fetch_deals()
-        wo_raw = cached_fetch_work_orders()
-        deals_cols = cached_fetch_deals_columns()
-        wo_cols = cached_fetch_work_orders_columns()
-        deals_list = clean_deals(deals_raw, deals_cols)
-        wo_list = clean_work_orders(wo_raw, wo_cols)
+        deals_list = get_deals_snapshot().cleaned
+        wo_list = get_work_orders_snapshot().cleaned
 
         col1, col2 = st.columns(2)
 
@@ -98,15 +89,9 @@ with tab2:
     st.subheader("Business Metrics")
 
     try:
-        deals_raw = cached_fetch_deals()
-        wo_raw = cached_fetch_work_orders()
-        deals_cols = cached_fetch_deals_columns()
-        wo_cols = cached_fetch_work_orders_columns()
-        deals_list = clean_deals(deals_raw, deals_cols)
-        wo_list = clean_work_orders(wo_raw, wo_cols)
-
-        deals_metrics = compute_deals_metrics(deals_list)
-        wo_metrics = compute_work_orders_metrics(wo_list)
+        # answered from the snapshots' aggregate cubes, not from row data
+        deals_metrics = compute_deals_metrics(get_deals_snapshot().cube)
+        wo_metrics = compute_work_orders_metrics(get_work_orders_snapshot().cube)
 
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -135,6 +120,26 @@ with tab2:
     except Exception as e:
         st.error(f"Error loading metrics: {str(e)}")
 
+def render_stream(stream):
+    """Write a streamed answer as it arrives; return the full text."""
+    st.write_stream(stream)
+    t = stream.timings()
+    if t.get('ttft_ms') is not None:
+        st.caption(f"First token after {t['ttft_ms']:.0f} ms, complete after {t['total_ms']:.0f} ms")
+    elif t.get('total_ms') is not None:
+        # no chunks (empty answer or an error)
+        st.caption(f"No answer text, complete after {t['total_ms']:.0f} ms")
+    return stream.text
+
+
+def render_timings(request_trace):
+    """Where the time of one question went, per stage."""
+    breakdown = request_trace.breakdown()
+    if breakdown:
+        with st.expander(f"Timing breakdown ({request_trace.total_ms():.0f} ms)"):
+            st.table(breakdown)
+
+
 with tab3:
     st.subheader("Ask a Question")
     
@@ -144,97 +149,105 @@ with tab3:
         if not question.strip():
             st.warning("Please ask a question")
         else:
-            with st.spinner("Thinking..."):
-                try:
-                    deals_raw = cached_fetch_deals()
-                    wo_raw = cached_fetch_work_orders()
-                    deals_cols = cached_fetch_deals_columns()
-                    wo_cols = cached_fetch_work_orders_columns()
-                    deals_list = clean_deals(deals_raw, deals_cols)
-                    wo_list = clean_work_orders(wo_raw, wo_cols)
+            profile = None
+            try:
+                with maybe_profiled(question, profile_next or None) as profile, st.spinner("Thinking..."), \
+                        trace() as request_trace:
+                    try:
+                        deals_snap = get_deals_snapshot()
+                        wo_snap = get_work_orders_snapshot()
                     
-                    st.info(f"Loaded: {len(deals_list)} deals, {len(wo_list)} work orders")
+                        st.info(f"Loaded: {len(deals_snap.df)} deals, {len(wo_snap.df)} work orders")
                     
-                    # Try the LangChain agent first (will call API tools as needed).
-                    try:
-                        agent_answer = run_agent(question)
-                        if agent_answer and not agent_answer.startswith('[agent error]'):
-                            st.success(agent_answer)
-                            st.stop()
-                    except Exception:
-                        # fallback to deterministic path below
-                        pass
-
-                    if any(word in question.lower() for word in ["summary", "leadership", "board"]):
-                        summary_data = get_leadership_summary(deals_list, wo_list)
-                        answer = generate_leadership_summary(summary_data)
-                    else:
-                        intent = parse_intent(question)
-                        st.write(f"**Intent detected:** {intent}")
-
-                        if "error" in intent:
-                            answer = intent["error"]
+                        # Try the LangChain agent first (will call API tools as needed).
+                        try:
+                            agent_answer = agent.run_agent(question, profile=False)
+                            if agent_answer and not agent_answer.startswith('[agent error]'):
+                                st.success(agent_answer)
+                                st.stop()
+                        except Exception:
+                            # fallback to deterministic path below
+                            pass
+
+                        streamed = False
+                        if any(word in question.lower() for word in ["summary", "leadership", "board"]):
+                            summary_data = get_leadership_summary(deals_snap.cube, wo_snap.cube)
+                            answer = render_stream(stream_leadership_summary(summary_data))
+                            streamed = True
                         else:
-                            board = intent.get("board", "deals")
-                            sector = intent.get("sector")
-                            metric = intent.get("metric")
-
-                            # handle columns question specially
-                            if metric == "columns":
-                                if board == "deals":
-                                    cols = cached_fetch_deals_columns()
-                                else:
-                                    cols = cached_fetch_work_orders_columns()
-                                col_names = [c.get('title') or c.get('name') or c.get('id') for c in cols]
-                                answer = f"Board has {len(col_names)} columns: {', '.join(col_names[:10])}{'...' if len(col_names)>10 else ''}"
-                                st.write(f"**Columns (sample):** {col_names[:10]}")
+                            intent = parse_intent(question)
+                            st.write(f"**Intent detected:** {intent}")
+
+                            if "error" in intent:
+                                answer = intent["error"]
                             else:
-                                answered = False
-                                # compute metrics for requested board
-                                if board == "deals":
-                                    full_deals_metrics = compute_deals_metrics(deals_list)
-                                    # normalize requested sector
-                                    sector_key = (sector or '')
-                                    sector_key = sector_key.lower().strip() if sector_key is not None else ''
-                                    no_filter_values = {"", None, "all", "none", "overall", "total", "any"}
-
-                                    # If user asked for 'all' or didn't specify sector, do not filter
-                                    if sector_key in no_filter_values:
-                                        metrics = full_deals_metrics
+                                board = intent.get("board", "deals")
+                                sector = intent.get("sector")
+                                metric = intent.get("metric")
+
+                                # handle columns question specially
+                                if metric == "columns":
+                                    if board == "deals":
+                                        cols = deals_snap.columns
                                     else:
-                                        by_sector = full_deals_metrics.get("by_sector", {})
-                                        # exact-only match on normalized sector keys
-                                        if sector_key in by_sector:
-                                            metrics = by_sector.get(sector_key)
+                                        cols = wo_snap.columns
+                                    col_names = [c.get('title') or c.get('name') or c.get('id') for c in cols]
+                                    answer = f"Board has {len(col_names)} columns: {', '.join(col_names[:10])}{'...' if len(col_names)>10 else ''}"
+                                    st.write(f"**Columns (sample):** {col_names[:10]}")
+                                else:
+                                    answered = False
+                                    # compute metrics for requested board
+                                    if board == "deals":
+                                        full_deals_metrics = compute_deals_metrics(deals_snap.cube)
+                                        # normalize requested sector
+                                        sector_key = (sector or '')
+                                        sector_key = sector_key.lower().strip() if sector_key is not None else ''
+                                        no_filter_values = {"", None, "all", "none", "overall", "total", "any"}
+
+                                        # If user asked for 'all' or didn't specify sector, do not filter
+                                        if sector_key in no_filter_values:
+                                            metrics = full_deals_metrics
                                         else:
-                                            # return available sector list (only true sector keys)
-                                            available = [k for k in by_sector.keys() if k and k != 'unknown']
-                                            if available:
-                                                answer = f"No data for sector '{sector}'. Available sectors: {', '.join(sorted(available)[:10])}"
+                                            by_sector = full_deals_metrics.get("by_sector", {})
+                                            # exact-only match on normalized sector keys
+                                            if sector_key in by_sector:
+                                                metrics = by_sector.get(sector_key)
                                             else:
-                                                answer = f"No sector data available."
-                                            st.info(answer)
-                                            answered = True
-                                            metrics = None
-                                else:
-                                    metrics = compute_work_orders_metrics(wo_list)
-
-                                if not answered:
-                                    st.write(f"**Metrics:** {metrics}")
-                                    # try deterministic fast answer first
-                                    from app.llm import answer_from_metrics
-                                    fast = answer_from_metrics(intent, metrics)
-                                    if fast:
-                                        answer = fast
+                                                # return available sector list (only true sector keys)
+                                                available = [k for k in by_sector.keys() if k and k != 'unknown']
+                                                if available:
+                                                    answer = f"No data for sector '{sector}'. Available sectors: {', '.join(sorted(available)[:10])}"
+                                                else:
+                                                    answer = f"No sector data available."
+                                                st.info(answer)
+                                                answered = True
+                                                metrics = None
                                     else:
-                                        answer = generate_summary(question, metrics)
-                                else:
-                                    # already prepared an informative answer (no sector data)
-                                    pass
+                                        metrics = compute_work_orders_metrics(wo_snap.cube)
+
+                                    if not answered:
+                                        st.write(f"**Metrics:** {metrics}")
+                                        # try deterministic fast answer first
+                                        from app.llm import answer_from_metrics
+                                        fast = answer_from_metrics(intent, metrics)
+                                        if fast:
+                                            answer = fast
+                                        else:
+                                            answer = render_stream(stream_summary(question, metrics))
+                                            streamed = True
+                                    else:
+                                        # already prepared an informative answer (no sector data)
+                                        pass
                     
-                    st.success(answer)
+                        if not streamed:
+                            st.success(answer)
                 
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
-                    import traceback
-                    st.write(traceback.format_exc())
+                    except Exception as e:
+                        st.error(f"Error: {str(e)}")
+                        import traceback
+                        st.write(traceback.format_exc())
+                    finally:
+                        render_timings(request_trace)
+            finally:
+                if profile is not None and profile.paths:
+                    st.caption(f"Profile saved: {', '.join(profile.paths.values())}")
@@ -1,58 +1,276 @@
+import contextvars
+import functools
 import json
+import logging
+import time
+from contextlib import contextmanager
 from typing import Any, Dict
-import pandas as pd
-
-# LangChain imports
-try:
-    from langchain.llms.base import LLM
-    from langchain.tools import Tool
-    from langchain.agents import initialize_agent, AgentType
-except Exception:
-    LLM = None
-    Tool = None
-    initialize_agent = None
-    AgentType = None
-
-from app.monday_client import fetch_deals, fetch_work_orders, fetch_deals_columns, fetch_work_orders_columns
-from app.llm import model as gemini_model, GEMINI_MODEL, GEMINI_API_KEY
-from app.cleaner import clean_deals, clean_work_orders
+
+from app.llm import get_model, GEMINI_MODEL
+from app.config import AGENT_PAGE_SIZE, AGENT_MAX_ROWS, AGENT_TOP_K, AGENT_OBSERVATION_TOKENS
+from app.cleaner import to_records
+from app.context_builder import build_context, estimate_tokens
 from app.metrics import compute_deals_metrics, compute_work_orders_metrics
+from app.snapshot import DEALS, WORK_ORDERS, get_snapshot
+from app import tracing
+from app.profiling import maybe_profiled
+
+logger = logging.getLogger(__name__)
+
+
+# -- per-run context ---------------------------------------------------------------
+
+class RunContext:
+    """State for one agent run: the board snapshots it reads and the results
+    of the tool calls it has made.
+
+    The first tool that needs a board pins its current snapshot; every later
+    tool in the run sees that same snapshot, even if the cache refreshes
+    meanwhile, so one multi-step answer is computed from one version of the
+    data. Tool results are memoized by (tool, arguments).
+    """
+
+    def __init__(self):
+        self.snapshots = {}
+        self.results = {}
+        # tool -> {'calls', 'hits', 'seconds'}
+        self.tool_stats = {}
+        self.started = time.perf_counter()
+
+    def snapshot(self, board):
+        snap = self.snapshots.get(board)
+        if snap is None:
+            snap = self.snapshots[board] = get_snapshot(board)
+        return snap
+
+    def call(self, name, fn, args, kwargs):
+        key = (name, json.dumps([args, kwargs], sort_keys=True, default=str))
+        stats = self.tool_stats.setdefault(name, {'calls': 0, 'hits': 0, 'seconds': 0.0})
+        stats['calls'] += 1
+        if key in self.results:
+            stats['hits'] += 1
+            return self.results[key]
+        start = time.perf_counter()
+        try:
+            with tracing.span(f'agent.tool.{name}'):
+                result = fn(*args, **kwargs)
+        finally:
+            stats['seconds'] += time.perf_counter() - start
+        self.results[key] = result
+        return result
+
+    def summary(self):
+        return {
+            'seconds': round(time.perf_counter() - self.started, 3),
+            'snapshots': {b: s.loaded_at for b, s in self.snapshots.items()},
+            'tools': {n: dict(st, seconds=round(st['seconds'], 4)) for n, st in self.tool_stats.items()},
+        }
+
+
+_run = contextvars.ContextVar('agent_run', default=None)
+
+
+def current_run():
+    """The RunContext of the agent run in progress, or None outside a run."""
+    return _run.get()
+
+
+@contextmanager
+def agent_run():
+    """Open a RunContext for the duration of the block and log its tool stats."""
+    ctx = RunContext()
+    token = _run.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _run.reset(token)
+        if ctx.tool_stats:
+            logger.info('agent run: %.3fs, tools %s', time.perf_counter() - ctx.started,
+                        ', '.join(f"{n}={st['calls']} calls/{st['hits']} hits/{st['seconds'] * 1000:.1f}ms"
+                                  for n, st in ctx.tool_stats.items()))
+
+
+def board_snapshot(board):
+    """The run's pinned snapshot of `board`, or the cached one outside a run."""
+    ctx = current_run()
+    return ctx.snapshot(board) if ctx is not None else get_snapshot(board)
+
+
+def get_deals_snapshot():
+    return board_snapshot(DEALS)
+
+
+def get_work_orders_snapshot():
+    return board_snapshot(WORK_ORDERS)
+
+
+def _tool(name, fn):
+    """`fn` as an agent tool: memoized per agent run (called directly outside a
+    run) and with its observation capped at AGENT_OBSERVATION_TOKENS."""
+    @functools.wraps(fn)
+    def tool(*args, **kwargs):
+        ctx = current_run()
+        if ctx is None:
+            return fit_observation(fn(*args, **kwargs))
+        return ctx.call(name, lambda *a, **kw: fit_observation(fn(*a, **kw)), args, kwargs)
+    return tool
+
+
+# -- observation shaping ---------------------------------------------------------------
+# Whatever a tool returns is pasted into the ReAct prompt, so row tools return
+# one projected page plus a summary of the whole result instead of every row.
+
+def _columns(fields, available):
+    """Requested columns that exist (in request order); all when none are given."""
+    available = list(available)
+    if not fields:
+        return available
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    wanted = [f.strip() for f in fields if f and f.strip() in available]
+    return wanted or available
+
+
+def _summarize(df, value=None, group=None, top_k=AGENT_TOP_K):
+    """Row count, total and top rows by `value`, and row counts by `group`."""
+    summary = {'row_count': len(df)}
+    if value in df.columns:
+        values = df[value].astype(float)
+        summary[f'total_{value}'] = float(values.sum())
+        shown = [c for c in ('name', value, group) if c and c in df.columns]
+        summary[f'top_by_{value}'] = to_records(df.loc[values.nlargest(top_k).index, shown])
+    if group in df.columns:
+        counts = df[group].fillna('unknown').value_counts()
+        summary[f'rows_by_{group}'] = {str(k): int(v) for k, v in counts.head(2 * top_k).items()}
+    return summary
+
+
+def _int_arg(value, default):
+    """`value` as an int, or `default` when it is missing or not an integer.
+
+    The ReAct agent passes its whole action input (free text, JSON, ...) as
+    the first argument, so tool arguments cannot be trusted to be numbers.
+    """
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(str(value).strip()))
+        except (TypeError, ValueError, OverflowError):
+            return default
+
+
+def rows_observation(df, limit=None, page=1, offset=None, fields=None, value=None, group=None):
+    """One page of `df` projected onto `fields`, with paging info.
+
+    `offset` wins over `page` (1-based, `limit` rows each). When the result
+    has more rows than the page, a summary of all of them (count, total and
+    top rows by `value`, counts by `group`) is included.
+    """
+    limit = max(1, min(_int_arg(limit, AGENT_PAGE_SIZE) or AGENT_PAGE_SIZE, AGENT_MAX_ROWS))
+    offset = _int_arg(offset, None)
+    start = max(0, offset) if offset is not None else max(0, (_int_arg(page, 1) - 1) * limit)
+    total = len(df)
+    rows = to_records(df.iloc[start:start + limit][_columns(fields, df.columns)])
+    result = {'total_rows': total, 'offset': start, 'returned': len(rows)}
+    if total > limit:
+        result['summary'] = _summarize(df, value, group)
+    result['rows'] = rows
+    result['next_offset'] = start + len(rows) if start + len(rows) < total else None
+    return result
+
+
+def fit_observation(result, budget=None):
+    """`result` cut down to about `budget` tokens of JSON.
+
+    Row pages drop rows from the end (the summary and `next_offset` stay, so
+    the agent can page on); anything else still too large is serialized and
+    cut off.
+    """
+    budget = budget or AGENT_OBSERVATION_TOKENS
+    text = json.dumps(result, default=str)
+    if estimate_tokens(text) <= budget:
+        return result
+    if isinstance(result, dict) and isinstance(result.get('rows'), list):
+        rows = result['rows']
+        while rows:
+            rows = rows[:len(rows) // 2]
+            end = result.get('offset', 0) + len(rows)
+            trimmed = dict(result, rows=rows, returned=len(rows), truncated=True,
+                           next_offset=end if end < result.get('total_rows', end) else None)
+            text = json.dumps(trimmed, default=str)
+            if estimate_tokens(text) <= budget:
+                return trimmed
+    return text[:budget * 4] + ' ...[truncated]'
 
 
 def get_context(limit: int = 20):
     """Module-level helper to build cleaned samples + metrics payload."""
-    deals = fetch_deals()
-    wo = fetch_work_orders()
-    deals_cols = fetch_deals_columns()
-    wo_cols = fetch_work_orders_columns()
-    cleaned_deals = clean_deals(deals, deals_cols)
-    cleaned_wo = clean_work_orders(wo, wo_cols)
-    deals_metrics = compute_deals_metrics(cleaned_deals)
-    wo_metrics = compute_work_orders_metrics(cleaned_wo)
+    deals = get_deals_snapshot()
+    wo = get_work_orders_snapshot()
+    deals_metrics = compute_deals_metrics(deals.cube)
+    wo_metrics = compute_work_orders_metrics(wo.cube)
 
     return {
-        "sample_deals": cleaned_deals[:limit],
-        "sample_work_orders": cleaned_wo[:limit],
-        "deals_columns": deals_cols,
-        "work_orders_columns": wo_cols,
+        "sample_deals": deals.cleaned[:limit].to_dicts(),
+        "sample_work_orders": wo.cleaned[:limit].to_dicts(),
+        "deals_columns": deals.columns,
+        "work_orders_columns": wo.columns,
         "deals_metrics": deals_metrics,
         "work_orders_metrics": wo_metrics,
     }
 
 
+def render_context(limit: int = 20, budget: int = None):
+    """`get_context` rendered by app.context_builder for a prompt: CSV samples
+    and metrics within `budget` tokens (a BuiltContext; `.text`, `.report()`)."""
+    ctx = get_context(limit=limit)
+    for key in ("deals_columns", "work_orders_columns"):
+        ctx[key] = [{"id": c.get("id"), "title": c.get("title"), "type": c.get("type")} for c in ctx[key] or []]
+    return build_context(ctx, budget)
+
+
 def get_deals_df():
-    """Return a pandas DataFrame of cleaned deals."""
-    deals = fetch_deals()
-    cols = fetch_deals_columns()
-    cleaned = clean_deals(deals, cols)
-    try:
-        df = pd.DataFrame(cleaned)
-    except Exception:
-        df = pd.DataFrame(cleaned)
-    return df
+    """Return a pandas DataFrame of cleaned deals (shared; do not mutate)."""
+    return get_deals_snapshot().df
 
 
-if LLM is not None:
+# -- LangChain (imported on first agent use) ----------------------------------------
+
+_langchain_names = None
+_llm_class = None
+
+
+def _langchain():
+    """(LLM, Tool, initialize_agent, AgentType, GenerationChunk) from LangChain,
+    imported on first call; None for whatever could not be imported."""
+    global _langchain_names
+    if _langchain_names is None:
+        try:
+            from langchain.llms.base import LLM
+            from langchain.tools import Tool
+            from langchain.agents import initialize_agent, AgentType
+        except Exception:
+            LLM = Tool = initialize_agent = AgentType = None
+        try:
+            from langchain.schema.output import GenerationChunk
+        except Exception:
+            GenerationChunk = None
+        _langchain_names = (LLM, Tool, initialize_agent, AgentType, GenerationChunk)
+    return _langchain_names
+
+
+def gemini_langchain_llm():
+    """The GeminiLangchainLLM class (defined once LangChain is imported), or None."""
+    global _llm_class
+    if _llm_class is not None:
+        return _llm_class
+    LLM, _, _, _, GenerationChunk = _langchain()
+    if LLM is None:
+        return None
+
     class GeminiLangchainLLM(LLM):
         """Minimal LangChain-compatible LLM wrapper around the existing Gemini model.
         This implements the small surface LangChain expects: `_call(prompt)` and
@@ -66,64 +284,68 @@ if LLM is not None:
         def _call(self, prompt: str, stop: Any = None) -> str:
             # Use the same `model` object configured in app.llm
             try:
-                resp = gemini_model.generate_content(prompt)
+                resp = get_model().generate_content(prompt)
                 return resp.text
             except Exception as e:
                 return f"[LLM error] {e}"
-else:
-    # LangChain not available; provide a stub run_agent to surface a clear error
-    def run_agent(question: str) -> str:
-        return "[agent error] LangChain not installed or failed to import"
+
+        def _stream(self, prompt: str, stop: Any = None, run_manager: Any = None, **kwargs: Any):
+            """Yield Gemini's answer chunk by chunk (LangChain's streaming hook)."""
+            if GenerationChunk is None:
+                yield from ()
+                return
+            try:
+                for part in get_model().generate_content(prompt, stream=True):
+                    chunk = GenerationChunk(text=part.text)
+                    if run_manager is not None:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+            except Exception as e:
+                yield GenerationChunk(text=f"[LLM error] {e}")
+
+    _llm_class = GeminiLangchainLLM
+    return _llm_class
 
 
 def _make_tools():
-    """Create LangChain Tool wrappers around mondayClient fetch functions.
+    """Create LangChain Tool wrappers around the shared board snapshots.
     Each tool returns a JSON-serializable structure.
     """
     tools = []
+    Tool = _langchain()[1]
 
-    def t_fetch_deals(limit: int = 50, page: int = 1, sector: str = None, **kwargs):
-        items = fetch_deals()
-        cols = fetch_deals_columns()
-        cleaned = clean_deals(items, cols)
+    def t_fetch_deals(limit: int = None, page: int = 1, sector: str = None, offset: int = None, fields: str = None, **kwargs):
+        df = get_deals_df()
         sk = (sector or '')
         if sk and sk.lower().strip() not in ("", "all", "none"):
-            sk = sk.lower().strip()
-            cleaned = [d for d in cleaned if d.get('sector') == sk]
-        return cleaned
-
-    def t_fetch_work_orders(limit: int = 50, page: int = 1, status: str = None, **kwargs):
-        items = fetch_work_orders()
-        cols = fetch_work_orders_columns()
-        cleaned = clean_work_orders(items, cols)
+            df = df[df['sector'] == sk.lower().strip()]
+        return rows_observation(df, limit, page, offset, fields, value='amount', group='sector')
+
+    def t_fetch_work_orders(limit: int = None, page: int = 1, status: str = None, offset: int = None, fields: str = None, **kwargs):
+        df = get_work_orders_snapshot().df
         if status:
-            st = status.lower().strip()
-            cleaned = [w for w in cleaned if w.get('status') and w.get('status').lower() == st]
-        return cleaned
+            df = df[df['status'].str.lower() == status.lower().strip()]
+        return rows_observation(df, limit, page, offset, fields, value='revenue', group='status')
 
     def t_fetch_deals_columns(**kwargs):
-        return fetch_deals_columns()
+        return get_deals_snapshot().columns
 
     def t_fetch_work_orders_columns(**kwargs):
-        return fetch_work_orders_columns()
+        return get_work_orders_snapshot().columns
 
     def t_compute_deals_metrics(**kwargs):
-        items = fetch_deals()
-        cols = fetch_deals_columns()
-        cleaned = clean_deals(items, cols)
-        return compute_deals_metrics(cleaned)
+        return compute_deals_metrics(get_deals_snapshot().cube)
 
     def t_compute_work_orders_metrics(**kwargs):
-        items = fetch_work_orders()
-        cols = fetch_work_orders_columns()
-        cleaned = clean_work_orders(items, cols)
-        return compute_work_orders_metrics(cleaned)
+        return compute_work_orders_metrics(get_work_orders_snapshot().cube)
 
     def t_capabilities(**kwargs):
         return {
             "capabilities": [
-                "fetch_deals(limit,page,sector)",
-                "fetch_work_orders(limit,page,status)",
+                "fetch_deals(limit,page|offset,fields,sector)",
+                "fetch_work_orders(limit,page|offset,fields,status)",
+                "fetch_deals_df(limit,page|offset,fields)",
+                "filter_deals(sector,min_amount,stage,limit,page|offset,fields)",
                 "fetch_deals_columns()",
                 "fetch_work_orders_columns()",
                 "compute_deals_metrics()",
@@ -134,38 +356,19 @@ def _make_tools():
 
     def t_get_context(limit: int = 20, **kwargs):
         """Return small context payload: sample rows, columns, and aggregated metrics."""
-        deals = fetch_deals()
-        wo = fetch_work_orders()
-        deals_cols = fetch_deals_columns()
-        wo_cols = fetch_work_orders_columns()
-        cleaned_deals = clean_deals(deals, deals_cols)
-        cleaned_wo = clean_work_orders(wo, wo_cols)
-        deals_metrics = compute_deals_metrics(cleaned_deals)
-        wo_metrics = compute_work_orders_metrics(cleaned_wo)
+        return render_context(limit=_int_arg(limit, 20)).text
 
-        return {
-            "sample_deals": cleaned_deals[:limit],
-            "sample_work_orders": cleaned_wo[:limit],
-            "deals_columns": deals_cols,
-            "work_orders_columns": wo_cols,
-            "deals_metrics": deals_metrics,
-            "work_orders_metrics": wo_metrics,
-        }
-
-    def t_fetch_deals_df(**kwargs):
-        """Return cleaned deals as a JSON-serializable list via pandas (records)."""
-        df = get_deals_df()
-        return df.to_dict(orient='records')
+    def t_fetch_deals_df(limit: int = None, page: int = 1, offset: int = None, fields: str = None, **kwargs):
+        """Return a page of cleaned deals as JSON records via pandas."""
+        return rows_observation(get_deals_df(), limit, page, offset, fields, value='amount', group='sector')
 
     def t_group_by_sector(**kwargs):
-        """Return pipeline sum and count grouped by sector using pandas."""
-        df = get_deals_df()
-        if df.empty or 'sector' not in df.columns or 'amount' not in df.columns:
-            return {}
-        gb = df.groupby('sector').agg({'amount': 'sum', 'name': 'count'}).reset_index()
-        return {row['sector']: {'pipeline': float(row['amount']), 'count': int(row['name'])} for _, row in gb.iterrows()}
+        """Return pipeline sum and count grouped by sector from the aggregate cube."""
+        by_sector = get_deals_snapshot().cube.rollup(('sector',))
+        return {k[0]: {'pipeline': float(v[0]), 'count': int(v[1])} for k, v in sorted(by_sector.items())}
 
-    def t_filter_deals(sector: str = None, min_amount: float = None, stage: str = None, **kwargs):
+    def t_filter_deals(sector: str = None, min_amount: float = None, stage: str = None, limit: int = None,
+                       page: int = 1, offset: int = None, fields: str = None, **kwargs):
         df = get_deals_df()
         if sector:
             df = df[df['sector'] == sector.lower().strip()]
@@ -173,23 +376,23 @@ def _make_tools():
             df = df[df['stage'].str.lower().str.contains(stage.lower().strip(), na=False)]
         if min_amount is not None:
             df = df[df['amount'].astype(float) >= float(min_amount)]
-        return df.to_dict(orient='records')
+        return rows_observation(df, limit, page, offset, fields, value='amount', group='stage')
 
     # Wrap as LangChain Tool objects if available; otherwise return callables
     if Tool is not None:
-        tools.append(Tool.from_function(t_fetch_deals, name="fetch_deals", description="Fetch deals items from Monday"))
-        tools.append(Tool.from_function(t_fetch_work_orders, name="fetch_work_orders", description="Fetch work orders from Monday"))
-        tools.append(Tool.from_function(t_fetch_deals_columns, name="fetch_deals_columns", description="Fetch deals board column metadata"))
-        tools.append(Tool.from_function(t_fetch_work_orders_columns, name="fetch_work_orders_columns", description="Fetch work orders board column metadata"))
-        tools.append(Tool.from_function(t_compute_deals_metrics, name="compute_deals_metrics", description="Compute deals metrics like pipeline and by_sector"))
-        tools.append(Tool.from_function(t_compute_work_orders_metrics, name="compute_work_orders_metrics", description="Compute work orders metrics like revenue and active_count"))
-        tools.append(Tool.from_function(t_capabilities, name="capabilities", description="Return agent capabilities and available tool names"))
-        tools.append(Tool.from_function(t_get_context, name="get_context", description="Return a small cleaned data + metrics context payload"))
-        tools.append(Tool.from_function(t_fetch_deals_df, name="fetch_deals_df", description="Return cleaned deals as JSON records via pandas"))
-        tools.append(Tool.from_function(t_group_by_sector, name="group_by_sector", description="Return pipeline and counts grouped by sector"))
-        tools.append(Tool.from_function(t_filter_deals, name="filter_deals", description="Filter deals by sector, min_amount, stage and return matching rows"))
+        tools.append(Tool.from_function(_tool("fetch_deals", t_fetch_deals), name="fetch_deals", description="Fetch a page of deals (limit, page or offset, fields, sector); large results include a summary"))
+        tools.append(Tool.from_function(_tool("fetch_work_orders", t_fetch_work_orders), name="fetch_work_orders", description="Fetch a page of work orders (limit, page or offset, fields, status); large results include a summary"))
+        tools.append(Tool.from_function(_tool("fetch_deals_columns", t_fetch_deals_columns), name="fetch_deals_columns", description="Fetch deals board column metadata"))
+        tools.append(Tool.from_function(_tool("fetch_work_orders_columns", t_fetch_work_orders_columns), name="fetch_work_orders_columns", description="Fetch work orders board column metadata"))
+        tools.append(Tool.from_function(_tool("compute_deals_metrics", t_compute_deals_metrics), name="compute_deals_metrics", description="Compute deals metrics like pipeline and by_sector"))
+        tools.append(Tool.from_function(_tool("compute_work_orders_metrics", t_compute_work_orders_metrics), name="compute_work_orders_metrics", description="Compute work orders metrics like revenue and active_count"))
+        tools.append(Tool.from_function(_tool("capabilities", t_capabilities), name="capabilities", description="Return agent capabilities and available tool names"))
+        tools.append(Tool.from_function(_tool("get_context", t_get_context), name="get_context", description="Return a small cleaned data + metrics context payload"))
+        tools.append(Tool.from_function(_tool("fetch_deals_df", t_fetch_deals_df), name="fetch_deals_df", description="Return a page of cleaned deals as JSON records (limit, page or offset, fields)"))
+        tools.append(Tool.from_function(_tool("group_by_sector", t_group_by_sector), name="group_by_sector", description="Return pipeline and counts grouped by sector"))
+        tools.append(Tool.from_function(_tool("filter_deals", t_filter_deals), name="filter_deals", description="Filter deals by sector, min_amount, stage and return a page of matching rows with a summary"))
     else:
-        tools = [t_fetch_deals, t_fetch_work_orders, t_fetch_deals_columns, t_fetch_work_orders_columns, t_compute_deals_metrics, t_compute_work_orders_metrics, t_capabilities, t_get_context, t_fetch_deals_df, t_group_by_sector, t_filter_deals]
+        tools = [_tool(f.__name__[2:], f) for f in (t_fetch_deals, t_fetch_work_orders, t_fetch_deals_columns, t_fetch_work_orders_columns, t_compute_deals_metrics, t_compute_work_orders_metrics, t_capabilities, t_get_context, t_fetch_deals_df, t_group_by_sector, t_filter_deals)]
 
     return tools
 
@@ -203,27 +406,27 @@ def _init_agent():
         return _agent_executor
 
     tools = _make_tools()
-    if initialize_agent is None or LLM is None:
+    _, _, initialize_agent, AgentType, _ = _langchain()
+    llm_class = gemini_langchain_llm()
+    if initialize_agent is None or llm_class is None:
         raise RuntimeError("LangChain is not installed or could not be imported")
 
-    llm = GeminiLangchainLLM()
+    llm = llm_class()
     _agent_executor = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=False)
     return _agent_executor
 
 
-def run_agent(question: str) -> str:
+def run_agent(question: str, profile=None) -> str:
     """Run the LangChain agent on the question. Returns the agent answer (string).
     The agent may call the provided tools to fetch data as needed.
+    `profile` (default PROFILE_REQUESTS) saves a profile of the run, see app.profiling.
     """
     # quick-help before initializing LangChain
     ql = (question or '').lower()
     # quick sector listing shortcut
     if ("sector" in ql or "sectors" in ql) and any(p in ql for p in ["list", "available", "show", "all"]):
         try:
-            items = fetch_deals()
-            cols = fetch_deals_columns()
-            cleaned = clean_deals(items, cols)
-            metrics = compute_deals_metrics(cleaned)
+            metrics = compute_deals_metrics(get_deals_snapshot().cube)
             available = [k for k in metrics.get('by_sector', {}).keys() if k and k != 'unknown']
             if not available:
                 return "No sectors available"
@@ -234,8 +437,7 @@ def run_agent(question: str) -> str:
     # quick context shortcut
     if any(p in ql for p in ["context", "show data", "show context", "data snapshot", "sample data"]):
         try:
-            ctx = get_context(limit=20)
-            return json.dumps(ctx, default=str, indent=2)
+            return render_context(limit=20).text
         except Exception as e:
             return f"[agent error] could not build context: {e}"
     if any(p in ql for p in ["what questions", "what can you", "help", "capabilities", "what do you know"]):
@@ -246,8 +448,11 @@ def run_agent(question: str) -> str:
         return json.dumps(caps, indent=2)
 
     try:
-        agent = _init_agent()
-        result = agent.run(question)
+        with maybe_profiled(question, profile):
+            agent = _init_agent()
+            # one pinned snapshot and one result per distinct tool call for the whole run
+            with agent_run(), tracing.span('agent.run'):
+                result = agent.run(question)
         return str(result)
     except Exception as e:
         return f"[agent error] {e}"
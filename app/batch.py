@@ -0,0 +1,159 @@
+"""Answer many questions against one snapshot.
+
+`answer_batch_async` loads both boards once, resolves every intent (rules and
+the intent cache first, the model only for the rest), computes metrics once
+per distinct intent and makes one model call per distinct answer, with at
+most `concurrency` model calls in flight. Results come back in question
+order, each with its own timings.
+"""
+import asyncio
+import time
+
+from app.config import BATCH_CONCURRENCY
+from app.snapshot import DEALS, WORK_ORDERS, get_snapshots_async
+from app.metrics import compute_deals_metrics, compute_work_orders_metrics, get_leadership_summary
+from app.llm import (
+    quick_intent,
+    parse_intent_async,
+    response_key,
+    generate_summary_async,
+    generate_leadership_summary_async,
+)
+
+LEADERSHIP_WORDS = ["summary", "leadership", "board"]
+
+
+def is_leadership_question(message):
+    question = message.lower()
+    return any(word in question for word in LEADERSHIP_WORDS)
+
+
+def metrics_key(intent):
+    """What the metrics for `intent` depend on: (board, sector)."""
+    board = intent.get("board", "deals")
+    return (board, intent.get("sector") if board == "deals" else None)
+
+
+def metrics_for_intent(intent, deals, wo):
+    board, sector = metrics_key(intent)
+    if board == "deals":
+        metrics = compute_deals_metrics(deals.cube)
+        if sector:
+            metrics = metrics.get("by_sector", {}).get(sector, {})
+    else:
+        metrics = compute_work_orders_metrics(wo.cube)
+    return metrics
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+async def answer_batch_async(questions, concurrency=BATCH_CONCURRENCY):
+    """Answer `questions` in order; see the module docstring.
+
+    Returns {"results": [...], "timings": {...}, "stats": {...}} where each
+    result is {question, answer, intent, intent_source, timings}.
+    `intent_source` is "leadership", "rules", "cache" or "model".
+    """
+    started = time.perf_counter()
+    deals, wo = await get_snapshots_async(DEALS, WORK_ORDERS)
+    snapshot_ms = _ms(time.perf_counter() - started)
+    limit = asyncio.Semaphore(max(1, int(concurrency or 1)))
+    results = [{"question": q, "answer": None, "intent": None, "intent_source": None, "timings": {}}
+               for q in questions]
+
+    # 1. intents; the model is asked only for what rules and cache can't resolve
+    t = time.perf_counter()
+    model_intents = 0
+
+    async def resolve(r):
+        nonlocal model_intents
+        t0 = time.perf_counter()
+        if is_leadership_question(r["question"]):
+            r["intent_source"] = "leadership"
+        else:
+            intent, source = quick_intent(r["question"])
+            if intent is None:
+                async with limit:
+                    model_intents += 1
+                    intent, source = await parse_intent_async(r["question"]), "model"
+            r["intent"], r["intent_source"] = intent, source
+        r["timings"]["intent_ms"] = _ms(time.perf_counter() - t0)
+
+    await asyncio.gather(*(resolve(r) for r in results))
+    intents_ms = _ms(time.perf_counter() - t)
+
+    # 2. metrics, once per distinct (board, sector)
+    t = time.perf_counter()
+    payloads = {}
+    pending = []
+    for r in results:
+        t0 = time.perf_counter()
+        intent = r["intent"]
+        if r["intent_source"] == "leadership":
+            key = ("leadership",)
+            if key not in payloads:
+                payloads[key] = get_leadership_summary(deals.cube, wo.cube)
+            kind = "leadership"
+        elif "error" in intent:
+            r["answer"] = intent["error"]
+            continue
+        else:
+            key = metrics_key(intent)
+            if key not in payloads:
+                payloads[key] = metrics_for_intent(intent, deals, wo)
+            kind = "summary"
+        r["timings"]["metrics_ms"] = _ms(time.perf_counter() - t0)
+        pending.append((r, kind, payloads[key]))
+    metrics_ms = _ms(time.perf_counter() - t)
+
+    # 3. answers, one model call per distinct response (the leadership summary
+    #    ignores the question, so every leadership question shares one call)
+    t = time.perf_counter()
+    calls = {}
+
+    async def generate(kind, question, payload):
+        async with limit:
+            t0 = time.perf_counter()
+            if kind == "leadership":
+                answer = await generate_leadership_summary_async(payload)
+            else:
+                answer = await generate_summary_async(question, payload)
+            return answer, _ms(time.perf_counter() - t0)
+
+    keys = []
+    for r, kind, payload in pending:
+        key = response_key(kind, "" if kind == "leadership" else r["question"], payload)
+        if key not in calls:
+            calls[key] = asyncio.ensure_future(generate(kind, r["question"], payload))
+        keys.append(key)
+    if calls:
+        await asyncio.gather(*calls.values())
+    for (r, _, _), key in zip(pending, keys):
+        r["answer"], r["timings"]["answer_ms"] = calls[key].result()
+    answers_ms = _ms(time.perf_counter() - t)
+
+    for r in results:
+        r["timings"]["total_ms"] = round(sum(r["timings"].values()), 1)
+    return {
+        "results": results,
+        "timings": {
+            "snapshot_ms": snapshot_ms,
+            "intents_ms": intents_ms,
+            "metrics_ms": metrics_ms,
+            "answers_ms": answers_ms,
+            "total_ms": _ms(time.perf_counter() - started),
+        },
+        "stats": {
+            "questions": len(results),
+            "model_intents": model_intents,
+            "distinct_metrics": len(payloads),
+            "distinct_answers": len(calls),
+        },
+    }
+
+
+def answer_batch(questions, concurrency=BATCH_CONCURRENCY):
+    """Blocking `answer_batch_async`, for scripts and notebooks."""
+    return asyncio.run(answer_batch_async(questions, concurrency))
@@ -0,0 +1,186 @@
+"""Small LRU + TTL cache with optional JSON persistence.
+
+Used in front of model calls (app.llm), where a hit saves a full Gemini
+round trip. Entries expire `ttl` seconds after they were stored; once
+`maxsize` entries are held the least recently used one is evicted. With a
+`path` the entries are written to a JSON file (atomically, like app.store)
+and read back when the cache is created, so they survive a restart. Writes
+are debounced: changes within `flush_interval` seconds share one write, made
+from a timer thread and at interpreter exit. Values must be JSON-serializable
+when a path is set.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.fileutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_VERSION = 1
+# seconds between a change and the write that persists it
+FLUSH_INTERVAL = 1.0
+
+
+class TTLCache:
+    def __init__(self, maxsize=512, ttl=3600, path=None, name='cache', flush_interval=FLUSH_INTERVAL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path or None
+        self.name = name
+        self.flush_interval = flush_interval
+        # key -> (expires_at, value); wall-clock times so they persist
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # held while writing the file, so writes never land out of order
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.path:
+            self._load()
+            atexit.register(self.flush)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[0] <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_any(self, keys, default=None):
+        """Return (key, value) for the first live key in `keys`, counted as a
+        single lookup; (None, default) when none is cached."""
+        with self._lock:
+            now = time.time()
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return key, entry[1]
+            self.misses += 1
+            return None, default
+
+    def peek(self, key, default=None):
+        """Like `get` but without touching counters or recency."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.time():
+                return default
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._changed()
+        self._flush_now()
+
+    def delete(self, key):
+        with self._lock:
+            found = self._data.pop(key, None) is not None
+            if found:
+                self._changed()
+        self._flush_now()
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._changed()
+        self._flush_now()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    # -- persistence ------------------------------------------------------------
+
+    def _changed(self):
+        """Schedule a write of the entries. Caller holds `_lock`."""
+        if not self.path:
+            return
+        self._dirty = True
+        if self._timer is None and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_now(self):
+        # without debouncing every change is written before returning
+        if self.flush_interval <= 0:
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to `path` now."""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = list(self._data.items())
+            self._save(entries)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                payload = json.load(f)
+            if payload.get('version') != CACHE_FILE_VERSION:
+                return
+            now = time.time()
+            for key, (expires_at, value) in payload.get('entries', []):
+                if expires_at > now:
+                    self._data[key] = (expires_at, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        except Exception as e:
+            logger.warning('could not read %s from %s: %s', self.name, self.path, e)
+
+    def _save(self, entries):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            payload = {'version': CACHE_FILE_VERSION, 'entries': [[k, list(v)] for k, v in entries]}
+
+            def write(p):
+                with open(p, 'w') as f:
+                    json.dump(payload, f, default=str)
+            atomic_write(os.path.abspath(self.path), write)
+        except Exception as e:
+            logger.warning('could not write %s to %s: %s', self.name, self.path, e)
@@ -1,6 +1,13 @@
+import hashlib
+import json
 import logging
+import threading
+import numpy as np
 import pandas as pd
 
+from app import tracing
+from app.records import RecordTable
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +46,56 @@ def find_col_id_by_keywords(id_to_title, keywords):
     return None
 
 
+# Keywords used to locate each logical field in a board's column titles. The
+# first column whose (lowercased) title contains any keyword wins.
+DEALS_FIELDS = (
+    ('amount', ('amount', 'value')),
+    # Only map sector when a column title explicitly contains these keywords
+    ('sector', ('sector', 'industry', 'vertical', 'segment')),
+    ('close', ('close',)),
+    # Stage/status only mapped when a column explicitly named 'stage' or 'status'
+    ('stage', ('stage', 'status')),
+)
+WORK_ORDERS_FIELDS = (
+    ('revenue', ('revenue',)),
+    ('status', ('status', 'state')),
+    ('start', ('start',)),
+    ('end', ('end',)),
+)
+
+_MAPPING_CACHE_SIZE = 64
+_mapping_cache = {}
+_mapping_lock = threading.Lock()
+
+
+def schema_hash(columns_meta):
+    """Stable hash of a board's column metadata (ids, titles, types, in order)."""
+    key = [
+        (str(c.get('id')), c.get('title') or c.get('name') or '', c.get('type') or '')
+        for c in columns_meta or []
+    ]
+    return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()[:16]
+
+
+def resolve_columns(columns_meta, fields):
+    """Return {field: column id or None} for `fields`, cached per schema hash.
+
+    The keyword scan only runs the first time a given schema is seen.
+    """
+    key = (schema_hash(columns_meta), fields)
+    mapping = _mapping_cache.get(key)
+    if mapping is not None:
+        return mapping
+    id_to_title = build_id_title_map(columns_meta)
+    mapping = {field: find_col_id_by_keywords(id_to_title, list(keywords)) for field, keywords in fields}
+    logger.debug('resolved column mapping for schema %s: %s (titles: %s)', key[0], mapping, id_to_title)
+    with _mapping_lock:
+        if len(_mapping_cache) >= _MAPPING_CACHE_SIZE:
+            _mapping_cache.clear()
+        _mapping_cache[key] = mapping
+    return mapping
+
+
 def safe_number(x):
     if x is None:
         return 0.0
@@ -59,22 +116,18 @@ def to_date(x):
         return pd.NaT
 
 
-def clean_deals(raw_items, columns_meta=None):
-    """Return list of dicts with keys: name, amount, sector, close_date, stage"""
+def clean_deals_rows(raw_items, columns_meta=None):
+    """Row-by-row reference cleaner (see `clean_deals`).
+
+    Return list of dicts with keys: name, amount, sector, close_date, stage"""
     if not raw_items:
         return []
 
-    id_to_title = build_id_title_map(columns_meta)
-    # Print column metadata once for verification
-    try:
-        print("[clean_deals] column id->title mapping:", id_to_title)
-    except Exception:
-        pass
-    amount_col = find_col_id_by_keywords(id_to_title, ['amount', 'value'])
-    # Only map sector when a column title explicitly contains these keywords
-    sector_col = find_col_id_by_keywords(id_to_title, ['sector', 'industry', 'vertical', 'segment'])
-    close_col = find_col_id_by_keywords(id_to_title, ['close'])
-    stage_col = find_col_id_by_keywords(id_to_title, ['stage', 'status'])
+    mapping = resolve_columns(columns_meta, DEALS_FIELDS)
+    amount_col = mapping['amount']
+    sector_col = mapping['sector']
+    close_col = mapping['close']
+    stage_col = mapping['stage']
 
     cleaned = []
     for item in raw_items:
@@ -105,16 +158,18 @@ def clean_deals(raw_items, columns_meta=None):
     return cleaned
 
 
-def clean_work_orders(raw_items, columns_meta=None):
-    """Return list of dicts with keys: name, revenue, status, start_date, end_date"""
+def clean_work_orders_rows(raw_items, columns_meta=None):
+    """Row-by-row reference cleaner (see `clean_work_orders`).
+
+    Return list of dicts with keys: name, revenue, status, start_date, end_date"""
     if not raw_items:
         return []
 
-    id_to_title = build_id_title_map(columns_meta)
-    revenue_col = find_col_id_by_keywords(id_to_title, ['revenue'])
-    status_col = find_col_id_by_keywords(id_to_title, ['status', 'state'])
-    start_col = find_col_id_by_keywords(id_to_title, ['start'])
-    end_col = find_col_id_by_keywords(id_to_title, ['end'])
+    mapping = resolve_columns(columns_meta, WORK_ORDERS_FIELDS)
+    revenue_col = mapping['revenue']
+    status_col = mapping['status']
+    start_col = mapping['start']
+    end_col = mapping['end']
 
     cleaned = []
     for item in raw_items:
@@ -136,3 +191,184 @@ def clean_work_orders(raw_items, columns_meta=None):
         except Exception as e:
             logger.exception('Error cleaning work order item: %s', e)
     return cleaned
+
+
+# --- columnar cleaning -------------------------------------------------------
+#
+# The functions below clean a whole board at once: one pass over the raw items
+# pulls the mapped column values into plain lists, then each column is parsed
+# with a single vectorized pandas call. They produce the same values as the
+# row-wise cleaners above, as a typed DataFrame.
+
+DEALS_COLUMNS = ['name', 'amount', 'sector', 'close_date', 'stage']
+WORK_ORDERS_COLUMNS = ['name', 'revenue', 'status', 'start_date', 'end_date']
+
+_DTYPES = {
+    'amount': 'float64',
+    'revenue': 'float64',
+    'close_date': 'datetime64[ns]',
+    'start_date': 'datetime64[ns]',
+    'end_date': 'datetime64[ns]',
+}
+
+
+def extract_columns(raw_items, col_ids):
+    """Return (item ids, names, {col_id: values}) for the given column ids.
+
+    Values follow `parse_item`: text first, then the raw value; missing
+    columns give None.
+    """
+    wanted = [cid for cid in col_ids if cid]
+    wanted_set = set(wanted)
+    ids = []
+    names = []
+    values = {cid: [] for cid in wanted}
+    for item in raw_items:
+        data = item if isinstance(item, dict) else item.to_dict() if hasattr(item, 'to_dict') else {}
+        row = {}
+        for cv in data.get('column_values') or []:
+            cid = cv.get('id') or cv.get('column', {}).get('id')
+            if cid not in wanted_set:
+                continue
+            val = cv.get('text')
+            if val is None:
+                val = cv.get('value')
+            row[cid] = val
+        for cid in wanted:
+            values[cid].append(row.get(cid))
+        name = item.get('name') if isinstance(item, dict) else getattr(item, 'name', '')
+        names.append(name or '')
+        item_id = data.get('id')
+        ids.append(str(item_id) if item_id is not None else None)
+    return ids, names, values
+
+
+def parse_numbers(values):
+    """Vectorized `safe_number`: strip '$' and ',' and parse; bad values -> 0.0."""
+    s = pd.Series(values, dtype=object)
+    text = s.fillna('').astype(str).str.replace(r'[$,]', '', regex=True).str.strip()
+    nums = pd.to_numeric(text, errors='coerce')
+    bad = nums.isna() & (text != '')
+    if bad.any():
+        logger.error('safe_number parse error for %d values, e.g. %r', int(bad.sum()), s[bad].iloc[0])
+    return nums.fillna(0.0).astype(np.float64)
+
+
+def parse_dates(values):
+    """Vectorized `to_date`: one ISO-8601 pass, then a per-value retry for the rest."""
+    s = pd.Series(values, dtype=object)
+    s = s.where(s.astype(bool), None)
+    try:
+        try:
+            out = pd.to_datetime(s, errors='coerce', format='ISO8601')
+        except (TypeError, ValueError):
+            # pandas < 2.0 has no format='ISO8601'
+            out = pd.to_datetime(s, errors='coerce')
+        missed = out.isna() & s.notna()
+        if missed.any():
+            out[missed] = pd.to_datetime(s[missed].map(to_date), errors='coerce')
+        return out
+    except Exception as e:
+        # e.g. mixed timezones; fall back to the row-wise parser
+        logger.error('vectorized date parse failed, parsing row by row: %s', e)
+        return s.map(to_date)
+
+
+def parse_labels(values, lower=False, default=''):
+    """Strip (and optionally lowercase) text labels; blanks become `default`."""
+    s = pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+    if lower:
+        s = s.str.lower()
+    if default:
+        s = s.mask(s == '', default)
+    return s
+
+
+def _empty_frame(columns):
+    df = pd.DataFrame({c: pd.Series(dtype=_DTYPES.get(c, object)) for c in columns})
+    df.index.name = 'id'
+    return df
+
+
+def _frame(ids, data, columns):
+    """Build a cleaned frame indexed by monday item id."""
+    df = pd.DataFrame(data, columns=columns)
+    df.index = pd.Index(ids, name='id', dtype=object)
+    return df
+
+
+@tracing.traced('clean.deals')
+def clean_deals_frame(raw_items, columns_meta=None):
+    """Columnar deals cleaner. Returns a DataFrame indexed by item id with
+    columns name, amount (float64), sector, close_date (datetime64), stage."""
+    tracing.add(rows=len(raw_items or []))
+    if not raw_items:
+        return _empty_frame(DEALS_COLUMNS)
+
+    mapping = resolve_columns(columns_meta, DEALS_FIELDS)
+    amount_col = mapping['amount']
+    sector_col = mapping['sector']
+    close_col = mapping['close']
+    stage_col = mapping['stage']
+
+    ids, names, cols = extract_columns(raw_items, [amount_col, sector_col, close_col, stage_col])
+    n = len(names)
+    missing = [None] * n
+    return _frame(ids, {
+        'name': names,
+        'amount': parse_numbers(cols.get(amount_col, missing)),
+        'sector': parse_labels(cols.get(sector_col, missing), lower=True, default='unknown'),
+        'close_date': parse_dates(cols.get(close_col, missing)),
+        'stage': parse_labels(cols.get(stage_col, missing)),
+    }, DEALS_COLUMNS)
+
+
+@tracing.traced('clean.work_orders')
+def clean_work_orders_frame(raw_items, columns_meta=None):
+    """Columnar work orders cleaner. Returns a DataFrame indexed by item id
+    with columns name, revenue (float64), status, start_date, end_date
+    (datetime64)."""
+    tracing.add(rows=len(raw_items or []))
+    if not raw_items:
+        return _empty_frame(WORK_ORDERS_COLUMNS)
+
+    mapping = resolve_columns(columns_meta, WORK_ORDERS_FIELDS)
+    revenue_col = mapping['revenue']
+    status_col = mapping['status']
+    start_col = mapping['start']
+    end_col = mapping['end']
+
+    ids, names, cols = extract_columns(raw_items, [revenue_col, status_col, start_col, end_col])
+    n = len(names)
+    missing = [None] * n
+    return _frame(ids, {
+        'name': names,
+        'revenue': parse_numbers(cols.get(revenue_col, missing)),
+        'status': parse_labels(cols.get(status_col, missing), lower=True),
+        'start_date': parse_dates(cols.get(start_col, missing)),
+        'end_date': parse_dates(cols.get(end_col, missing)),
+    }, WORK_ORDERS_COLUMNS)
+
+
+def to_records(df):
+    """Convert a cleaned frame to a list of plain dicts (JSON payloads)."""
+    if df is None or df.empty:
+        return []
+    return df.to_dict(orient='records')
+
+
+def to_record_table(df):
+    """Convert a cleaned frame to a compact RecordTable (see app.records)."""
+    if df is None:
+        return RecordTable({}, {})
+    return RecordTable.from_frame(df)
+
+
+def clean_deals(raw_items, columns_meta=None):
+    """Return records with keys: name, amount, sector, close_date, stage"""
+    return to_record_table(clean_deals_frame(raw_items, columns_meta))
+
+
+def clean_work_orders(raw_items, columns_meta=None):
+    """Return records with keys: name, revenue, status, start_date, end_date"""
+    return to_record_table(clean_work_orders_frame(raw_items, columns_meta))
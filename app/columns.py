@@ -0,0 +1,152 @@
+"""Column metadata registry.
+
+Column metadata is needed to map logical fields (amount, sector, ...) to
+board column ids, but it almost never changes. The registry keeps the
+metadata per board together with its schema hash and only goes back to
+monday.com when:
+
+- the long TTL (`COLUMNS_TTL_SECONDS`) has passed, or
+- item payloads no longer match the cached schema: an item carries a column
+  id the metadata does not know, or a mapped column is missing from it.
+  (With a projected fetch items only carry the mapped columns, so only the
+  second check applies; new columns are picked up at the TTL.)
+
+Mappings themselves are cached per schema hash in `app.cleaner.resolve_columns`,
+so a refetch that returns the same schema does not redo the keyword scan.
+"""
+import logging
+import threading
+import time
+
+from app.config import COLUMNS_TTL_SECONDS
+from app.monday_client import fetch_columns_by_board
+from app.transport import MondayError
+from app.cleaner import schema_hash, resolve_columns
+
+logger = logging.getLogger(__name__)
+
+# Don't refetch more than once per this many seconds because of payload drift,
+# in case a board legitimately keeps a mapped column empty on some items.
+DRIFT_REFETCH_INTERVAL = 60
+
+# columns that appear in metadata but never as item column_values
+_NON_VALUE_COLUMNS = {'name'}
+
+# Column types whose `text` can be empty while `value` holds the data; a
+# projection that maps one of these also asks for `value`.
+_VALUE_TYPES = {'mirror', 'lookup', 'board_relation', 'dependency', 'formula'}
+
+
+def column_projection(columns_meta, fields):
+    """Return (mapped column ids, needs value) for a projected item fetch.
+
+    The ids are the columns `fields` resolve to on this schema, in field
+    order; needs value is True when one of them is of a type in
+    `_VALUE_TYPES`.
+    """
+    mapping = resolve_columns(columns_meta, fields)
+    ids = []
+    for cid in mapping.values():
+        if cid and cid not in ids:
+            ids.append(cid)
+    types = {str(c.get('id')): c.get('type') for c in columns_meta or []}
+    return tuple(ids), any(types.get(cid) in _VALUE_TYPES for cid in ids)
+
+
+class BoardSchema:
+    def __init__(self, board_id, columns, fetched_at=None):
+        self.board_id = board_id
+        self.columns = columns
+        self.hash = schema_hash(columns)
+        self.column_ids = {str(c.get('id')) for c in columns if c.get('id')}
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+
+def _payload_column_ids(items):
+    """Column ids present on the first item that has any column values."""
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        cvs = item.get('column_values') or []
+        if cvs:
+            return {cv.get('id') or cv.get('column', {}).get('id') for cv in cvs}
+    return None
+
+
+class ColumnRegistry:
+    def __init__(self, ttl=COLUMNS_TTL_SECONDS, fetcher=fetch_columns_by_board):
+        self.ttl = ttl
+        self.fetcher = fetcher
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def _drifted(self, schema, items, fields):
+        seen = _payload_column_ids(items)
+        if seen is None:
+            return False
+        unknown = seen - schema.column_ids - _NON_VALUE_COLUMNS
+        if unknown:
+            logger.info('board %s: item payload has unknown columns %s', schema.board_id, sorted(unknown))
+            return True
+        if fields:
+            mapped = {cid for cid in resolve_columns(schema.columns, fields).values() if cid}
+            missing = mapped - seen
+            if missing:
+                logger.info('board %s: mapped columns %s missing from items', schema.board_id, sorted(missing))
+                return True
+        return False
+
+    def schema(self, board_id, items=None, fields=None):
+        """Return the cached `BoardSchema`, refetching when stale or drifted.
+
+        Pass the board's raw `items` (and the cleaner's `fields`) to enable the
+        drift check; without them only the TTL applies.
+        """
+        with self._lock:
+            schema = self._schemas.get(board_id)
+            now = time.time()
+            if schema is not None:
+                age = now - schema.fetched_at
+                if age < self.ttl:
+                    if age < DRIFT_REFETCH_INTERVAL or not self._drifted(schema, items, fields):
+                        return schema
+            try:
+                columns = self.fetcher(board_id)
+            except MondayError as e:
+                if schema is None:
+                    raise
+                # keep the old schema on a failed fetch rather than unmapping everything
+                logger.warning('board %s: column refetch failed, keeping cached schema: %s', board_id, e)
+                schema.fetched_at = now
+                return schema
+            if not columns and schema is not None:
+                schema.fetched_at = now
+                return schema
+            new = BoardSchema(board_id, columns, fetched_at=now)
+            if schema is not None and new.hash != schema.hash:
+                logger.info('board %s: column schema changed (%s -> %s)', board_id, schema.hash, new.hash)
+            self._schemas[board_id] = new
+            return new
+
+    def columns(self, board_id, items=None, fields=None):
+        return self.schema(board_id, items=items, fields=fields).columns
+
+    def mapping(self, board_id, fields, items=None):
+        """Return {field: column id} for a board, resolved once per schema version."""
+        return resolve_columns(self.schema(board_id, items=items, fields=fields).columns, fields)
+
+    def seed(self, board_id, columns, fetched_at=None):
+        """Install known column metadata (e.g. from the snapshot store)."""
+        with self._lock:
+            if board_id not in self._schemas and columns:
+                self._schemas[board_id] = BoardSchema(board_id, columns, fetched_at=fetched_at)
+
+    def invalidate(self, board_id=None):
+        with self._lock:
+            if board_id is None:
+                self._schemas.clear()
+            else:
+                self._schemas.pop(board_id, None)
+
+
+column_registry = ColumnRegistry()
@@ -9,6 +9,13 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 MONDAY_API_KEY = os.getenv("MONDAY_API_KEY")
 MONDAY_API_URL = os.getenv("MONDAY_API_URL", "https://api.monday.com/v2")
+MONDAY_API_VERSION = os.getenv("MONDAY_API_VERSION", "2024-10")
+# HTTP timeouts (seconds) and retry count for monday.com requests
+MONDAY_CONNECT_TIMEOUT = float(os.getenv("MONDAY_CONNECT_TIMEOUT", "5"))
+MONDAY_READ_TIMEOUT = float(os.getenv("MONDAY_READ_TIMEOUT", "60"))
+MONDAY_MAX_RETRIES = int(os.getenv("MONDAY_MAX_RETRIES", "4"))
+# Only request the column values the cleaners map (set to 0 to fetch every column)
+MONDAY_PROJECTED_FETCH = os.getenv("MONDAY_PROJECTED_FETCH", "1") != "0"
 
 # Board IDs can be provided via environment variables. The examples used
 # previously were numeric strings; keep them as strings.
@@ -19,6 +26,36 @@ WORK_ORDERS_BOARD_ID = os.getenv("WORK_ORDERS_BOARD_ID")
 # variable name (avoid relying on this long-term).
 WORKORDERS_BOARD_ID = WORK_ORDERS_BOARD_ID
 
+# How long a loaded board snapshot is served before it is refreshed (seconds).
+SNAPSHOT_TTL_SECONDS = int(os.getenv("SNAPSHOT_TTL_SECONDS", "300"))
+
+# Column metadata rarely changes; it is refetched after this long (seconds) or
+# as soon as item payloads show the board schema has drifted.
+COLUMNS_TTL_SECONDS = int(os.getenv("COLUMNS_TTL_SECONDS", "21600"))
+
+# Directory where cleaned snapshots are persisted for warm starts. Set to an
+# empty string to disable.
+SNAPSHOT_STORE_DIR = os.getenv("SNAPSHOT_STORE_DIR", ".snapshot_store")
+
+# Parsed intents are cached per normalized question. Set INTENT_CACHE_PATH to a
+# JSON file to keep them across restarts.
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "512"))
+INTENT_CACHE_TTL_SECONDS = int(os.getenv("INTENT_CACHE_TTL_SECONDS", "86400"))
+INTENT_CACHE_PATH = os.getenv("INTENT_CACHE_PATH", "")
+# Rule-based intents at or above this confidence skip the intent model.
+INTENT_RULES_MIN_CONFIDENCE = float(os.getenv("INTENT_RULES_MIN_CONFIDENCE", "0.75"))
+
+# Generated answers are cached per (question, metrics, model) and dropped when
+# board data changes. RESPONSE_CACHE_PATH persists them like INTENT_CACHE_PATH.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "")
+
+# /chat/batch: concurrent model calls per batch (default and ceiling), and the largest batch accepted.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "100"))
+
 def validate_config(raise_on_missing=False):
 	"""Return list of missing required variables. If raise_on_missing is True
 	raise RuntimeError when any required var is missing.
@@ -33,3 +70,27 @@ def validate_config(raise_on_missing=False):
 	if missing and raise_on_missing:
 		raise RuntimeError(f"Missing required env vars: {', '.join(missing)}")
 	return missing
+
+# Token budget for data rendered into a prompt (metrics, context samples).
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+
+# Agent tool observations: default and maximum rows per page, rows in the
+# "top" list of a summary, and the hard token budget of one observation.
+AGENT_PAGE_SIZE = int(os.getenv("AGENT_PAGE_SIZE", "20"))
+AGENT_MAX_ROWS = int(os.getenv("AGENT_MAX_ROWS", "100"))
+AGENT_TOP_K = int(os.getenv("AGENT_TOP_K", "5"))
+AGENT_OBSERVATION_TOKENS = int(os.getenv("AGENT_OBSERVATION_TOKENS", "1500"))
+
+# Profiling: PROFILE_REQUESTS=1 profiles every /chat request and agent run
+# (otherwise only requests sent with an "X-Profile: 1" header, or questions
+# asked with the Streamlit toggle on). Profiles are written to PROFILE_DIR;
+# the stack sampler takes one sample every PROFILE_SAMPLE_INTERVAL seconds.
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Directory (on the host, e.g. /dev/shm/bi-agent) where board snapshots are
+# shared between processes as memory-mapped Arrow files; every process on the
+# host then maps one copy and a board is fetched once per host. Empty: each
+# process keeps its own snapshots.
+SHARED_SNAPSHOT_DIR = os.getenv("SHARED_SNAPSHOT_DIR", "")
@@ -0,0 +1,189 @@
+"""Compact, token-budgeted rendering of board data for model prompts.
+
+Prompts used to carry `json.dumps(...)` of metrics and sample rows: every
+row repeats every key, floats carry 10+ digits and Timestamps print as
+`2024-02-11 00:00:00`. `build_context` renders the same payload as plain
+`key: value` lines plus CSV tables (one header, one line per row), with
+numbers rounded and dates cut to the day:
+
+    total_pipeline: 4205515366
+    by_sector (sector,pipeline,count):
+    infrastructure,568533934,687
+    renewables,541896654,616
+
+Table rows are ordered by their first numeric column, largest first. When
+the text is over the token budget, the lowest rows of the longest table are
+dropped first (the header then says how many are shown), and only as a last
+resort is the text cut off. Token counts are estimates (about 4 characters
+per token), good enough for budgeting.
+"""
+import json
+import logging
+import numbers
+
+from app.config import CONTEXT_TOKEN_BUDGET
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def format_value(value):
+    """Short text for one cell: rounded numbers, dates without midnight times."""
+    if value is None or isinstance(value, bool):
+        return '' if value is None else str(value).lower()
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        if value != value or value in (float('inf'), float('-inf')):
+            return ''
+        if abs(value) >= 100 or value == int(value):
+            return str(int(round(value)))
+        return f'{value:.2f}'.rstrip('0').rstrip('.')
+    if hasattr(value, 'isoformat'):
+        if value != value:  # NaT
+            return ''
+        text = value.isoformat()
+        return text[:10] if text[10:] in ('', 'T00:00:00') else text[:16]
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str, separators=(',', ':'))
+
+
+def _csv_cell(value):
+    text = format_value(value)
+    if any(c in text for c in ',"\n'):
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
+
+class Table:
+    """Rows (dicts) rendered as CSV under a `name (col,...):` header."""
+
+    def __init__(self, name, rows, columns=None):
+        self.name = name
+        if columns is None:
+            columns = []
+            for row in rows:
+                columns.extend(k for k in row if k not in columns)
+        self.columns = list(columns)
+        rank = next((c for c in self.columns
+                     if any(isinstance(r.get(c), numbers.Real) and not isinstance(r.get(c), bool) for r in rows)),
+                    None)
+        if rank is not None:
+            rows = sorted(rows, key=lambda r: _sort_key(r.get(rank)), reverse=True)
+        self.rows = list(rows)
+        self.total = len(self.rows)
+
+    def drop(self, fraction=0.25):
+        """Drop the lowest-ranked rows (at least one); return how many."""
+        n = max(1, int(len(self.rows) * fraction)) if len(self.rows) > 1 else 0
+        if n:
+            del self.rows[-n:]
+        return n
+
+    def render(self):
+        shown = f'{len(self.rows)} of {self.total} rows; ' if len(self.rows) < self.total else ''
+        lines = [f"{self.name} ({shown}{','.join(self.columns)}):"]
+        lines.extend(','.join(_csv_cell(r.get(c)) for c in self.columns) for r in self.rows)
+        return '\n'.join(lines)
+
+
+def _sort_key(value):
+    if isinstance(value, numbers.Real) and not isinstance(value, bool) and value == value:
+        return float(value)
+    return float('-inf')
+
+
+def _key_column(name):
+    """Header for the key column of a keyed table: by_sector -> sector, top_sectors -> sector."""
+    name = name.rsplit('.', 1)[-1]
+    if name.startswith('by_'):
+        return name[3:]
+    if name.startswith('top_') and len(name) > 4:
+        return name[4:-1] if name.endswith('s') else name[4:]
+    return 'key'
+
+
+def _blocks(payload, prefix=''):
+    """Split a payload into scalar lines and Tables, in payload order; nested
+    dicts are flattened with dotted names."""
+    if not isinstance(payload, dict):
+        payload = {'data': payload}
+    blocks = []
+    for name, value in payload.items():
+        name = prefix + str(name)
+        if isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+            key = _key_column(name)
+            blocks.append(Table(name, [dict({key: k}, **v) for k, v in value.items()]))
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(v, dict) for v in value):
+            blocks.append(Table(name, list(value)))
+        elif (isinstance(value, (list, tuple)) and value
+              and all(isinstance(v, (list, tuple)) and len(v) == 2 and isinstance(v[1], dict) for v in value)):
+            # [[key, {...}], ...] as produced by sorted(d.items())
+            blocks.append(Table(name, [dict({_key_column(name): k}, **v) for k, v in value]))
+        elif isinstance(value, dict) and any(isinstance(v, (dict, list, tuple)) for v in value.values()):
+            blocks.extend(_blocks(value, name + '.'))
+        elif isinstance(value, dict):
+            blocks.append(f"{name}: " + ', '.join(f'{k}={format_value(v)}' for k, v in value.items()))
+        else:
+            blocks.append(f'{name}: {format_value(value)}')
+    return blocks
+
+
+def _render(blocks):
+    return '\n'.join(b.render() if isinstance(b, Table) else b for b in blocks)
+
+
+class BuiltContext:
+    """Result of `build_context`: the text and what it cost."""
+
+    def __init__(self, text, raw_tokens, dropped_rows, truncated):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.raw_tokens = raw_tokens
+        self.saved_tokens = max(0, raw_tokens - self.tokens)
+        self.dropped_rows = dropped_rows
+        self.truncated = truncated
+
+    def __str__(self):
+        return self.text
+
+    def report(self):
+        return {
+            'tokens': self.tokens,
+            'raw_tokens': self.raw_tokens,
+            'saved_tokens': self.saved_tokens,
+            'dropped_rows': self.dropped_rows,
+            'truncated': self.truncated,
+        }
+
+
+def build_context(payload, budget=None):
+    """Render `payload` compactly within `budget` tokens (CONTEXT_TOKEN_BUDGET
+    by default). `raw_tokens` in the result is the size of the same payload
+    as JSON, so `saved_tokens` is what the compact form saved."""
+    budget = budget or CONTEXT_TOKEN_BUDGET
+    raw_tokens = estimate_tokens(json.dumps(payload, default=str))
+    blocks = _blocks(payload)
+    tables = [b for b in blocks if isinstance(b, Table)]
+    text = _render(blocks)
+    dropped = 0
+    while estimate_tokens(text) > budget:
+        longest = max((t for t in tables if len(t.rows) > 1), key=lambda t: len(t.rows), default=None)
+        if longest is None:
+            break
+        dropped += longest.drop()
+        text = _render(blocks)
+    truncated = estimate_tokens(text) > budget
+    if truncated:
+        text = text[:budget * CHARS_PER_TOKEN - 15] + '\n...[truncated]'
+    built = BuiltContext(text, raw_tokens, dropped, truncated)
+    logger.debug('context: %d tokens (raw JSON %d, saved %d, dropped %d rows)',
+                 built.tokens, built.raw_tokens, built.saved_tokens, dropped)
+    return built
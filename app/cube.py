@@ -0,0 +1,204 @@
+"""Materialized aggregate cube over a cleaned board.
+
+Almost every question is a rollup over sector x stage/status x time bucket,
+so instead of re-aggregating rows per question each board snapshot carries
+an `AggregateCube`: sum / count / min / max of the board's value column
+(amount for deals, revenue for work orders) per cell, where a cell is keyed
+by the board's dimensions plus the month of its date column. Quarters are
+derived from months. One cube covers one board, so together the two
+snapshot cubes are keyed by (board, sector, stage/status, month).
+
+The cube is built once per full snapshot load and updated incrementally from
+the rows that changed on a delta refresh. Answering from it only touches the
+cells (a few hundred to a few thousand), never the rows.
+"""
+import pandas as pd
+
+# board -> (value column, dimension columns, date column bucketed by month)
+CUBE_SPECS = {
+    'deals': ('amount', ('sector', 'stage'), 'close_date'),
+    'work_orders': ('revenue', ('status',), 'start_date'),
+}
+
+# defaults for blank dimension values, matching app.metrics
+_BLANK = {'sector': 'unknown'}
+
+ACTIVE_STATUSES = ["active", "in progress"]
+
+
+def month_to_quarter(month):
+    """'2024-05' -> '2024Q2' ('' stays '')."""
+    if not month:
+        return ''
+    year, m = month.split('-')
+    return f"{year}Q{(int(m) - 1) // 3 + 1}"
+
+
+class AggregateCube:
+    def __init__(self, board, cells=None):
+        self.board = board
+        self.value, self.dims, self.date_col = CUBE_SPECS[board]
+        self.key_names = self.dims + ('month',)
+        # key tuple -> [sum, count, min, max]
+        self.cells = cells if cells is not None else {}
+
+    # -- building -------------------------------------------------------------
+
+    def _keys(self, df):
+        keys = []
+        for dim in self.dims:
+            col = df[dim] if dim in df else pd.Series('', index=df.index)
+            col = col.fillna('').astype(str)
+            if dim in _BLANK:
+                col = col.mask(col == '', _BLANK[dim])
+            keys.append(col)
+        if self.date_col in df:
+            dates = pd.to_datetime(df[self.date_col], errors='coerce')
+            keys.append(dates.dt.strftime('%Y-%m').fillna(''))
+        else:
+            keys.append(pd.Series('', index=df.index))
+        return keys
+
+    def _aggregate(self, df):
+        """Return {key: [sum, count, min, max]} for the rows of `df`."""
+        if df is None or df.empty:
+            return {}
+        values = pd.to_numeric(df[self.value], errors='coerce').fillna(0.0) if self.value in df \
+            else pd.Series(0.0, index=df.index)
+        g = values.groupby(self._keys(df), sort=False).agg(['sum', 'size', 'min', 'max'])
+        return {
+            key: [float(s), int(c), float(mn), float(mx)]
+            for key, s, c, mn, mx in zip(g.index, g['sum'], g['size'], g['min'], g['max'])
+        }
+
+    @classmethod
+    def from_frame(cls, board, df):
+        cube = cls(board)
+        cube.cells = cube._aggregate(df)
+        return cube
+
+    def copy(self):
+        return AggregateCube(self.board, {k: list(v) for k, v in self.cells.items()})
+
+    def apply_delta(self, removed, added, current):
+        """Update in place for a changed set of rows.
+
+        `removed` holds the previous version of every row that was changed or
+        deleted, `added` the new version of changed / inserted rows, and
+        `current` the full frame after the change. Sums and counts are updated
+        arithmetically; a cell whose min or max row was removed is recomputed
+        from `current`, restricted to that cell's rows.
+        """
+        dirty = set()
+        for key, (s, c, mn, mx) in self._aggregate(removed).items():
+            cell = self.cells.get(key)
+            if cell is None:
+                continue
+            cell[0] -= s
+            cell[1] -= c
+            if cell[1] <= 0:
+                del self.cells[key]
+            elif mn <= cell[2] or mx >= cell[3]:
+                dirty.add(key)
+        for key, (s, c, mn, mx) in self._aggregate(added).items():
+            cell = self.cells.get(key)
+            if cell is None:
+                self.cells[key] = [s, c, mn, mx]
+            else:
+                cell[0] += s
+                cell[1] += c
+                cell[2] = min(cell[2], mn)
+                cell[3] = max(cell[3], mx)
+        if dirty:
+            keys = self._keys(current)
+            mask = pd.Series(False, index=current.index)
+            for key in dirty:
+                m = pd.Series(True, index=current.index)
+                for col, part in zip(keys, key):
+                    m &= col == part
+                mask |= m
+            for key, cell in self._aggregate(current[mask]).items():
+                if key in dirty:
+                    self.cells[key] = cell
+        return self
+
+    # -- querying -------------------------------------------------------------
+
+    def _match(self, key, where):
+        for name, want in where.items():
+            if name == 'quarter':
+                got = month_to_quarter(key[-1])
+            else:
+                got = key[self.key_names.index(name)]
+            if callable(want):
+                if not want(got):
+                    return False
+            elif got != want:
+                return False
+        return True
+
+    def rollup(self, by=(), where=None):
+        """Aggregate cells into {group key: (sum, count, min, max)}.
+
+        `by` names dimensions ('sector', 'stage', 'status', 'month',
+        'quarter'); `where` maps dimension names to a value or predicate.
+        Group keys are tuples in `by` order (a 1-tuple for one dimension).
+        """
+        out = {}
+        for key, (s, c, mn, mx) in self.cells.items():
+            if where and not self._match(key, where):
+                continue
+            gk = tuple(
+                month_to_quarter(key[-1]) if name == 'quarter' else key[self.key_names.index(name)]
+                for name in by
+            )
+            acc = out.get(gk)
+            if acc is None:
+                out[gk] = [s, c, mn, mx]
+            else:
+                acc[0] += s
+                acc[1] += c
+                acc[2] = min(acc[2], mn)
+                acc[3] = max(acc[3], mx)
+        return {k: tuple(v) for k, v in out.items()}
+
+    def total(self, where=None):
+        """(sum, count, min, max) over all matching cells."""
+        return self.rollup((), where).get((), (0.0, 0, None, None))
+
+    def row_count(self):
+        return sum(c[1] for c in self.cells.values())
+
+    # -- metric shapes (same as app.metrics) ------------------------------------
+
+    def deals_metrics(self):
+        if not self.cells:
+            return {"total_pipeline": 0, "deal_count": 0, "by_sector": {}}
+        by_sector = self.rollup(('sector',))
+        return {
+            "total_pipeline": float(sum(v[0] for v in by_sector.values())),
+            "deal_count": int(sum(v[1] for v in by_sector.values())),
+            "by_sector": {k[0]: {"pipeline": float(v[0]), "count": int(v[1])} for k, v in by_sector.items()},
+        }
+
+    def period_metrics(self, start, end):
+        """Pipeline and count for months from `start` to `end` (datetimes, inclusive)."""
+        if not self.cells:
+            return {"pipeline": 0, "count": 0}
+        lo, hi = start.strftime('%Y-%m'), end.strftime('%Y-%m')
+        s, c, _, _ = self.total({'month': lambda m: bool(m) and lo <= m <= hi})
+        return {"pipeline": float(s), "count": int(c)}
+
+    def work_orders_metrics(self):
+        if not self.cells:
+            return {"total_revenue": 0, "active_count": 0, "by_status": {}}
+        by_status = {}
+        for (status,), (s, c, _, _) in self.rollup(('status',)).items():
+            entry = by_status.setdefault(status.lower(), {"revenue": 0.0, "count": 0})
+            entry["revenue"] += float(s)
+            entry["count"] += int(c)
+        return {
+            "total_revenue": float(sum(v["revenue"] for v in by_status.values())),
+            "active_count": int(sum(by_status[st]["count"] for st in ACTIVE_STATUSES if st in by_status)),
+            "by_status": by_status,
+        }
@@ -0,0 +1,23 @@
+"""Small file helpers with no third-party dependencies."""
+import os
+import tempfile
+
+
+def atomic_write(path, write):
+    """Call write(tmp_path), then rename the result over `path`.
+
+    The temporary file sits next to `path`, so the rename is atomic and a
+    reader never sees a half-written file.
+    """
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
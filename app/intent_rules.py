@@ -0,0 +1,224 @@
+"""Deterministic intent matcher, tried before the intent model.
+
+Most questions are short and use a small vocabulary ("total pipeline",
+"revenue from energy", "how many deals this quarter"). `IntentMatcher`
+compiles every known phrase (metric words, board words, timeframes and the
+sector names of the current deals snapshot) into one alternation regex and
+scans a question once, left to right. Each hit is looked up in a phrase
+table to get its meaning, so matching costs a single regex pass no matter
+how many phrases there are.
+
+The result comes with a confidence score. It drops when the question asks
+for two metrics at once or has words the matcher does not know (an unknown
+sector, "average", "by stage", ...); below `RULES_MIN_CONFIDENCE` callers
+should ask the model instead.
+"""
+import re
+import threading
+
+from app.config import INTENT_RULES_MIN_CONFIDENCE
+
+# -- question normalization -----------------------------------------------------
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = frozenset([
+    "a", "an", "the", "is", "are", "was", "were", "be", "s", "do", "does", "did",
+    "what", "whats", "how", "much", "many", "which", "me", "show", "tell", "give",
+    "please", "can", "you", "i", "we", "our", "us", "my", "of", "in", "from", "for",
+    "by", "on", "at", "to", "about", "there", "have", "has", "with", "and",
+    "sector", "sectors", "industry",
+])
+
+
+def normalize_question(question):
+    """Lowercased word tokens of `question`, without punctuation or stopwords.
+
+    "What's the total pipeline?" and "total pipeline" normalize alike.
+    """
+    return tuple(t for t in _TOKEN.findall((question or "").lower()) if t not in _STOPWORDS)
+
+
+# -- vocabulary -------------------------------------------------------------------
+
+# Phrases -> metric. Order within the table does not matter; conflicts are
+# resolved by METRIC_PRIORITY.
+METRIC_PHRASES = {
+    'leadership': ['leadership', 'summary', 'executive summary', 'overview', 'board update', 'exec summary'],
+    'columns': ['column', 'columns', 'fields', 'schema'],
+    'active_count': ['active', 'in progress', 'ongoing', 'open work orders', 'running'],
+    'revenue': ['revenue', 'revenues', 'income', 'billed', 'billing', 'earn', 'earned', 'earnings'],
+    'pipeline_value': ['pipeline', 'pipeline value', 'deal value', 'deals worth', 'worth', 'forecast'],
+    'deal_count': ['number of deals', 'deal count', 'count of deals', 'deals count', 'how many deals',
+                   'how many opportunities', 'number of opportunities'],
+}
+METRIC_PRIORITY = ['leadership', 'columns', 'active_count', 'revenue', 'pipeline_value', 'deal_count']
+
+BOARD_PHRASES = {
+    'work_orders': ['work order', 'work orders', 'workorder', 'workorders', 'work_orders', 'wo', 'wos',
+                    'job', 'jobs', 'project', 'projects'],
+    'deals': ['deal', 'deals', 'opportunity', 'opportunities', 'prospects'],
+}
+# board implied by the metric when the question names none
+METRIC_BOARD = {
+    'revenue': 'work_orders',
+    'active_count': 'work_orders',
+    'pipeline_value': 'deals',
+    'deal_count': 'deals',
+    'columns': 'deals',
+    'leadership': 'deals',
+}
+
+TIMEFRAME_PHRASES = {
+    'current quarter': ['this quarter', 'current quarter', 'this qtr', 'qtd', 'quarter to date'],
+    'last quarter': ['last quarter', 'previous quarter', 'prior quarter'],
+    'current month': ['this month', 'current month', 'mtd', 'month to date'],
+    'last month': ['last month', 'previous month'],
+    'current year': ['this year', 'current year', 'ytd', 'year to date'],
+    'last year': ['last year', 'previous year'],
+}
+_QUARTER = r'q[1-4](?:\s+(?:fy)?\d{4})?'
+
+COUNT_CUES = ['how many', 'number of', 'count']
+
+# words that neither change the intent nor make it less certain
+NEUTRAL_WORDS = frozenset([
+    'total', 'overall', 'all', 'value', 'amount', 'sum', 'current', 'currently',
+    'now', 'right', 'so', 'far', 'today', 'get', 'know', 'want', 'like', 'would',
+    'could', 'whole', 'entire', 'combined', 'altogether', 'up', 'number', 'count',
+    'it', 'its', 'that', 'this', 'those', 'these', 'them', 'their',
+    'hi', 'hey', 'quick', 'question', 'us', 'look', 'looking', 'status', 'board',
+    'list', 'big',
+])
+
+RULES_MIN_CONFIDENCE = INTENT_RULES_MIN_CONFIDENCE
+_UNKNOWN_WORD_PENALTY = 0.3
+_CONFLICT_CONFIDENCE = 0.4
+
+
+def _phrase_pattern(phrase):
+    return r'\s+'.join(re.escape(w) for w in phrase.split())
+
+
+class IntentMatcher:
+    """One compiled matcher for a fixed sector vocabulary."""
+
+    def __init__(self, sectors=()):
+        self.sectors = frozenset(s for s in (str(x).strip().lower() for x in sectors)
+                                 if s and s != 'unknown')
+        table = {}
+        for metric, phrases in METRIC_PHRASES.items():
+            for p in phrases:
+                table.setdefault(p, ('metric', metric))
+        for board, phrases in BOARD_PHRASES.items():
+            for p in phrases:
+                table.setdefault(p, ('board', board))
+        for timeframe, phrases in TIMEFRAME_PHRASES.items():
+            for p in phrases:
+                table.setdefault(p, ('timeframe', timeframe))
+        for p in COUNT_CUES:
+            table.setdefault(p, ('count', True))
+        for s in self.sectors:
+            # a sector name wins over a generic word it happens to share
+            table[s] = ('sector', s)
+        self.table = {' '.join(k.split()): v for k, v in table.items()}
+        # longest phrases first so "work orders" beats "work" and "pipeline value" beats "pipeline"
+        alternation = '|'.join(_phrase_pattern(p) for p in sorted(self.table, key=len, reverse=True))
+        self.pattern = re.compile(r'(?<![a-z0-9_])(?:(?P<quarter>%s)|(?P<phrase>%s))(?![a-z0-9_])'
+                                  % (_QUARTER, alternation))
+
+    def scan(self, question):
+        """Return (hits, unknown words): hits are (kind, value) in question order."""
+        text = (question or '').lower()
+        hits = []
+        covered = []
+        for m in self.pattern.finditer(text):
+            if m.group('quarter'):
+                hits.append(('timeframe', ' '.join(m.group('quarter').upper().split())))
+            else:
+                hits.append(self.table[' '.join(m.group('phrase').split())])
+            covered.append(m.span())
+        unknown = []
+        for t in _TOKEN.finditer(text):
+            word = t.group()
+            if word in _STOPWORDS or word in NEUTRAL_WORDS:
+                continue
+            if any(start <= t.start() and t.end() <= end for start, end in covered):
+                continue
+            unknown.append(word)
+        return hits, unknown
+
+    def match(self, question):
+        """Return (intent, confidence). `intent` is None when no metric was found."""
+        hits, unknown = self.scan(question)
+        metrics = {v for kind, v in hits if kind == 'metric'}
+        boards = [v for kind, v in hits if kind == 'board']
+        sectors = [v for kind, v in hits if kind == 'sector']
+        timeframes = [v for kind, v in hits if kind == 'timeframe']
+        counting = any(kind == 'count' for kind, _ in hits)
+
+        board = boards[0] if boards else None
+        if not metrics and counting and board in (None, 'deals'):
+            metrics = {'deal_count'}
+        if not metrics:
+            return None, 0.0
+
+        metric = next(m for m in METRIC_PRIORITY if m in metrics)
+        confidence = 1.0
+        # leadership / columns questions routinely mention other metrics
+        if len(metrics) > 1 and metric not in ('leadership', 'columns'):
+            confidence = _CONFLICT_CONFIDENCE
+        if len(set(boards)) > 1 or len(set(sectors)) > 1:
+            confidence = min(confidence, _CONFLICT_CONFIDENCE)
+        confidence -= _UNKNOWN_WORD_PENALTY * len(unknown)
+
+        intent = {
+            'board': board or METRIC_BOARD.get(metric, 'deals'),
+            'metric': metric,
+            'sector': sectors[0] if sectors else None,
+            'timeframe': timeframes[0] if timeframes else None,
+        }
+        return intent, max(0.0, round(confidence, 2))
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+_vocabulary = (None, ())
+
+
+def get_matcher(sectors=()):
+    """Shared matcher for `sectors`, recompiled only when the vocabulary changes."""
+    global _matcher
+    key = frozenset(s for s in (str(x).strip().lower() for x in sectors) if s and s != 'unknown')
+    matcher = _matcher
+    if matcher is not None and matcher.sectors == key:
+        return matcher
+    with _matcher_lock:
+        if _matcher is None or _matcher.sectors != key:
+            _matcher = IntentMatcher(key)
+        return _matcher
+
+
+def live_sectors():
+    """Sector names on the current deals snapshot (empty before the first load).
+
+    Only peeks at the snapshot cache; never triggers a board load.
+    """
+    global _vocabulary
+    from app.snapshot import snapshots, DEALS
+
+    snap = snapshots.peek(DEALS)
+    if snap is None:
+        return ()
+    if _vocabulary[0] is not snap.cube:
+        _vocabulary = (snap.cube, tuple(k[0] for k in snap.cube.rollup(('sector',))))
+    return _vocabulary[1]
+
+
+def match_intent(question, sectors=None):
+    """Rule-based intent for `question` as (intent or None, confidence).
+
+    `sectors` defaults to the live vocabulary of the deals snapshot.
+    """
+    if sectors is None:
+        sectors = live_sectors()
+    return get_matcher(sectors).match(question)
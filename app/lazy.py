@@ -0,0 +1,34 @@
+"""Deferred imports for heavy modules.
+
+`lazy_import('app.snapshot')` returns a stand-in module; the real import runs
+on first attribute access. Entry points (app/main.py, app.py) use it for
+modules that pull in pandas, pyarrow, langchain or the Gemini SDK, so the
+process is up (and `/health` answers) before any of them are loaded.
+
+The import goes through `importlib.import_module`, whose per-module locks
+make a first access from several threads at once safe.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for module `name` until one of its attributes is read."""
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get('_module')
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__.get('_module') is not None else 'not loaded'
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """Module `name`, imported on first attribute access (or now if already loaded)."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
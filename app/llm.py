@@ -1,12 +1,183 @@
+import hashlib
 import json
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY, GEMINI_MODEL
+import logging
+import threading
+import time
+from app.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    INTENT_CACHE_SIZE,
+    INTENT_CACHE_TTL_SECONDS,
+    INTENT_CACHE_PATH,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_PATH,
+)
+from app.cache import TTLCache
+from app.intent_rules import normalize_question, match_intent, live_sectors, RULES_MIN_CONFIDENCE
+from app.context_builder import build_context, estimate_tokens
+from app import tracing
 
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel(GEMINI_MODEL)
+logger = logging.getLogger(__name__)
 
+# Built on first use: importing the Gemini SDK takes most of a second.
+model = None
+_model_lock = threading.Lock()
 
-def parse_intent(question):
+
+def get_model():
+    """The shared Gemini model, configured and created on first call."""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=GEMINI_API_KEY)
+                model = genai.GenerativeModel(GEMINI_MODEL)
+    return model
+
+
+# -- question normalization / intent cache -------------------------------------
+
+# words that carry the intent itself and must never be taken for a sector
+_INTENT_WORDS = frozenset([
+    "pipeline", "value", "revenue", "deal", "deals", "count", "number", "total",
+    "active", "work", "order", "orders", "columns", "column", "summary",
+    "leadership", "board", "quarter", "month", "year", "this", "last", "current",
+    "next", "all", "overall",
+])
+SECTOR_SLOT = "{sector}"
+
+intent_cache = TTLCache(INTENT_CACHE_SIZE, INTENT_CACHE_TTL_SECONDS, path=INTENT_CACHE_PATH, name='intent cache')
+
+
+def _slot_sector(tokens, sector):
+    """`tokens` with the words spelling `sector` replaced by SECTOR_SLOT, or None."""
+    words = normalize_question(str(sector))
+    if not words or any(w in _INTENT_WORDS for w in words):
+        return None
+    n = len(words)
+    for i in range(len(tokens) - n + 1):
+        if tokens[i:i + n] == words:
+            return tokens[:i] + (SECTOR_SLOT,) + tokens[i + n:]
+    return None
+
+
+def _sector_vocabulary(sectors):
+    """Normalized spelling -> sector name for the known sectors."""
+    vocabulary = {}
+    for sector in sectors:
+        words = normalize_question(str(sector))
+        if words and len(words) <= 2 and not any(w in _INTENT_WORDS for w in words):
+            vocabulary[" ".join(words)] = sector
+    return vocabulary
+
+
+def _intent_keys(tokens, vocabulary):
+    """Cache keys to try for a question: exact first, then each one- or
+    two-word span naming a known sector slotted as the sector."""
+    keys = [" ".join(tokens)]
+    sectors = [None]
+    for n in (1, 2):
+        for i in range(len(tokens) - n + 1):
+            sector = vocabulary.get(" ".join(tokens[i:i + n]))
+            if sector is None:
+                continue
+            keys.append(" ".join(tokens[:i] + (SECTOR_SLOT,) + tokens[i + n:]))
+            sectors.append(sector)
+    return keys, sectors
+
+
+def cached_intent(question, sectors=None):
+    """Return the cached intent for `question` (sector filled in) or None.
+
+    Only words naming a known sector (`sectors`, by default the live
+    vocabulary of the deals snapshot) fill a slotted sector; any other
+    question misses unless it was cached verbatim.
+    """
+    tokens = normalize_question(question)
+    if not tokens:
+        return None
+    if sectors is None:
+        sectors = live_sectors()
+    keys, slot_values = _intent_keys(tokens, _sector_vocabulary(sectors))
+    key, intent = intent_cache.get_any(keys)
+    if intent is None:
+        return None
+    intent = dict(intent)
+    if intent.get("sector") == SECTOR_SLOT:
+        intent["sector"] = slot_values[keys.index(key)]
+    return intent
+
+
+def cache_intent(question, intent):
+    """Remember a model-parsed intent, with its sector slotted when the
+    question spells it out, so the same question about another sector hits."""
+    if not isinstance(intent, dict) or "error" in intent:
+        return
+    tokens = normalize_question(question)
+    if not tokens:
+        return
+    sector = intent.get("sector")
+    slotted = _slot_sector(tokens, sector) if sector else None
+    if slotted is not None:
+        intent_cache.set(" ".join(slotted), dict(intent, sector=SECTOR_SLOT))
+    else:
+        intent_cache.set(" ".join(tokens), dict(intent))
+
+
+def intent_cache_stats():
+    return intent_cache.stats()
+
+
+# -- response cache -------------------------------------------------------------
+
+response_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS, path=RESPONSE_CACHE_PATH,
+                          name='response cache')
+
+
+def _answer_question_key(question):
+    """`question` lowercased, whitespace collapsed and trailing punctuation
+    stripped. Unlike the intent key no words are dropped: "how many deals"
+    and "show me the deals" want different answers."""
+    return " ".join(str(question).lower().split()).rstrip("?!.,;: ")
+
+
+def response_key(kind, question, payload):
+    """(kind, model, lightly normalized question, content hash of the data) as a string."""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    return f"{kind}|{GEMINI_MODEL}|{_answer_question_key(question)}|{digest}"
+
+
+def _on_snapshot_change(board):
+    # answers were written from the old data; drop them all
+    response_cache.clear()
+
+
+_watching = False
+
+
+def cached_response(key):
+    """`response_cache.get(key)`, subscribing to snapshot changes first.
+
+    The subscription is made on first use rather than at import so that
+    importing this module does not load app.snapshot (and pandas).
+    """
+    global _watching
+    if not _watching:
+        from app.snapshot import snapshots
+
+        snapshots.subscribe(_on_snapshot_change)
+        _watching = True
+    return response_cache.get(key)
+
+
+def response_cache_stats():
+    return response_cache.stats()
+
+
+def _intent_prompt(question):
     template = """
 You are an intent parser. Parse the user's question into a single JSON object with these keys:
 - `board`: either "deals" or "work_orders" (default to "deals" if unclear)
@@ -25,67 +196,276 @@ Q: "What's total revenue this quarter from energy?"
 
 Question: {}
 """
-    prompt = template.format(question)
-    try:
-        response = model.generate_content(prompt)
-        return json.loads(response.text.strip())
-    except Exception:
-        # simple deterministic fallback
-        q = question.lower()
-        result = {"board": "deals", "metric": None, "sector": None, "timeframe": None}
-        if "work" in q or "work order" in q or "revenue" in q and "work" in q:
-            result["board"] = "work_orders"
-        if any(w in q for w in ["pipeline", "pipeline value", "total pipeline"]):
-            result["metric"] = "pipeline_value"
-        if any(w in q for w in ["deal", "deals", "number of deals"]):
-            result["metric"] = "deal_count"
-        if "revenue" in q:
-            result["metric"] = "revenue"
-        if any(w in q for w in ["column", "columns"]):
-            result["metric"] = "columns"
-        if any(w in q for w in ["summary", "leadership", "board"]):
-            result["metric"] = "leadership"
-        # sector detection: pick last word as potential sector if it's short
-        # Improved fallback sector detection:
-        # - ignore common stopwords and metric words
-        # - prefer the last non-stopword token that's not a metric keyword
-        stopwords = set(["is", "are", "the", "a", "an", "in", "from", "for", "of", "by", "what", "how", "much", "do", "we", "our", "please"])
-        metric_words = set(["revenue", "pipeline", "deal", "deals", "count", "columns", "summary", "leadership", "work", "orders", "work_orders", "total"])
-        tokens = [w.strip('?,.!"\'') for w in q.split()]
-        for t in reversed(tokens):
-            if not t:
-                continue
-            tl = t.lower()
-            if tl in stopwords or tl in metric_words:
-                continue
-            if tl.isdigit():
-                continue
-            if len(tl) < 2:
-                continue
-            # treat 'all'/'any'/'none' as no-sector (leave None)
-            if tl in ("all", "any", "none", "overall", "total"):
-                break
-            # accept as sector candidate
-            result['sector'] = tl
+    return template.format(question)
+
+
+def quick_intent(question):
+    """Resolve an intent without the model: (intent, "rules") when the rule
+    matcher is confident, (intent, "cache") on an intent cache hit, else
+    (None, None)."""
+    intent, confidence = match_intent(question)
+    if intent is not None and confidence >= RULES_MIN_CONFIDENCE:
+        return intent, "rules"
+    intent = cached_intent(question)
+    return (intent, "cache") if intent is not None else (None, None)
+
+
+def model_intent(question):
+    """Ask the intent model directly (no rules, no cache). Raises on failure."""
+    prompt = _intent_prompt(question)
+    with tracing.span('llm.intent_model', prompt_tokens=estimate_tokens(prompt)) as s:
+        response = get_model().generate_content(prompt)
+        s.add(completion_tokens=estimate_tokens(response.text))
+    return json.loads(response.text.strip())
+
+
+def parse_intent(question):
+    with tracing.span('llm.parse_intent') as s:
+        intent, source = quick_intent(question)
+        if intent is not None:
+            s.set(source=source)
+            return intent
+        s.set(source="model")
+        try:
+            intent = model_intent(question)
+        except Exception:
+            # fallback results are not cached: the model may be back next time
+            s.set(source="fallback")
+            return _fallback_intent(question)
+        cache_intent(question, intent)
+        return intent
+
+
+async def parse_intent_async(question):
+    """`parse_intent` using Gemini's async client."""
+    with tracing.span('llm.parse_intent') as s:
+        intent, source = quick_intent(question)
+        if intent is not None:
+            s.set(source=source)
+            return intent
+        s.set(source="model")
+        prompt = _intent_prompt(question)
+        try:
+            with tracing.span('llm.intent_model', prompt_tokens=estimate_tokens(prompt)) as m:
+                response = await get_model().generate_content_async(prompt)
+                m.add(completion_tokens=estimate_tokens(response.text))
+            intent = json.loads(response.text.strip())
+        except Exception:
+            s.set(source="fallback")
+            return _fallback_intent(question)
+        cache_intent(question, intent)
+        return intent
+
+
+def _fallback_intent(question):
+    """Keyword-based intent used when the model call fails."""
+    q = question.lower()
+    result = {"board": "deals", "metric": None, "sector": None, "timeframe": None}
+    if "work" in q or "work order" in q or "revenue" in q and "work" in q:
+        result["board"] = "work_orders"
+    if any(w in q for w in ["pipeline", "pipeline value", "total pipeline"]):
+        result["metric"] = "pipeline_value"
+    if any(w in q for w in ["deal", "deals", "number of deals"]):
+        result["metric"] = "deal_count"
+    if "revenue" in q:
+        result["metric"] = "revenue"
+    if any(w in q for w in ["column", "columns"]):
+        result["metric"] = "columns"
+    if any(w in q for w in ["summary", "leadership", "board"]):
+        result["metric"] = "leadership"
+    # sector detection: pick last word as potential sector if it's short
+    # Improved fallback sector detection:
+    # - ignore common stopwords and metric words
+    # - prefer the last non-stopword token that's not a metric keyword
+    stopwords = set(["is", "are", "the", "a", "an", "in", "from", "for", "of", "by", "what", "how", "much", "do", "we", "our", "please"])
+    metric_words = set(["revenue", "pipeline", "deal", "deals", "count", "columns", "summary", "leadership", "work", "orders", "work_orders", "total"])
+    tokens = [w.strip('?,.!"\'') for w in q.split()]
+    for t in reversed(tokens):
+        if not t:
+            continue
+        tl = t.lower()
+        if tl in stopwords or tl in metric_words:
+            continue
+        if tl.isdigit():
+            continue
+        if len(tl) < 2:
+            continue
+        # treat 'all'/'any'/'none' as no-sector (leave None)
+        if tl in ("all", "any", "none", "overall", "total"):
             break
-        if result["metric"] is None:
-            return {"error": "Could not understand the question"}
-        return result
+        # accept as sector candidate
+        result['sector'] = tl
+        break
+    if result["metric"] is None:
+        return {"error": "Could not understand the question"}
+    return result
 
 
-def generate_summary(question, metrics):
-    # Keep LLM-based summary as a fallback for complex questions
-    prompt = f"""You are a business assistant. Answer this question based on the data.
+def _summary_prompt(question, metrics):
+    return f"""You are a business assistant. Answer this question based on the data.
 
 Question: {question}
-Data: {json.dumps(metrics, default=str)}
+Data:
+{build_context(metrics).text}
 
 Respond in 2-3 sentences, be specific with numbers."""
+
+
+def generate_summary(question, metrics):
+    # Keep LLM-based summary as a fallback for complex questions
+    key = response_key('summary', question, metrics)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+    prompt = _summary_prompt(question, metrics)
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        with tracing.span('llm.generate_summary', prompt_tokens=estimate_tokens(prompt)) as s:
+            response = get_model().generate_content(prompt)
+            answer = response.text.strip()
+            s.add(completion_tokens=estimate_tokens(answer))
     except:
         return "Could not generate answer"
+    response_cache.set(key, answer)
+    return answer
+
+
+async def generate_summary_async(question, metrics):
+    key = response_key('summary', question, metrics)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+    prompt = _summary_prompt(question, metrics)
+    try:
+        with tracing.span('llm.generate_summary', prompt_tokens=estimate_tokens(prompt)) as s:
+            response = await get_model().generate_content_async(prompt)
+            answer = response.text.strip()
+            s.add(completion_tokens=estimate_tokens(answer))
+    except Exception:
+        return "Could not generate answer"
+    response_cache.set(key, answer)
+    return answer
+
+
+# -- streaming ---------------------------------------------------------------------
+
+class TimedStream:
+    """Iterator over answer chunks that records time to first token and total time.
+
+    Wraps a sync or async chunk iterator; iterate it with `for` or `async for`
+    accordingly. `started` defaults to construction time, pass the request
+    start to include the time spent before the model call.
+    """
+
+    def __init__(self, chunks, started=None):
+        self._chunks = chunks
+        self.started = started if started is not None else time.perf_counter()
+        self.ttft = None
+        self.total = None
+        self.parts = []
+
+    def _record(self, chunk):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+        self.parts.append(chunk)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            self._record(chunk)
+            yield chunk
+        self.total = time.perf_counter() - self.started
+
+    async def __aiter__(self):
+        async for chunk in self._chunks:
+            self._record(chunk)
+            yield chunk
+        self.total = time.perf_counter() - self.started
+
+    @property
+    def text(self):
+        return "".join(self.parts).strip()
+
+    def timings(self):
+        """{'ttft_ms', 'total_ms'} (None until known)."""
+        return {
+            "ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            "total_ms": round(self.total * 1000, 1) if self.total is not None else None,
+        }
+
+
+INTERRUPTED_MARKER = "\n\n[answer interrupted]"
+
+
+def _record_stream(name, started, prompt, parts, error=None):
+    # a generator cannot keep a span open across its yields; record it whole
+    attrs = {'error': type(error).__name__} if error is not None else {}
+    tracing.record(name, time.perf_counter() - started, prompt_tokens=estimate_tokens(prompt),
+                   completion_tokens=estimate_tokens("".join(parts)), **attrs)
+
+
+def _stream_failed(stage, started, prompt, parts, error, failure):
+    """Log and record a failed stream; the text to yield in place of the rest
+    of the answer (nothing of it is cached)."""
+    logger.warning('%s: model stream failed after %d chunks: %s', stage, len(parts), error, exc_info=error)
+    _record_stream(stage, started, prompt, parts, error=error)
+    return INTERRUPTED_MARKER if parts else failure
+
+
+def _stream_text(prompt, key, failure, stage):
+    cached = cached_response(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    started = time.perf_counter()
+    try:
+        for chunk in get_model().generate_content(prompt, stream=True):
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    except Exception as e:
+        yield _stream_failed(stage, started, prompt, parts, e, failure)
+        return
+    _record_stream(stage, started, prompt, parts)
+    answer = "".join(parts).strip()
+    if answer:
+        response_cache.set(key, answer)
+
+
+async def _stream_text_async(prompt, key, failure, stage):
+    cached = cached_response(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    started = time.perf_counter()
+    try:
+        response = await get_model().generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    except Exception as e:
+        yield _stream_failed(stage, started, prompt, parts, e, failure)
+        return
+    _record_stream(stage, started, prompt, parts)
+    answer = "".join(parts).strip()
+    if answer:
+        response_cache.set(key, answer)
+
+
+def stream_summary(question, metrics, started=None):
+    """`generate_summary` as a `TimedStream` of text chunks."""
+    return TimedStream(_stream_text(_summary_prompt(question, metrics),
+                                    response_key('summary', question, metrics),
+                                    "Could not generate answer", 'llm.generate_summary'), started)
+
+
+def stream_summary_async(question, metrics, started=None):
+    return TimedStream(_stream_text_async(_summary_prompt(question, metrics),
+                                          response_key('summary', question, metrics),
+                                          "Could not generate answer", 'llm.generate_summary'), started)
 
 
 def answer_from_metrics(intent, metrics):
@@ -172,16 +552,57 @@ def answer_from_metrics(intent, metrics):
     return None
 
 
-def generate_leadership_summary(summary_data):
-    prompt = f"""Create a brief leadership summary with bullet points from this data:
-    
-{json.dumps(summary_data, default=str)}
+def _leadership_prompt(summary_data):
+    return f"""Create a brief leadership summary with bullet points from this data:
+
+{build_context(summary_data).text}
 
 Keep it short and clear."""
+
+
+def generate_leadership_summary(summary_data):
+    key = response_key('leadership', '', summary_data)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+    prompt = _leadership_prompt(summary_data)
     
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        with tracing.span('llm.generate_leadership', prompt_tokens=estimate_tokens(prompt)) as s:
+            response = get_model().generate_content(prompt)
+            answer = response.text.strip()
+            s.add(completion_tokens=estimate_tokens(answer))
     except:
         return "Could not generate summary"
+    response_cache.set(key, answer)
+    return answer
+
+
+async def generate_leadership_summary_async(summary_data):
+    key = response_key('leadership', '', summary_data)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
+    prompt = _leadership_prompt(summary_data)
+    try:
+        with tracing.span('llm.generate_leadership', prompt_tokens=estimate_tokens(prompt)) as s:
+            response = await get_model().generate_content_async(prompt)
+            answer = response.text.strip()
+            s.add(completion_tokens=estimate_tokens(answer))
+    except Exception:
+        return "Could not generate summary"
+    response_cache.set(key, answer)
+    return answer
+
+
+def stream_leadership_summary(summary_data, started=None):
+    """`generate_leadership_summary` as a `TimedStream` of text chunks."""
+    return TimedStream(_stream_text(_leadership_prompt(summary_data),
+                                    response_key('leadership', '', summary_data),
+                                    "Could not generate summary", 'llm.generate_leadership'), started)
+
 
+def stream_leadership_summary_async(summary_data, started=None):
+    return TimedStream(_stream_text_async(_leadership_prompt(summary_data),
+                                          response_key('leadership', '', summary_data),
+                                          "Could not generate summary", 'llm.generate_leadership'), started)
@@ -1,12 +1,53 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import List, Optional
+
 from pydantic import BaseModel
-from monday import fetch_deals, fetch_work_orders
-from cleaner import clean_deals, clean_work_orders
-from metrics import compute_deals_metrics, compute_work_orders_metrics, get_leadership_summary
-from llm import parse_intent, generate_summary, generate_leadership_summary
 
-app = FastAPI(title="Monday.com BI Agent")
+# allow `python app/main.py` as well as `uvicorn app.main:app`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lazy import lazy_import
+from app import tracing
+from app.profiling import maybe_profiled
+from app.config import BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_MAX_QUESTIONS
+from app.transport import MondayError, MondayAuthError, MondayRateLimitError
+from app.llm import (
+    parse_intent_async,
+    generate_summary_async,
+    generate_leadership_summary_async,
+    stream_summary_async,
+    stream_leadership_summary_async,
+    TimedStream,
+    intent_cache_stats,
+    response_cache_stats,
+)
+
+# pandas-backed modules are loaded on first use, so the server is up (and
+# /health answers) without waiting for them
+snapshot = lazy_import('app.snapshot')
+metrics = lazy_import('app.metrics')
+batch = lazy_import('app.batch')
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # serve the last persisted snapshots as soon as they are read; refresh in
+    # the background. Reading them (and importing pandas) is off the startup path.
+    threading.Thread(target=lambda: snapshot.preload(), name='snapshot-preload', daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Monday.com BI Agent", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +58,33 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Time every request; report its stage breakdown as Server-Timing."""
+    with tracing.trace() as t:
+        response = await call_next(request)
+    total_ms = t.total_ms()
+    route = request.scope.get("route")
+    tracing.http_seconds.observe(total_ms / 1000, getattr(route, "path", request.url.path))
+    stages = t.server_timing()
+    response.headers["Server-Timing"] = f"{stages}, total;dur={total_ms}" if stages else f"total;dur={total_ms}"
+    return response
+
+
+@app.exception_handler(MondayError)
+async def monday_error_handler(request: Request, exc: MondayError):
+    """Report monday.com failures instead of answering from an empty board."""
+    headers = {}
+    if isinstance(exc, MondayAuthError):
+        status = 502
+    else:
+        status = 503
+        if isinstance(exc, MondayRateLimitError) and exc.retry_after:
+            headers['Retry-After'] = str(int(exc.retry_after) + 1)
+    return JSONResponse(status_code=status, headers=headers,
+                        content={"error": type(exc).__name__, "detail": str(exc)})
+
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -25,48 +93,120 @@ class ChatResponse(BaseModel):
     answer: str
 
 
+class BatchRequest(BaseModel):
+    messages: List[str]
+    concurrency: Optional[int] = None
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
 
-@app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
-    question = request.message.lower()
-    
-    if any(word in question for word in ["summary", "leadership", "board"]):
-        deals_raw = fetch_deals()
-        wo_raw = fetch_work_orders()
-        deals_df = clean_deals(deals_raw)
-        wo_df = clean_work_orders(wo_raw)
-        
-        summary_data = get_leadership_summary(deals_df, wo_df)
-        answer = generate_leadership_summary(summary_data)
-        return ChatResponse(answer=answer)
+@app.post("/snapshot/invalidate")
+def invalidate_snapshot(board: str = None):
+    """Drop cached board data so the next request reloads it."""
+    snapshot.invalidate(board)
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latency, row, byte and token histograms in the Prometheus text format."""
+    return PlainTextResponse(tracing.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the model-call caches."""
+    return {"intent": intent_cache_stats(), "response": response_cache_stats()}
+
+
+async def _prepare(message):
+    """Work out what answering `message` needs: ("leadership", summary data),
+    ("summary", metrics) or ("answer", text) when no model call is needed."""
+    if batch.is_leadership_question(message):
+        deals, wo = await snapshot.get_snapshots_async(snapshot.DEALS, snapshot.WORK_ORDERS)
+        return "leadership", metrics.get_leadership_summary(deals.cube, wo.cube)
     
-    intent = parse_intent(request.message)
+    # the intent model call and both board loads run concurrently
+    intent, (deals, wo) = await asyncio.gather(
+        parse_intent_async(message),
+        snapshot.get_snapshots_async(snapshot.DEALS, snapshot.WORK_ORDERS),
+    )
     if "error" in intent:
-        return ChatResponse(answer=intent["error"])
-    
-    deals_raw = fetch_deals()
-    wo_raw = fetch_work_orders()
-    deals_df = clean_deals(deals_raw)
-    wo_df = clean_work_orders(wo_raw)
-    
-    board = intent.get("board", "deals")
-    sector = intent.get("sector")
-    
-    if board == "deals":
-        metrics = compute_deals_metrics(deals_df)
-        if sector:
-            metrics = metrics.get("by_sector", {}).get(sector, {})
-    else:
-        metrics = compute_work_orders_metrics(wo_df)
-    
-    answer = generate_summary(request.message, metrics)
+        return "answer", intent["error"]
+    return "summary", batch.metrics_for_intent(intent, deals, wo)
+
+
+async def _answer(message):
+    kind, payload = await _prepare(message)
+    if kind == "answer":
+        return payload
+    if kind == "leadership":
+        return await generate_leadership_summary_async(payload)
+    return await generate_summary_async(message, payload)
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest, response: Response, x_profile: Optional[str] = Header(None)):
+    """Answer one question. With an `X-Profile: 1` header (or PROFILE_REQUESTS=1)
+    the request is profiled and the saved files are named in `X-Profile-Path`."""
+    with maybe_profiled(request.message, x_profile) as profile:
+        answer = await _answer(request.message)
+    if profile is not None and profile.paths:
+        response.headers["X-Profile-Path"] = ", ".join(profile.paths.values())
     return ChatResponse(answer=answer)
 
 
+@app.post("/chat/batch")
+async def chat_batch(request: BatchRequest):
+    """Answer several questions against one snapshot, in order.
+
+    Each result carries its answer, the intent and where it came from, and
+    per-question timings; `concurrency` bounds the model calls in flight.
+    """
+    if len(request.messages) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"at most {BATCH_MAX_QUESTIONS} messages per batch")
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    return await batch.answer_batch_async(request.messages, concurrency)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _single(text):
+    yield text
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Like /chat, but streams the answer as Server-Sent Events.
+
+    Events: `token` ({"text": chunk}) as the model produces them, then one
+    `done` with the full answer, time to first token and total time (ms,
+    from the start of the request) and the time spent before the model call.
+    """
+    started = time.perf_counter()
+    kind, payload = await _prepare(request.message)
+    prepare_ms = round((time.perf_counter() - started) * 1000, 1)
+    if kind == "answer":
+        stream = TimedStream(_single(payload), started)
+    elif kind == "leadership":
+        stream = stream_leadership_summary_async(payload, started)
+    else:
+        stream = stream_summary_async(request.message, payload, started)
+
+    async def events():
+        async for chunk in stream:
+            yield _sse("token", {"text": chunk})
+        yield _sse("done", {"answer": stream.text, "prepare_ms": prepare_ms, **stream.timings()})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
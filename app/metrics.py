@@ -1,5 +1,11 @@
 from datetime import datetime
 
+import pandas as pd
+
+from app.cube import AggregateCube, ACTIVE_STATUSES
+from app.tracing import traced
+from app.records import RecordTable
+
 
 def get_current_quarter_range():
     today = datetime.now()
@@ -18,13 +24,25 @@ def get_current_quarter_range():
 def parse_date(date_str):
     if not date_str:
         return None
+    if isinstance(date_str, datetime):
+        # cleaned rows already hold Timestamps; keep the calendar day
+        if pd.isna(date_str):
+            return None
+        return datetime(date_str.year, date_str.month, date_str.day)
     try:
         return datetime.strptime(str(date_str).split('T')[0], "%Y-%m-%d")
     except:
         return None
 
 
+@traced('metrics.deals')
 def compute_deals_metrics(deals):
+    if isinstance(deals, RecordTable):
+        deals = deals.to_frame()
+    if isinstance(deals, AggregateCube):
+        return deals.deals_metrics()
+    if isinstance(deals, pd.DataFrame):
+        return compute_deals_metrics_frame(deals)
     if not deals:
         return {"total_pipeline": 0, "deal_count": 0, "by_sector": {}}
     
@@ -51,6 +69,12 @@ def compute_deals_metrics(deals):
 
 
 def compute_deals_metrics_by_quarter(deals):
+    if isinstance(deals, RecordTable):
+        deals = deals.to_frame()
+    if isinstance(deals, AggregateCube):
+        return deals.period_metrics(*get_current_quarter_range())
+    if isinstance(deals, pd.DataFrame):
+        return compute_deals_metrics_by_quarter_frame(deals)
     if not deals:
         return {"pipeline": 0, "count": 0}
     
@@ -63,7 +87,14 @@ def compute_deals_metrics_by_quarter(deals):
     }
 
 
+@traced('metrics.work_orders')
 def compute_work_orders_metrics(work_orders):
+    if isinstance(work_orders, RecordTable):
+        work_orders = work_orders.to_frame()
+    if isinstance(work_orders, AggregateCube):
+        return work_orders.work_orders_metrics()
+    if isinstance(work_orders, pd.DataFrame):
+        return compute_work_orders_metrics_frame(work_orders)
     if not work_orders:
         return {"total_revenue": 0, "active_count": 0, "by_status": {}}
     
@@ -83,10 +114,19 @@ def compute_work_orders_metrics(work_orders):
     return metrics
 
 
+@traced('metrics.leadership')
 def get_leadership_summary(deals, work_orders):
-    deals_metrics = compute_deals_metrics(deals)
+    if isinstance(deals, RecordTable):
+        deals = deals.to_frame()
+    if isinstance(deals, AggregateCube):
+        deals_metrics = deals.deals_metrics()
+        quarter_metrics = deals.period_metrics(*get_current_quarter_range())
+    elif isinstance(deals, pd.DataFrame):
+        deals_metrics, quarter_metrics = _deals_frame_metrics(deals)
+    else:
+        deals_metrics = compute_deals_metrics(deals)
+        quarter_metrics = compute_deals_metrics_by_quarter(deals)
     wo_metrics = compute_work_orders_metrics(work_orders)
-    quarter_metrics = compute_deals_metrics_by_quarter(deals)
     
     return {
         "total_pipeline": deals_metrics["total_pipeline"],
@@ -100,3 +140,104 @@ def get_leadership_summary(deals, work_orders):
             reverse=True
         )[:3]
     }
+
+
+# --- DataFrame engine ---------------------------------------------------------
+#
+# Same results and dict shapes as the list-based functions above, computed from
+# the cleaned frames (see app.cleaner.clean_*_frame) with one groupby per board.
+# The public compute_* functions dispatch here when handed a DataFrame (and to
+# app.cube when handed a snapshot's AggregateCube).
+
+
+def _numeric(df, col):
+    if col not in df:
+        return pd.Series(0.0, index=df.index)
+    s = df[col]
+    if not pd.api.types.is_float_dtype(s):
+        s = pd.to_numeric(s, errors='coerce')
+    return s.fillna(0.0)
+
+
+def _merge_blank_keys(index, values, default):
+    """Fold blank/NaN group keys into `default`, keeping first-seen order."""
+    out = {}
+    for key, vals in zip(index, values):
+        if key is None or key != key or key == '':
+            key = default
+        if key in out:
+            out[key] = [a + b for a, b in zip(out[key], vals)]
+        else:
+            out[key] = list(vals)
+    return out
+
+
+def _deals_frame_metrics(df, quarter=True):
+    """Return (deals_metrics, quarter_metrics) from one groupby over sector."""
+    if df is None or df.empty:
+        return {"total_pipeline": 0, "deal_count": 0, "by_sector": {}}, {"pipeline": 0, "count": 0}
+
+    amount = _numeric(df, 'amount')
+    cols = {'amount': amount}
+    if quarter:
+        start, end = get_current_quarter_range()
+        if 'close_date' in df:
+            close = df['close_date']
+            if not pd.api.types.is_datetime64_any_dtype(close):
+                close = pd.to_datetime(close, errors='coerce')
+            # compare on the calendar day, like parse_date() does
+            close = close.dt.normalize()
+            in_quarter = (close >= start) & (close <= end)
+        else:
+            in_quarter = pd.Series(False, index=df.index)
+        cols['q_amount'] = amount.where(in_quarter, 0.0)
+        cols['q_count'] = in_quarter.astype('int64')
+    sector = df['sector'] if 'sector' in df else pd.Series('unknown', index=df.index)
+
+    grouped = pd.DataFrame(cols).groupby(sector, sort=False, dropna=False)
+    sums = grouped.sum()
+    sums['count'] = grouped.size()
+    fields = ['amount', 'count'] + (['q_amount', 'q_count'] if quarter else [])
+    by_key = _merge_blank_keys(sums.index, sums[fields].itertuples(index=False), 'unknown')
+
+    deals_metrics = {
+        "total_pipeline": float(sums['amount'].sum()),
+        "deal_count": int(len(df)),
+        "by_sector": {sec: {"pipeline": float(v[0]), "count": int(v[1])} for sec, v in by_key.items()},
+    }
+    quarter_metrics = None
+    if quarter:
+        quarter_metrics = {"pipeline": float(sums['q_amount'].sum()), "count": int(sums['q_count'].sum())}
+    return deals_metrics, quarter_metrics
+
+
+def compute_deals_metrics_frame(df):
+    return _deals_frame_metrics(df, quarter=False)[0]
+
+
+def compute_deals_metrics_by_quarter_frame(df):
+    return _deals_frame_metrics(df)[1]
+
+
+def compute_work_orders_metrics_frame(df):
+    if df is None or df.empty:
+        return {"total_revenue": 0, "active_count": 0, "by_status": {}}
+
+    revenue = _numeric(df, 'revenue')
+    status = df['status'] if 'status' in df else pd.Series('', index=df.index)
+    grouped = revenue.groupby(status, sort=False, dropna=False)
+    sums = grouped.sum()
+    counts = grouped.size()
+
+    by_status = {}
+    for key, r, c in zip(sums.index, sums.values, counts.values):
+        # the cleaner lowercases already; this keeps hand-built frames consistent
+        key = str(key).lower() if key == key and key is not None else ''
+        entry = by_status.setdefault(key, {"revenue": 0.0, "count": 0})
+        entry["revenue"] += float(r)
+        entry["count"] += int(c)
+    return {
+        "total_revenue": float(sums.sum()),
+        "active_count": int(sum(by_status[st]["count"] for st in ACTIVE_STATUSES if st in by_status)),
+        "by_status": by_status,
+    }
@@ -1,12 +1,20 @@
 from monday import MondayClient
 from config import MONDAY_API_KEY, DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
 
-client = MondayClient(MONDAY_API_KEY)
+_client = None
+
+
+def get_client():
+    """The MondayClient, created on first use."""
+    global _client
+    if _client is None:
+        _client = MondayClient(MONDAY_API_KEY)
+    return _client
 
 
 def fetch_deals():
     try:
-        board = client.boards.fetch_board_by_id(DEALS_BOARD_ID)
+        board = get_client().boards.fetch_board_by_id(DEALS_BOARD_ID)
         items = board.get_items()
         return [item.to_dict() for item in items]
     except Exception as e:
@@ -16,7 +24,7 @@ def fetch_deals():
 
 def fetch_work_orders():
     try:
-        board = client.boards.fetch_board_by_id(WORK_ORDERS_BOARD_ID)
+        board = get_client().boards.fetch_board_by_id(WORK_ORDERS_BOARD_ID)
         items = board.get_items()
         return [item.to_dict() for item in items]
     except Exception as e:
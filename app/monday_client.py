@@ -1,67 +1,235 @@
-from monday import MondayClient
-from app.config import MONDAY_API_KEY, DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
+import json
+from datetime import timedelta
 
-client = MondayClient(MONDAY_API_KEY)
+from app.config import DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
+from app import tracing
+from app.transport import get_transport, MondayQueryError
 
+# monday.com caps items_page at 500 items per request
+DEFAULT_PAGE_SIZE = 500
 
-def fetch_deals():
+# activity log events that mean an item left the board
+REMOVAL_EVENTS = {
+    'delete_pulse',
+    'archive_pulse',
+    'batch_delete_pulses',
+    'batch_archive_pulses',
+    'move_pulse_from_board',
+}
+
+_ITEM_FIELDS = """
+                    id
+                    name
+                    updated_at
+                    group {
+                        id
+                        title
+                    }
+                    column_values {
+                        id
+                        text
+                        type
+                        value
+                    }"""
+
+
+def item_fields(column_ids=None, with_value=True):
+    """GraphQL item selection for `items_page` queries.
+
+    Without `column_ids` this is the full payload (`_ITEM_FIELDS`). With them
+    only those column values are requested, and with `with_value=False` only
+    their display text, leaving out the JSON `value` blobs that make up most
+    of a wide board's payload.
+    """
+    if column_ids is None:
+        return _ITEM_FIELDS
+    ids = ', '.join(json.dumps(str(cid)) for cid in column_ids)
+    values = 'id text value' if with_value else 'id text'
+    return f"""
+                    id
+                    name
+                    column_values(ids: [{ids}]) {{ {values} }}"""
+
+
+def execute(query):
+    """Run a GraphQL query through the shared transport (raises MondayError)."""
+    with tracing.span('monday.request'):
+        return get_transport().execute(query)
+
+
+def _fetch_page(query, extract):
+    with tracing.span('monday.items_page') as s:
+        page = extract(execute(query))
+        s.add(rows=len(page.get('items') or []))
+    return page
+
+
+def _items_query(board_id, page_size, query_params=None, fields=_ITEM_FIELDS):
+    params = f"limit: {page_size}"
+    if query_params:
+        params += f", query_params: {query_params}"
+    return """query {
+        boards(ids: %s) {
+            items_page(%s) {
+                cursor
+                items {%s
+                }
+            }
+        }
+    }""" % (board_id, params, fields)
+
+
+def _next_items_query(cursor, page_size, fields=_ITEM_FIELDS):
+    return """query {
+        next_items_page(limit: %d, cursor: "%s") {
+            cursor
+            items {%s
+            }
+        }
+    }""" % (page_size, cursor, fields)
+
+
+def _updated_since_params(since):
+    """items_page query_params restricted to items updated after `since`.
+
+    The `__last_updated__` rule compares whole days, so ask for everything
+    after the day before the watermark. That returns a small superset of the
+    changed items, which is harmless because the sync layer upserts by id.
+    """
+    day = (since - timedelta(days=1)).strftime('%Y-%m-%d')
+    return ('{rules: [{column_id: "__last_updated__", compare_value: ["EXACT", "%s"], '
+            'operator: greater_than, compare_attribute: "UPDATED_AT"}]}' % day)
+
+
+def _first_items_page(resp):
+    """Return the `items_page` dict from a boards(...) items response."""
+    if not isinstance(resp, dict):
+        return {}
+    boards = (resp.get('data') or {}).get('boards') or []
+    if not boards:
+        return {}
+    return boards[0].get('items_page') or {}
+
+
+def _next_items_page(resp):
+    """Return the `next_items_page` dict from a cursor continuation response."""
+    if not isinstance(resp, dict):
+        return {}
+    return (resp.get('data') or {}).get('next_items_page') or {}
+
+
+def iter_board_pages(board_id, page_size=DEFAULT_PAGE_SIZE, updated_since=None, fields=_ITEM_FIELDS):
+    """Yield the items of a board one page (list of item dicts) at a time.
+
+    Follows the `items_page` cursor through `next_items_page` until monday.com
+    stops returning one, so boards larger than a single page are read in full.
+    Each page is yielded as soon as it arrives; the next request is only made
+    when the caller asks for more. With `updated_since` only items changed
+    after that datetime are returned.
+    """
+    params = _updated_since_params(updated_since) if updated_since is not None else None
+    page = _fetch_page(_items_query(board_id, page_size, params, fields), _first_items_page)
+    while True:
+        items = page.get('items') or []
+        if items:
+            yield items
+        cursor = page.get('cursor')
+        if not cursor:
+            return
+        page = _fetch_page(_next_items_query(cursor, page_size, fields), _next_items_page)
+
+
+def iter_board_items(board_id, page_size=DEFAULT_PAGE_SIZE, updated_since=None, fields=_ITEM_FIELDS):
+    """Yield every item of a board, fetching pages lazily via `iter_board_pages`."""
+    for page in iter_board_pages(board_id, page_size=page_size, updated_since=updated_since, fields=fields):
+        yield from page
+
+
+def fetch_board_item_ids(board_id, page_size=DEFAULT_PAGE_SIZE):
+    """Return the set of item ids currently on a board.
+
+    Only `id` is requested per item, so this is far cheaper than a full
+    fetch; used as a periodic deletion sweep by the sync layer.
+    """
+    ids = set()
+    for page in iter_board_pages(board_id, page_size=page_size, fields=' id '):
+        ids.update(str(it.get('id')) for it in page if it.get('id') is not None)
+    return ids
+
+
+def _removed_ids_from_log(data):
+    """Extract item ids from an activity log `data` JSON payload."""
     try:
-        resp = client.boards.fetch_items_by_board_id(DEALS_BOARD_ID)
-        if isinstance(resp, dict):
-            try:
-                boards = resp.get('data', {}).get('boards', [])
-                if boards:
-                    items = boards[0].get('items_page', {}).get('items', [])
-                    return items
-            except Exception:
-                pass
-        try:
-            return list(resp)
-        except Exception:
-            return []
-    except Exception as e:
-        print(f"Error fetching deals: {str(e)}")
+        payload = json.loads(data) if isinstance(data, str) else (data or {})
+    except ValueError:
         return []
+    ids = []
+    if payload.get('pulse_id') is not None:
+        ids.append(str(payload['pulse_id']))
+    for pid in payload.get('pulse_ids') or []:
+        ids.append(str(pid))
+    for pulse in payload.get('pulses') or []:
+        if isinstance(pulse, dict) and pulse.get('id') is not None:
+            ids.append(str(pulse['id']))
+    return ids
+
+
+def fetch_removed_item_ids(board_id, since, limit=1000):
+    """Return ids of items deleted, archived or moved off a board since `since`.
+
+    Reads the board activity log, whose size tracks the number of changes
+    rather than the size of the board.
+    """
+    removed = set()
+    page = 1
+    while True:
+        query = """query {
+            boards(ids: %s) {
+                activity_logs(from: "%s", limit: %d, page: %d) {
+                    event
+                    data
+                }
+            }
+        }""" % (board_id, since.strftime('%Y-%m-%dT%H:%M:%SZ'), limit, page)
+        resp = execute(query)
+        boards = ((resp or {}).get('data') or {}).get('boards') or []
+        logs = (boards[0].get('activity_logs') if boards else None) or []
+        for log in logs:
+            if log.get('event') in REMOVAL_EVENTS:
+                removed.update(_removed_ids_from_log(log.get('data')))
+        if len(logs) < limit:
+            return removed
+        page += 1
+
+
+def fetch_board_items(board_id, page_size=DEFAULT_PAGE_SIZE):
+    """Return all items of a board as a list. Raises `MondayError` on failure."""
+    return list(iter_board_items(board_id, page_size=page_size))
+
+
+def fetch_deals():
+    return fetch_board_items(DEALS_BOARD_ID)
 
 
 def fetch_work_orders():
-    try:
-        resp = client.boards.fetch_items_by_board_id(WORK_ORDERS_BOARD_ID)
-        if isinstance(resp, dict):
-            try:
-                boards = resp.get('data', {}).get('boards', [])
-                if boards:
-                    items = boards[0].get('items_page', {}).get('items', [])
-                    return items
-            except Exception:
-                pass
-        try:
-            return list(resp)
-        except Exception:
-            return []
-    except Exception as e:
-        print(f"Error fetching work orders: {str(e)}")
-        return []
+    return fetch_board_items(WORK_ORDERS_BOARD_ID)
 
 
 def fetch_columns_by_board(board_id):
-    try:
-        resp = client.boards.fetch_columns_by_board_id(board_id)
-        if isinstance(resp, dict):
-            try:
-                boards = resp.get('data', {}).get('boards', [])
-                if boards:
-                    cols = boards[0].get('columns', [])
-                    return cols
-            except Exception:
-                pass
-        try:
-            return list(resp)
-        except Exception:
-            return []
-    except Exception as e:
-        print(f"Error fetching columns: {str(e)}")
-        return []
+    """Return a board's column metadata (id, title, type). Raises `MondayError`."""
+    query = """query {
+        boards(ids: %s) {
+            columns {
+                id
+                title
+                type
+            }
+        }
+    }""" % board_id
+    boards = (execute(query).get('data') or {}).get('boards') or []
+    if not boards:
+        raise MondayQueryError(f'board {board_id} not found or not accessible')
+    return boards[0].get('columns') or []
 
 
 def fetch_deals_columns():
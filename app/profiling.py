@@ -0,0 +1,146 @@
+"""Opt-in profiling of one request or agent run.
+
+    with profiled("Which sector leads?") as p:
+        answer = run_agent(question)
+    p.paths   # {'pstats': ..., 'collapsed': ...} once the block has finished
+
+Two profiles are taken of the block at once:
+
+- a deterministic one (cProfile) of the calling thread, saved as `.pstats`
+  for `python -m pstats` or snakeviz;
+- a sampled one: a background thread records the stacks of every thread
+  every PROFILE_SAMPLE_INTERVAL seconds, saved as collapsed stacks
+  (`thread;frame;frame count` per line) for flamegraph.pl or speedscope.
+  This is where work handed to other threads (board loads run through
+  `asyncio.to_thread`, snapshot refreshes) shows up.
+
+Both go to PROFILE_DIR, named `<time>_<question>_<ms>ms.*`. One profile runs
+at a time per process; a block entered while another profile is running is
+not profiled (`profiled` yields None). In the async API the profiled thread
+runs the event loop, so other requests served meanwhile show up too.
+"""
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from app.config import PROFILE_REQUESTS, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+_active = threading.Lock()
+
+
+def enabled(flag=None):
+    """Whether to profile: an explicit flag ("1"/"true"/True from a header
+    or toggle) wins over PROFILE_REQUESTS."""
+    if flag is None:
+        return PROFILE_REQUESTS
+    if isinstance(flag, str):
+        return flag.strip().lower() in ("1", "true", "yes", "on")
+    return bool(flag)
+
+
+class StackSampler:
+    """Counts the stacks of all other threads, sampled from a background thread."""
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me:
+                    thread = names.get(thread_id, str(thread_id)).replace(' ', '_').replace(';', '_')
+                    self.stacks[f'{thread};{_collapse(frame)}'] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}')
+        frame = frame.f_back
+    # root first; ';' and spaces would break the collapsed format
+    return ';'.join(reversed(names)).replace(' ', '_')
+
+
+def _slug(text, length=40):
+    return re.sub(r'[^a-z0-9]+', '-', (text or '').lower()).strip('-')[:length] or 'request'
+
+
+class Profile:
+    def __init__(self, label):
+        self.label = label
+        self.seconds = None
+        self.paths = {}
+
+    def save(self, profiler, sampler, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{_slug(self.label)}_"
+                                       f"{self.seconds * 1000:.0f}ms")
+        self.paths['pstats'] = stem + '.pstats'
+        profiler.dump_stats(self.paths['pstats'])
+        self.paths['collapsed'] = stem + '.collapsed'
+        with open(self.paths['collapsed'], 'w') as f:
+            f.write(sampler.collapsed())
+        return self.paths
+
+
+@contextmanager
+def profiled(label, directory=PROFILE_DIR):
+    """Profile the block (see module docstring). Yields a Profile, or None
+    when another profile is already running."""
+    if not _active.acquire(blocking=False):
+        logger.info("profile of %r skipped: another profile is running", label)
+        yield None
+        return
+    profile = Profile(label)
+    profiler = cProfile.Profile()
+    sampler = StackSampler().start()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profile
+    finally:
+        profiler.disable()
+        profile.seconds = time.perf_counter() - started
+        sampler.stop()
+        _active.release()
+        try:
+            profile.save(profiler, sampler, directory)
+            logger.info("profile of %r (%.0f ms) written to %s", label, profile.seconds * 1000,
+                        profile.paths['pstats'])
+        except OSError as e:
+            logger.warning("could not write profile of %r: %s", label, e)
+
+
+@contextmanager
+def maybe_profiled(label, flag=None):
+    """`profiled` when `enabled(flag)`, else a no-op yielding None."""
+    if enabled(flag):
+        with profiled(label) as profile:
+            yield profile
+    else:
+        yield None
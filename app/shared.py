@@ -0,0 +1,180 @@
+"""Board snapshots shared by every process on a host.
+
+With `SHARED_SNAPSHOT_DIR` set, the cleaned frame of each board is written
+once as an Arrow IPC file (`<board>.arrow`) that every process (Streamlit,
+each uvicorn worker) memory-maps read-only. Numeric and date columns are
+used in place and text columns are Arrow-backed (`string[pyarrow]`), so the
+rows live once in the page cache instead of once per process.
+
+- A new generation is written to a temporary file and renamed over the old
+  one. Readers that still map the old file keep a valid view of it until
+  they move on.
+- Readers notice a new generation from the file's inode and mtime (one
+  `stat` per snapshot lookup) and map it without restarting.
+- Refreshes are serialized per board with an exclusive `flock` on
+  `<board>.lock`. Whoever finds the file stale first fetches from monday.com;
+  processes waiting on the lock then map its result instead of fetching
+  again. Without `fcntl` (Windows) there is no lock: files are still swapped
+  atomically, but two processes may fetch the same board.
+
+Column metadata, the sync watermark, save time and generation number travel
+in the file's schema metadata. app.snapshot uses this module when
+`SHARED_SNAPSHOT_DIR` is set (and pyarrow is installed); the per-process
+store in app.store is then not written.
+"""
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from app.config import SHARED_SNAPSHOT_DIR
+from app.fileutil import atomic_write
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    HAS_ARROW = True
+except Exception:
+    HAS_ARROW = False
+
+logger = logging.getLogger(__name__)
+
+SHARED_VERSION = 1
+META_KEY = b'app.snapshot'
+
+
+def _types_mapper(arrow_type):
+    # text stays in the mapped Arrow buffers instead of becoming Python objects
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+class SharedBoard:
+    """One generation of a board, mapped from its shared file."""
+
+    def __init__(self, board, df, columns, watermark, saved_at, generation, stamp):
+        self.board = board
+        self.df = df
+        self.columns = columns
+        self.watermark = watermark
+        self.saved_at = saved_at
+        self.generation = generation
+        self.stamp = stamp
+
+
+class SharedSnapshots:
+    def __init__(self, directory=SHARED_SNAPSHOT_DIR):
+        self.directory = directory
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and HAS_ARROW
+
+    def path(self, board):
+        return os.path.join(self.directory, f'{board}.arrow')
+
+    def stamp(self, board):
+        """Identifies the current generation's file; None when there is none."""
+        try:
+            st = os.stat(self.path(board))
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _meta(self, reader):
+        return json.loads(reader.schema.metadata[META_KEY])
+
+    def generation(self, board):
+        """Generation number of the current file (0 when there is none)."""
+        try:
+            with pa.memory_map(self.path(board), 'r') as source:
+                return self._meta(pa.ipc.open_file(source))['generation']
+        except Exception:
+            return 0
+
+    def open(self, board):
+        """Map the current generation. Returns a SharedBoard, or None when
+        there is no usable file."""
+        path = self.path(board)
+        try:
+            stamp = self.stamp(board)
+            # the map stays open as long as the frame's buffers reference it
+            reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+            meta = self._meta(reader)
+            if meta.get('version') != SHARED_VERSION:
+                return None
+            df = reader.read_all().to_pandas(split_blocks=True, types_mapper=_types_mapper)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning('could not map shared %s snapshot %s: %s', board, path, e)
+            return None
+        watermark = meta.get('watermark')
+        return SharedBoard(
+            board,
+            df,
+            meta.get('columns') or [],
+            datetime.fromisoformat(watermark) if watermark else None,
+            meta.get('saved_at') or 0.0,
+            meta.get('generation') or 0,
+            stamp,
+        )
+
+    def publish(self, board, df, columns, watermark=None):
+        """Write `df` as the board's next generation and map it. Call with
+        `lock(board)` held. Errors are logged and return None."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            meta = {
+                'version': SHARED_VERSION,
+                'board': board,
+                'generation': self.generation(board) + 1,
+                'rows': int(len(df)),
+                'columns': columns,
+                'watermark': watermark.isoformat() if watermark else None,
+                'saved_at': time.time(),
+            }
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   META_KEY: json.dumps(meta, default=str)})
+
+            def write(p):
+                with pa.OSFile(p, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            atomic_write(os.path.abspath(self.path(board)), write)
+        except Exception as e:
+            logger.warning('could not publish shared %s snapshot to %s: %s', board, self.directory, e)
+            return None
+        return self.open(board)
+
+    @contextmanager
+    def lock(self, board):
+        """Hold the board's host-wide refresh lock for the block."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f'{board}.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def clear(self, board):
+        try:
+            os.remove(self.path(board))
+        except OSError:
+            pass
+
+
+shared_snapshots = SharedSnapshots()
@@ -0,0 +1,406 @@
+"""Process-wide, TTL-bounded board snapshots shared by the agent, API and UI.
+
+A `BoardSnapshot` bundles everything derived from one load of a board: raw
+items, column metadata, cleaned rows and the cleaned DataFrame. The
+`SnapshotCache` hands out the current snapshot per board and reloads it once
+the TTL has passed. Loading is single-flight: when several threads ask for a
+stale board at the same time, one of them loads it and the rest wait for that
+result instead of starting their own fetch.
+
+Snapshots are shared between callers and must be treated as read-only.
+
+Every load is also written to the on-disk store (app.store). A new process
+serves the stored snapshot on its first request and refreshes it from
+monday.com in a background thread.
+
+With SHARED_SNAPSHOT_DIR set, snapshots are instead shared by all processes
+on the host through memory-mapped Arrow files (app.shared): each load is
+published as a new generation, every process maps the current one, and a
+stale board is refetched by one process while the others wait for it.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+
+import pandas as pd
+
+from app.config import DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID, SNAPSHOT_TTL_SECONDS, MONDAY_PROJECTED_FETCH
+from app.columns import column_registry, column_projection
+from app.monday_client import item_fields
+from app.transport import MondayError
+from app.sync import get_board_sync
+from app.cleaner import (
+    clean_deals_frame,
+    clean_work_orders_frame,
+    to_record_table,
+    schema_hash,
+    DEALS_FIELDS,
+    WORK_ORDERS_FIELDS,
+)
+from app.cube import AggregateCube
+from app.store import snapshot_store
+from app.shared import shared_snapshots
+
+logger = logging.getLogger(__name__)
+
+DEALS = 'deals'
+WORK_ORDERS = 'work_orders'
+
+# board name -> (board id, cleaner, cleaner fields, label used in log messages)
+BOARDS = {
+    DEALS: (DEALS_BOARD_ID, clean_deals_frame, DEALS_FIELDS, 'deals'),
+    WORK_ORDERS: (WORK_ORDERS_BOARD_ID, clean_work_orders_frame, WORK_ORDERS_FIELDS, 'work orders'),
+}
+
+
+class BoardSnapshot:
+    """One consistent, read-only view of a board, with its aggregate cube."""
+
+    def __init__(self, board, items, columns, df, cube=None, loaded_at=None):
+        self.board = board
+        self.items = items
+        self.columns = columns
+        self.df = df
+        self.cube = cube if cube is not None else AggregateCube.from_frame(board, df)
+        self.schema_hash = schema_hash(columns)
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        self._cleaned = None
+        self._content_hash = None
+        # set on snapshots mapped from a shared file (app.shared)
+        self.generation = 0
+        self.stamp = None
+        self.watermark = None
+
+    @property
+    def content_hash(self):
+        """Hash of the aggregated data and schema; equal hashes mean every
+        metric computed from the cube is unchanged."""
+        if self._content_hash is None:
+            h = hashlib.sha1(self.schema_hash.encode('utf-8'))
+            for key, cell in sorted(self.cube.cells.items()):
+                h.update(repr((key, cell)).encode('utf-8'))
+            self._content_hash = h.hexdigest()[:16]
+        return self._content_hash
+
+    @property
+    def cleaned(self):
+        """Cleaned rows as a RecordTable of dict-like records (built from `df`
+        on first access; shares its arrays)."""
+        if self._cleaned is None:
+            self._cleaned = to_record_table(self.df)
+        return self._cleaned
+
+    def age(self):
+        return time.time() - self.loaded_at
+
+
+def _apply_changes(prev, sync, stats, cleaner, columns):
+    """Build the next snapshot from `prev` by re-cleaning only changed items."""
+    changed = stats['upserted_ids']
+    gone = prev.df.index.intersection(list(changed | stats['removed_ids']))
+    old_rows = prev.df.loc[gone]
+    new_rows = cleaner([sync.items[i] for i in changed if i in sync.items], columns)
+    kept = prev.df.drop(gone)
+    df = pd.concat([kept, new_rows]) if len(new_rows) else kept
+    cube = prev.cube.copy().apply_delta(old_rows, new_rows, df)
+    return df, cube
+
+
+def _refresh(sync, label, prev, select=None):
+    """Run `select` (if given) and `sync.refresh()`. After a monday.com error
+    return None when `prev` can be served instead, otherwise re-raise."""
+    try:
+        if select is not None:
+            select()
+        return sync.refresh()
+    except MondayError as e:
+        if prev is None:
+            raise
+        logger.warning('error syncing %s, serving the previous snapshot: %s', label, e, exc_info=True)
+        return None
+
+
+def board_item_fields(columns, fields):
+    """Item selection for a board: only the mapped columns (text only where
+    the column types allow) when projected fetches are enabled."""
+    if not MONDAY_PROJECTED_FETCH or not columns:
+        return item_fields()
+    column_ids, with_value = column_projection(columns, fields)
+    if not column_ids:
+        return item_fields()
+    return item_fields(column_ids, with_value=with_value)
+
+
+def load_snapshot(board, prev=None):
+    """Fetch, clean and wrap a board.
+
+    A failed refresh keeps serving `prev` when there is one; without one the
+    `MondayError` from the transport is raised, so callers can tell a rate
+    limit or auth failure from an empty board.
+
+    With a previous snapshot on the same column schema, only the items the
+    delta sync reports as changed are cleaned, and the cube is updated from
+    those rows instead of being rebuilt.
+    """
+    board_id, cleaner, fields, label = BOARDS[board]
+    sync = get_board_sync(board_id)
+
+    def select():
+        # project on the cached schema; checked against the payload below
+        sync.set_fields(board_item_fields(column_registry.columns(board_id), fields))
+
+    stats = _refresh(sync, label, prev, select if MONDAY_PROJECTED_FETCH else None)
+    items = sync.item_list()
+    columns = column_registry.columns(board_id, items=items, fields=fields)
+    if stats is not None and MONDAY_PROJECTED_FETCH and sync.set_fields(board_item_fields(columns, fields)):
+        # the schema changed under the projection: refetch with the new one
+        stats = _refresh(sync, label, prev)
+        items = sync.item_list()
+
+    if stats is None and prev is not None:
+        return BoardSnapshot(board, prev.items, prev.columns, prev.df, cube=prev.cube)
+    if (stats is not None and not stats['full'] and prev is not None
+            and prev.schema_hash == schema_hash(columns)):
+        df, cube = _apply_changes(prev, sync, stats, cleaner, columns)
+        logger.debug('%s: applied delta (%d upserted, %d removed)', label, stats['upserted'], stats['removed'])
+        return BoardSnapshot(board, items, columns, df, cube=cube)
+    if sync.partial:
+        # resumed from the store with id-only items; a full clean needs the
+        # real payloads, so download the board once
+        sync.reset()
+        if _refresh(sync, label, prev) is None:
+            return BoardSnapshot(board, prev.items, prev.columns, prev.df, cube=prev.cube)
+        items = sync.item_list()
+        columns = column_registry.columns(board_id, items=items, fields=fields)
+    return BoardSnapshot(board, items, columns, cleaner(items, columns))
+
+
+class SnapshotCache:
+    """Holds the current snapshot per board with TTL expiry and single-flight loads."""
+
+    def __init__(self, ttl=SNAPSHOT_TTL_SECONDS, loader=load_snapshot, store=snapshot_store,
+                 shared=shared_snapshots):
+        self.ttl = ttl
+        self.loader = loader
+        self.store = store
+        self.shared = shared if shared is not None and shared.enabled else None
+        self._snapshots = {}
+        self._locks = {board: threading.Lock() for board in BOARDS}
+        self._warm_checked = set()
+        self._listeners = []
+        # shared mode: board -> newest generation invalidated in this process
+        self._expired = {}
+
+    def subscribe(self, callback):
+        """Call `callback(board)` whenever a board's data changes."""
+        self._listeners.append(callback)
+
+    def _notify(self, board):
+        for callback in list(self._listeners):
+            try:
+                callback(board)
+            except Exception as e:
+                logger.warning('snapshot listener %r failed: %s', callback, e)
+
+    def _fresh(self, snap):
+        # an invalidated shared generation stays stale even when remapped
+        return (snap is not None and snap.age() < self.ttl
+                and (snap.stamp is None or snap.generation > self._expired.get(snap.board, -1)))
+
+    def current(self, board):
+        """The snapshot `get` would return without loading anything, or None."""
+        snap = self._snapshots.get(board)
+        if not self._fresh(snap):
+            return None
+        if self.shared is not None and self.shared.stamp(board) != snap.stamp:
+            # another process published a newer generation
+            return None
+        return snap
+
+    def _load(self, board, prev):
+        """Run the loader, install and persist the result. Caller holds the lock
+        (and in shared mode the board's host-wide lock)."""
+        board_id = BOARDS[board][0]
+        if self.shared is not None and prev is not None and prev.watermark is not None:
+            # mapped from a shared file: diff against that generation's ids
+            # and watermark, whichever process published it; this process's
+            # own sync state may be older than the file
+            self._resume_sync(board, prev.df.index, prev.columns, prev.watermark)
+        started = time.perf_counter()
+        snap = self.loader(board, prev=prev)
+        logger.info('loaded %s snapshot: %d rows in %.2fs',
+                    board, len(snap.df), time.perf_counter() - started)
+        watermark = get_board_sync(board_id).watermark
+        if self.shared is not None:
+            snap = self._publish(board, snap, watermark)
+        elif self.store is not None:
+            self.store.save(board, snap.df, snap.columns, watermark)
+        self._snapshots[board] = snap
+        if prev is None or prev.content_hash != snap.content_hash:
+            self._notify(board)
+        return snap
+
+    def _resume_sync(self, board, item_ids, columns, watermark):
+        """Point the board's sync at a shared generation (ids and watermark
+        only), replacing whatever it held."""
+        board_id, _, fields, _ = BOARDS[board]
+        sync = get_board_sync(board_id)
+        sync.set_fields(board_item_fields(columns, fields))
+        sync.restore(item_ids, watermark, force=True)
+
+    def _snapshot_from(self, board, mapped, cube=None):
+        snap = BoardSnapshot(board, [], mapped.columns, mapped.df, cube=cube, loaded_at=mapped.saved_at)
+        snap.generation, snap.stamp, snap.watermark = mapped.generation, mapped.stamp, mapped.watermark
+        return snap
+
+    def _publish(self, board, snap, watermark):
+        """Publish a freshly loaded snapshot and return its mapped version
+        (or `snap` itself when the file cannot be written)."""
+        mapped = self.shared.publish(board, snap.df, snap.columns, watermark)
+        if mapped is None:
+            return snap
+        # the cube is already built: drop the raw items from the sync, as
+        # the next refresh resumes from the ids and watermark
+        self._resume_sync(board, mapped.df.index, mapped.columns, watermark)
+        return self._snapshot_from(board, mapped, cube=snap.cube)
+
+    def _map_shared(self, board):
+        """Install the shared file's generation if it is newer than ours;
+        return the current snapshot. Caller holds the lock."""
+        snap = self._snapshots.get(board)
+        stamp = self.shared.stamp(board)
+        if stamp is None or (snap is not None and snap.stamp == stamp):
+            return snap
+        mapped = self.shared.open(board)
+        if mapped is None:
+            return snap
+        column_registry.seed(BOARDS[board][0], mapped.columns, fetched_at=mapped.saved_at)
+        new = self._snapshot_from(board, mapped)
+        self._snapshots[board] = new
+        if snap is None or snap.content_hash != new.content_hash:
+            self._notify(board)
+        logger.info('mapped shared %s snapshot generation %d (%d rows, saved %.0fs ago)',
+                    board, new.generation, len(new.df), time.time() - new.loaded_at)
+        return new
+
+    def _get_shared(self, board):
+        """`get` in shared mode. Caller holds the lock."""
+        snap = self._map_shared(board)
+        if self._fresh(snap):
+            return snap
+        with self.shared.lock(board):
+            # another process may have refreshed the board while we waited
+            snap = self._map_shared(board)
+            if self._fresh(snap):
+                return snap
+            return self._load(board, snap)
+
+    def _warm_start(self, board):
+        """Install the stored snapshot for `board`, if any. Caller holds the lock."""
+        self._warm_checked.add(board)
+        stored = self.store.load(board) if self.store is not None else None
+        if stored is None:
+            return None
+        board_id, _, fields, _ = BOARDS[board]
+        sync = get_board_sync(board_id)
+        # same projection as the stored snapshot, so the refresh can be a delta
+        sync.set_fields(board_item_fields(stored.columns, fields))
+        sync.restore(stored.df.index, stored.watermark)
+        column_registry.seed(board_id, stored.columns, fetched_at=stored.saved_at)
+        # counts as fresh until the background refresh replaces it
+        snap = BoardSnapshot(board, [], stored.columns, stored.df)
+        self._snapshots[board] = snap
+        self._notify(board)
+        logger.info('warm start: serving stored %s snapshot (%d rows, saved %.0fs ago)',
+                    board, len(stored.df), time.time() - stored.saved_at)
+        threading.Thread(target=self._background_refresh, args=(board,),
+                         name=f'snapshot-refresh-{board}', daemon=True).start()
+        return snap
+
+    def _background_refresh(self, board):
+        with self._locks[board]:
+            try:
+                self._load(board, self._snapshots.get(board))
+            except Exception as e:
+                logger.exception('background refresh of %s failed: %s', board, e)
+
+    def get(self, board):
+        """Return a fresh snapshot for `board`, loading it if needed."""
+        snap = self.current(board)
+        if snap is not None:
+            return snap
+        with self._locks[board]:
+            if self.shared is not None:
+                return self._get_shared(board)
+            # another thread may have finished the load while we waited
+            snap = self._snapshots.get(board)
+            if self._fresh(snap):
+                return snap
+            if snap is None and board not in self._warm_checked:
+                warm = self._warm_start(board)
+                if warm is not None:
+                    return warm
+            return self._load(board, snap)
+
+    def peek(self, board):
+        """Return the current snapshot without loading (None if never loaded)."""
+        return self._snapshots.get(board)
+
+    def invalidate(self, board=None):
+        """Expire one board (or all boards); the next `get` reloads it,
+        including its column metadata."""
+        boards = [board] if board else list(BOARDS)
+        for b in boards:
+            snap = self._snapshots.pop(b, None)
+            if self.shared is not None and b in BOARDS:
+                # the shared file is as old as our copy: refetch, don't remap it
+                self._expired[b] = max(snap.generation if snap else 0, self.shared.generation(b))
+            if b in BOARDS:
+                column_registry.invalidate(BOARDS[b][0])
+
+
+snapshots = SnapshotCache()
+
+
+def get_snapshot(board):
+    return snapshots.get(board)
+
+
+def get_deals_snapshot():
+    return snapshots.get(DEALS)
+
+
+def get_work_orders_snapshot():
+    return snapshots.get(WORK_ORDERS)
+
+
+def invalidate(board=None):
+    snapshots.invalidate(board)
+
+
+async def get_snapshot_async(board):
+    """Async `get_snapshot`. A fresh snapshot is returned inline; otherwise the
+    fetch and the CPU-bound cleaning run in the default executor so the event
+    loop keeps serving other requests."""
+    snap = snapshots.current(board)
+    if snap is not None:
+        return snap
+    return await asyncio.to_thread(snapshots.get, board)
+
+
+async def get_snapshots_async(*boards):
+    """Load several boards concurrently; returns snapshots in argument order."""
+    return await asyncio.gather(*(get_snapshot_async(b) for b in boards))
+
+
+def preload():
+    """Serve stored snapshots from the start (no-op when the store is empty).
+
+    Call once at process startup; the refresh runs in the background.
+    """
+    for board in BOARDS:
+        with snapshots._locks[board]:
+            if snapshots.peek(board) is None and board not in snapshots._warm_checked:
+                snapshots._warm_start(board)
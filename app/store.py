@@ -0,0 +1,121 @@
+"""On-disk snapshot store for warm starts.
+
+After every load the cleaned board frame is written to `SNAPSHOT_STORE_DIR`
+as Parquet (or a pandas pickle when pyarrow is not installed) next to a small
+JSON file with the column metadata and the sync watermark. A fresh process
+reads these back on its first request and serves them straight away while
+the boards are refreshed in the background.
+
+Files are written to a temporary name and renamed into place, so a reader
+never sees a half-written snapshot.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from app.config import SNAPSHOT_STORE_DIR
+from app.fileutil import atomic_write
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    HAS_PARQUET = True
+except Exception:
+    HAS_PARQUET = False
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+
+
+class StoredSnapshot:
+    """What a warm start gets back from the store."""
+
+    def __init__(self, board, df, columns, watermark, saved_at):
+        self.board = board
+        self.df = df
+        self.columns = columns
+        self.watermark = watermark
+        self.saved_at = saved_at
+
+
+class SnapshotStore:
+    def __init__(self, directory=SNAPSHOT_STORE_DIR):
+        self.directory = directory
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def _paths(self, board):
+        data = os.path.join(self.directory, f"{board}.{'parquet' if HAS_PARQUET else 'pkl'}")
+        meta = os.path.join(self.directory, f"{board}.meta.json")
+        return data, meta
+
+    def save(self, board, df, columns, watermark=None):
+        """Persist one board. Errors are logged, never raised."""
+        if not self.enabled:
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            data_path, meta_path = self._paths(board)
+            if HAS_PARQUET:
+                atomic_write(data_path, lambda p: df.to_parquet(p))
+            else:
+                atomic_write(data_path, lambda p: df.to_pickle(p))
+            meta = {
+                'version': STORE_VERSION,
+                'board': board,
+                'rows': int(len(df)),
+                'columns': columns,
+                'watermark': watermark.isoformat() if watermark else None,
+                'saved_at': time.time(),
+            }
+
+            def write_meta(p):
+                with open(p, 'w') as f:
+                    json.dump(meta, f, default=str)
+            # meta goes last: it is what marks the snapshot as complete
+            atomic_write(meta_path, write_meta)
+            return True
+        except Exception as e:
+            logger.warning('could not save %s snapshot to %s: %s', board, self.directory, e)
+            return False
+
+    def load(self, board):
+        """Return a `StoredSnapshot` or None when nothing usable is stored."""
+        if not self.enabled:
+            return None
+        data_path, meta_path = self._paths(board)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('version') != STORE_VERSION:
+                return None
+            df = pd.read_parquet(data_path) if HAS_PARQUET else pd.read_pickle(data_path)
+            watermark = meta.get('watermark')
+            return StoredSnapshot(
+                board,
+                df,
+                meta.get('columns') or [],
+                datetime.fromisoformat(watermark) if watermark else None,
+                meta.get('saved_at') or 0.0,
+            )
+        except Exception as e:
+            logger.warning('could not load stored %s snapshot: %s', board, e)
+            return None
+
+    def clear(self, board):
+        for path in self._paths(board):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+snapshot_store = SnapshotStore()
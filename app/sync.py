@@ -0,0 +1,185 @@
+"""Incremental (delta) sync of monday.com boards.
+
+A `BoardSync` keeps a local snapshot of a board's raw items keyed by item id
+plus a last-sync watermark. The first refresh downloads the whole board;
+later refreshes only ask monday.com for items updated since the watermark
+and for removals recorded in the board activity log, so their cost tracks
+the number of changed rows rather than the size of the board.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.config import DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
+from app.monday_client import (
+    iter_board_items,
+    item_fields,
+    fetch_board_item_ids,
+    fetch_removed_item_ids,
+)
+from app.transport import MondayError
+
+logger = logging.getLogger(__name__)
+
+# Re-read a little before the watermark to absorb clock skew between us and
+# monday.com. Upserts are idempotent so the overlap only costs a few rows.
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# Every N delta refreshes, reconcile deletions against the full id list in
+# case an activity log entry was missed.
+FULL_SWEEP_EVERY = 20
+
+
+class BoardSync:
+    """Local snapshot of one board kept up to date by delta refreshes."""
+
+    def __init__(self, board_id, full_sweep_every=FULL_SWEEP_EVERY):
+        self.board_id = board_id
+        self.full_sweep_every = full_sweep_every
+        self.items = {}
+        self.watermark = None
+        # True while some items are id-only stubs restored from disk
+        self.partial = False
+        # GraphQL item selection used for every fetch (see `set_fields`)
+        self.fields = item_fields()
+        self._deltas_since_sweep = 0
+        self._lock = threading.Lock()
+
+    def set_fields(self, fields):
+        """Change the item selection (e.g. a column projection).
+
+        Items already held were fetched with the old selection and may lack
+        columns the new one asks for, so a change drops them and the next
+        refresh is a full download. Returns True when the selection changed.
+        """
+        with self._lock:
+            if fields == self.fields:
+                return False
+            self.fields = fields
+            self.items = {}
+            self.watermark = None
+            self.partial = False
+            self._deltas_since_sweep = 0
+            return True
+
+    def reset(self):
+        """Drop the local snapshot; the next refresh is a full download."""
+        with self._lock:
+            self.items = {}
+            self.watermark = None
+            self.partial = False
+            self._deltas_since_sweep = 0
+
+    def restore(self, item_ids, watermark, force=False):
+        """Resume from a persisted snapshot: know the item ids and watermark
+        without their payloads, so the next refresh can be a delta.
+
+        Ignored once this sync has a watermark of its own, unless `force`:
+        then the held items are replaced, e.g. by a generation another
+        process published (app.shared)."""
+        with self._lock:
+            if watermark is None or (self.watermark is not None and not force):
+                return
+            self.items = {str(i): {'id': str(i)} for i in item_ids}
+            self.watermark = watermark
+            self.partial = True
+            self._deltas_since_sweep = 0
+
+    def refresh(self):
+        """Bring the snapshot up to date and return a small stats dict.
+
+        Stats keys: full (bool), upserted, removed, total, plus the sets
+        upserted_ids / removed_ids for delta refreshes so downstream caches
+        can update incrementally.
+        """
+        with self._lock:
+            started = datetime.now(timezone.utc)
+            if self.watermark is None:
+                items = {}
+                for item in iter_board_items(self.board_id, fields=self.fields):
+                    items[str(item.get('id'))] = item
+                self.items = items
+                self.watermark = started - WATERMARK_OVERLAP
+                self.partial = False
+                self._deltas_since_sweep = 0
+                return {'full': True, 'upserted': len(items), 'removed': 0, 'total': len(items),
+                        'upserted_ids': set(items), 'removed_ids': set()}
+
+            since = self.watermark
+            # build the new snapshot on a copy so a failed refresh leaves the
+            # previous one intact
+            items = dict(self.items)
+            upserted_ids = set()
+            for item in iter_board_items(self.board_id, updated_since=since, fields=self.fields):
+                item_id = str(item.get('id'))
+                items[item_id] = item
+                upserted_ids.add(item_id)
+
+            removed_ids = set()
+            self._deltas_since_sweep += 1
+            if self._deltas_since_sweep >= self.full_sweep_every:
+                live = fetch_board_item_ids(self.board_id)
+                removed_ids = set(items) - live
+                self._deltas_since_sweep = 0
+            else:
+                try:
+                    removed_ids = fetch_removed_item_ids(self.board_id, since)
+                except Exception as e:
+                    logger.warning('activity log read failed for board %s, falling back to id sweep: %s',
+                                   self.board_id, e)
+                    live = fetch_board_item_ids(self.board_id)
+                    removed_ids = set(items) - live
+                    self._deltas_since_sweep = 0
+
+            removed_ids = {item_id for item_id in removed_ids if items.pop(item_id, None) is not None}
+            upserted_ids -= removed_ids
+
+            self.items = items
+            self.watermark = started - WATERMARK_OVERLAP
+            return {'full': False, 'upserted': len(upserted_ids), 'removed': len(removed_ids), 'total': len(items),
+                    'upserted_ids': upserted_ids, 'removed_ids': removed_ids}
+
+    def item_list(self):
+        """Return the snapshot items as a list; items added by deltas come last."""
+        return list(self.items.values())
+
+
+_syncs = {}
+_syncs_lock = threading.Lock()
+
+
+def get_board_sync(board_id):
+    """Return the process-wide `BoardSync` for a board id."""
+    with _syncs_lock:
+        sync = _syncs.get(board_id)
+        if sync is None:
+            sync = BoardSync(board_id)
+            _syncs[board_id] = sync
+        return sync
+
+
+def sync_board_items(board_id, label='items'):
+    """Refresh a board's snapshot and return its items.
+
+    On a failed refresh the last good snapshot is returned instead, so a
+    transient monday.com error does not blank out the board. With no
+    snapshot yet the `MondayError` is raised.
+    """
+    sync = get_board_sync(board_id)
+    try:
+        stats = sync.refresh()
+        logger.debug('synced %s: %d upserted, %d removed, %d total',
+                     label, stats['upserted'], stats['removed'], stats['total'])
+    except MondayError as e:
+        if sync.watermark is None:
+            raise
+        logger.warning('error syncing %s, serving the last snapshot: %s', label, e, exc_info=True)
+    return sync.item_list()
+
+
+def sync_deals():
+    return sync_board_items(DEALS_BOARD_ID, label='deals')
+
+
+def sync_work_orders():
+    return sync_board_items(WORK_ORDERS_BOARD_ID, label='work orders')
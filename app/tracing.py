@@ -0,0 +1,283 @@
+"""Lightweight stage tracing and Prometheus-style histograms.
+
+Wrap a stage in a span to time it:
+
+    with span('clean.deals') as s:
+        df = ...
+        s.add(rows=len(df))
+
+or decorate a function with `@traced('metrics.deals')`. Every finished span
+feeds process-wide histograms, labelled by stage:
+
+    app_stage_seconds          latency
+    app_stage_rows             rows handled (when the span reports `rows`)
+    app_stage_bytes            payload bytes (`bytes`)
+    app_llm_tokens             prompt / completion tokens (`prompt_tokens`,
+                               `completion_tokens`), labelled by kind
+
+and a counter of failed stage calls, `app_stage_errors_total` (spans left by
+an exception, or recorded with an `error` attribute).
+
+`render_prometheus()` returns them in the Prometheus text format (served at
+GET /metrics by app/main.py).
+
+Spans opened inside `with trace() as t:` are also collected on `t`, so one
+request can report where its time went (`t.breakdown()`). The trace lives in
+a contextvar: it follows asyncio tasks and `asyncio.to_thread`, but not work
+handed to other threads (e.g. a board load another request started).
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+TOKEN_BUCKETS = (10, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set."""
+
+    def __init__(self, name, help, buckets, labels=('stage',)):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for values, series in sorted(self.snapshot().items()):
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            sep = ',' if labels else ''
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {series[-2]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-1]:.6g}')
+            lines.append(f'{self.name}_count{{{labels}}} {series[-2]}')
+        return '\n'.join(lines)
+
+
+class Counter:
+    """Monotonic counter with one series per label set."""
+
+    def __init__(self, name, help, labels=('stage',)):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._series)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for values, count in sorted(self.snapshot().items()):
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            lines.append(f'{self.name}{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+stage_seconds = Histogram('app_stage_seconds', 'Time spent per stage.', SECONDS_BUCKETS)
+stage_rows = Histogram('app_stage_rows', 'Rows handled per stage call.', COUNT_BUCKETS)
+stage_bytes = Histogram('app_stage_bytes', 'Payload bytes per stage call.', BYTES_BUCKETS)
+llm_tokens = Histogram('app_llm_tokens', 'Estimated model tokens per call.', TOKEN_BUCKETS, ('stage', 'kind'))
+http_seconds = Histogram('app_http_request_seconds', 'HTTP request latency.', SECONDS_BUCKETS, ('path',))
+
+stage_errors = Counter('app_stage_errors_total', 'Stage calls that failed.')
+
+HISTOGRAMS = [stage_seconds, stage_rows, stage_bytes, llm_tokens, http_seconds, stage_errors]
+
+
+class Span:
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.attrs = {}
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def add(self, **counts):
+        """Add to this span's numeric attributes (rows, bytes, tokens...)."""
+        for k, v in counts.items():
+            if v is not None:
+                self.attrs[k] = self.attrs.get(k, 0) + v
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """Spans finished while this trace was active, in finishing order."""
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def breakdown(self):
+        """Per stage: calls, total ms and summed counters, slowest first."""
+        stages = {}
+        for s in list(self.spans):
+            entry = stages.setdefault(s.name, {'stage': s.name, 'calls': 0, 'ms': 0.0})
+            entry['calls'] += 1
+            entry['ms'] += s.seconds * 1000
+            for k, v in s.attrs.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    entry[k] = entry.get(k, 0) + v
+        out = sorted(stages.values(), key=lambda e: e['ms'], reverse=True)
+        for e in out:
+            e['ms'] = round(e['ms'], 1)
+        return out
+
+    def server_timing(self):
+        """The breakdown as a Server-Timing header value."""
+        return ', '.join(f"{e['stage'].replace('.', '_')};dur={e['ms']}" for e in self.breakdown())
+
+
+_current_span = contextvars.ContextVar('tracing_span', default=None)
+_current_trace = contextvars.ContextVar('tracing_trace', default=None)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the block as stage `name`; yields the Span for `add()`/`set()`."""
+    parent = _current_span.get()
+    s = Span(name, parent)
+    s.attrs.update(attrs)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.set(error=type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        s.seconds = time.perf_counter() - s.started
+        _finish(s)
+
+
+def _finish(s):
+    stage_seconds.observe(s.seconds, s.name)
+    if 'rows' in s.attrs:
+        stage_rows.observe(s.attrs['rows'], s.name)
+    if 'bytes' in s.attrs:
+        stage_bytes.observe(s.attrs['bytes'], s.name)
+    for kind in ('prompt', 'completion'):
+        if f'{kind}_tokens' in s.attrs:
+            llm_tokens.observe(s.attrs[f'{kind}_tokens'], s.name, kind)
+    if s.attrs.get('error'):
+        stage_errors.inc(s.name)
+    t = _current_trace.get()
+    if t is not None:
+        t._record(s)
+
+
+def traced(name):
+    """Decorator form of `span`. Works on plain and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, seconds, **attrs):
+    """Record an already-timed stage, e.g. a stream that cannot keep a span
+    open across its yields."""
+    s = Span(name)
+    s.attrs.update(attrs)
+    s.seconds = seconds
+    _finish(s)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def add(**counts):
+    """Add counters to the innermost open span (no-op outside a span)."""
+    s = _current_span.get()
+    if s is not None:
+        s.add(**counts)
+
+
+@contextmanager
+def trace():
+    """Collect every span finished inside the block on a new Trace."""
+    t = Trace()
+    token = _current_trace.set(t)
+    try:
+        yield t
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def render_prometheus():
+    return '\n'.join(h.render() for h in HISTOGRAMS) + '\n'
+
+
+def reset():
+    """Clear every histogram and counter (tests, benchmarks)."""
+    for h in HISTOGRAMS:
+        h.clear()
@@ -0,0 +1,270 @@
+"""HTTP transport for the monday.com GraphQL API.
+
+`MondayTransport` owns one keep-alive `requests.Session` (pooled connections,
+gzip responses), applies connect/read timeouts and retries transient
+failures with jittered exponential backoff. Every query also asks monday.com
+for its `complexity` block, so the transport knows how much of the
+per-minute complexity budget is left and waits for the reset *before*
+sending a query that would not fit, instead of getting rejected.
+
+Failures surface as `MondayError` subclasses rather than empty results, so
+callers can tell "the board is empty" from "we were rate limited".
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import (
+    MONDAY_API_KEY,
+    MONDAY_API_URL,
+    MONDAY_API_VERSION,
+    MONDAY_CONNECT_TIMEOUT,
+    MONDAY_READ_TIMEOUT,
+    MONDAY_MAX_RETRIES,
+)
+from app import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class MondayError(Exception):
+    """Base class for monday.com API failures."""
+
+    def __init__(self, message, status=None, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors or []
+
+
+class MondayAuthError(MondayError):
+    """The API token is missing, invalid or lacks access (not retried)."""
+
+
+class MondayRateLimitError(MondayError):
+    """Rate or complexity limit still hit after all retries."""
+
+    def __init__(self, message, retry_after=None, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class MondayQueryError(MondayError):
+    """The API rejected the query itself (not retried)."""
+
+
+class MondayTransportError(MondayError):
+    """Network failure, timeout or 5xx response after all retries."""
+
+
+# GraphQL error codes that mean "slow down", across API versions
+RATE_LIMIT_CODES = {
+    'COMPLEXITY_BUDGET_EXHAUSTED',
+    'ComplexityException',
+    'RATE_LIMIT_EXCEEDED',
+    'Rate Limit Exceeded',
+    'IP_RATE_LIMIT_EXCEEDED',
+    'maxConcurrencyExceeded',
+    'DAILY_LIMIT_EXCEEDED',
+}
+AUTH_CODES = {'UNAUTHORIZED', 'USER_UNAUTHORIZED', 'Unauthorized'}
+
+_RESET_IN = re.compile(r'reset in (\d+) seconds', re.IGNORECASE)
+
+COMPLEXITY_FIELDS = 'complexity { before after query reset_in_x_seconds }'
+
+
+def with_complexity(query):
+    """Add the `complexity` block to a read query (mutations are left alone)."""
+    stripped = query.lstrip()
+    if stripped.startswith('mutation') or 'complexity {' in query:
+        return query
+    brace = query.find('{')
+    if brace < 0:
+        return query
+    return query[:brace + 1] + '\n        ' + COMPLEXITY_FIELDS + query[brace + 1:]
+
+
+def _error_code(err):
+    ext = err.get('extensions') or {}
+    return ext.get('code') or err.get('error_code') or err.get('code')
+
+
+def _retry_after(err, default=None):
+    """Seconds to wait according to an error payload, if it says."""
+    ext = err.get('extensions') or {}
+    for key in ('retry_in_seconds', 'reset_in_x_seconds'):
+        if ext.get(key) is not None:
+            return float(ext[key])
+    m = _RESET_IN.search(err.get('message') or err.get('error_message') or '')
+    if m:
+        return float(m.group(1))
+    return default
+
+
+class MondayTransport:
+    def __init__(self, url=MONDAY_API_URL, token=MONDAY_API_KEY, api_version=MONDAY_API_VERSION,
+                 connect_timeout=MONDAY_CONNECT_TIMEOUT, read_timeout=MONDAY_READ_TIMEOUT,
+                 max_retries=MONDAY_MAX_RETRIES, backoff_base=0.5, backoff_cap=30.0,
+                 pool_size=10, budget_reserve=5000, sleep=time.sleep):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.budget_reserve = budget_reserve
+        self.sleep = sleep
+
+        self.session = requests.Session()
+        # retries are handled here, with monday-aware waits
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'API-Version': api_version,
+        })
+        if token:
+            self.session.headers['Authorization'] = token
+
+        # complexity budget as last reported by monday.com
+        self._budget_lock = threading.Lock()
+        self.budget_remaining = None
+        self.budget_reset_at = 0.0
+        self.last_query_cost = 0
+
+        self.stats = {'requests': 0, 'retries': 0, 'throttled_s': 0.0, 'bytes': 0}
+
+    # -- budget -----------------------------------------------------------------
+
+    def _throttle(self):
+        """Wait for the budget reset if the next query is unlikely to fit."""
+        with self._budget_lock:
+            remaining = self.budget_remaining
+            need = self.last_query_cost + self.budget_reserve
+            wait = self.budget_reset_at - time.monotonic()
+        if remaining is not None and remaining < need and wait > 0:
+            logger.info('complexity budget low (%s left, need ~%s); waiting %.1fs for reset',
+                        remaining, need, wait)
+            self.stats['throttled_s'] += wait
+            self.sleep(wait)
+            with self._budget_lock:
+                self.budget_remaining = None
+
+    def _record_complexity(self, data):
+        cx = (data or {}).get('complexity') if isinstance(data, dict) else None
+        if not cx:
+            return
+        with self._budget_lock:
+            if cx.get('after') is not None:
+                self.budget_remaining = cx['after']
+            if cx.get('query') is not None:
+                self.last_query_cost = cx['query']
+            if cx.get('reset_in_x_seconds') is not None:
+                self.budget_reset_at = time.monotonic() + float(cx['reset_in_x_seconds'])
+
+    def _backoff(self, attempt, hint=None):
+        if hint is not None:
+            return hint + random.uniform(0, 1.0)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    # -- requests ---------------------------------------------------------------
+
+    def _classify(self, resp):
+        """Return (parsed body, error to raise or None, retryable, wait hint)."""
+        status = resp.status_code
+        if status in (401, 403):
+            return None, MondayAuthError(f'monday.com rejected the API token (HTTP {status})', status=status), False, None
+        if status == 429:
+            hint = resp.headers.get('Retry-After')
+            hint = float(hint) if hint and hint.replace('.', '', 1).isdigit() else None
+            return None, MondayRateLimitError('monday.com rate limit (HTTP 429)', retry_after=hint, status=status), True, hint
+        if status >= 500:
+            return None, MondayTransportError(f'monday.com server error (HTTP {status})', status=status), True, None
+        try:
+            body = resp.json()
+        except ValueError:
+            return None, MondayTransportError(f'invalid JSON from monday.com (HTTP {status})', status=status), True, None
+
+        errors = body.get('errors') or []
+        if not errors and body.get('error_code'):
+            # pre-2024 error envelope
+            errors = [body]
+        if errors:
+            first = errors[0]
+            code = _error_code(first)
+            message = first.get('message') or first.get('error_message') or str(code)
+            if code in RATE_LIMIT_CODES:
+                hint = _retry_after(first)
+                return body, MondayRateLimitError(message, retry_after=hint, status=status, errors=errors), True, hint
+            if code in AUTH_CODES:
+                return body, MondayAuthError(message, status=status, errors=errors), False, None
+            if not body.get('data'):
+                return body, MondayQueryError(message, status=status, errors=errors), False, None
+            logger.warning('monday.com partial errors: %s', message)
+        if status >= 400:
+            return body, MondayQueryError(f'monday.com request failed (HTTP {status})', status=status), False, None
+        return body, None, False, None
+
+    def execute(self, query, variables=None):
+        """Run a GraphQL query and return the response body (with `data`)."""
+        payload = {'query': with_complexity(query)}
+        if variables:
+            payload['variables'] = variables
+        body_bytes = json.dumps(payload).encode('utf-8')
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            hint = None
+            try:
+                self.stats['requests'] += 1
+                resp = self.session.post(self.url, data=body_bytes, timeout=self.timeout)
+                self.stats['bytes'] += len(resp.content)
+                tracing.add(bytes=len(resp.content))
+                body, error, retryable, hint = self._classify(resp)
+                if body is not None:
+                    self._record_complexity(body.get('data'))
+                if error is None:
+                    return body
+                if not retryable:
+                    raise error
+                last_error = error
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = MondayTransportError(f'monday.com request failed: {e}')
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                wait = self._backoff(attempt, hint)
+                logger.info('retrying monday.com request in %.1fs (%s)', wait, last_error)
+                self.sleep(wait)
+        raise last_error
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide transport, created on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = MondayTransport()
+    return _transport
+
+
+def set_transport(transport):
+    """Swap the process-wide transport (e.g. to point at a local stand-in)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -0,0 +1,4 @@
+"""Offline benchmarks for the fetch -> clean -> metrics -> answer pipeline.
+
+Run a benchmark with e.g. `python -m bench.bench_cleaner`.
+"""
@@ -0,0 +1,68 @@
+"""Row-wise vs columnar cleaning throughput.
+
+    python -m bench.bench_cleaner [--rows 10000 100000] [--repeat 3]
+"""
+import argparse
+import logging
+import time
+
+from app.cleaner import (
+    clean_deals_rows,
+    clean_work_orders_rows,
+    clean_deals_frame,
+    clean_work_orders_frame,
+    clean_deals,
+)
+from bench.synthetic import make_items, make_columns
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, repeat=3):
+    results = []
+    for n in rows:
+        for board, rowwise, columnar in (
+            ('deals', clean_deals_rows, clean_deals_frame),
+            ('work_orders', clean_work_orders_rows, clean_work_orders_frame),
+        ):
+            items = make_items(board, n)
+            cols = make_columns(board)
+            t_rows = best_of(lambda: rowwise(items, cols), repeat)
+            t_cols = best_of(lambda: columnar(items, cols), repeat)
+            results.append({
+                'board': board,
+                'rows': n,
+                'rowwise_s': t_rows,
+                'columnar_s': t_cols,
+                'speedup': t_rows / t_cols if t_cols else float('inf'),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    # the row-wise path logs every unparseable amount; that would dominate the timing
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'board':<12} {'rows':>8} {'row-wise':>10} {'columnar':>10} {'speedup':>8}")
+    for r in run(args.rows, args.repeat):
+        print(f"{r['board']:<12} {r['rows']:>8} {r['rowwise_s']:>9.3f}s {r['columnar_s']:>9.3f}s {r['speedup']:>7.1f}x")
+
+    # also time the records path current callers use
+    items, cols = make_items('deals', args.rows[0]), make_columns('deals')
+    t = best_of(lambda: clean_deals(items, cols), args.repeat)
+    print(f"clean_deals (columnar + RecordTable), {args.rows[0]} rows: {t:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Full vs projected item payloads: bytes on the wire and JSON decode time.
+
+    python -m bench.bench_fetch [--rows 10000] [--extra-columns 30] [--repeat 3]
+
+Pages are produced by the local stand-in (bench.monday_standin) from the same
+queries app.monday_client sends, then serialized, gzipped and decoded here,
+so the numbers cover payload size and parsing but not network latency.
+"""
+import argparse
+import gzip
+import json
+import logging
+import time
+
+from app.cleaner import clean_deals_frame, clean_work_orders_frame, DEALS_FIELDS, WORK_ORDERS_FIELDS
+from app.monday_client import DEFAULT_PAGE_SIZE, item_fields, _items_query, _next_items_query
+from app.snapshot import board_item_fields
+from bench.monday_standin import StandIn
+from bench.synthetic import make_items, make_columns
+
+BOARDS = {
+    'deals': (clean_deals_frame, DEALS_FIELDS),
+    'work_orders': (clean_work_orders_frame, WORK_ORDERS_FIELDS),
+}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def page_bodies(standin, board_id, fields, page_size=DEFAULT_PAGE_SIZE):
+    """Serialized response bodies for every page of a board."""
+    bodies = []
+    _, body = standin.resolve(_items_query(board_id, page_size, fields=fields))
+    while True:
+        bodies.append(json.dumps(body).encode('utf-8'))
+        page = body['data'].get('next_items_page') or body['data']['boards'][0]['items_page']
+        if not page['cursor']:
+            return bodies
+        _, body = standin.resolve(_next_items_query(page['cursor'], page_size, fields))
+
+
+def decode(bodies):
+    items = []
+    for raw in bodies:
+        data = json.loads(raw)['data']
+        page = data.get('next_items_page') or data['boards'][0]['items_page']
+        items.extend(page['items'])
+    return items
+
+
+def measure(standin, fields, cleaner, columns, repeat):
+    bodies = page_bodies(standin, '1', fields)
+    items = decode(bodies)
+    return {
+        'bytes': sum(len(b) for b in bodies),
+        'gzip_bytes': sum(len(gzip.compress(b, compresslevel=5)) for b in bodies),
+        'decode_s': best_of(lambda: decode(bodies), repeat),
+        'clean_s': best_of(lambda: cleaner(items, columns), repeat),
+    }
+
+
+def run(rows, extra_columns=30, repeat=3):
+    results = []
+    for board, (cleaner, fields) in BOARDS.items():
+        columns = make_columns(board, extra_columns)
+        items = make_items(board, rows, extra_columns)
+        standin = StandIn({'1': (board, columns, items)}, budget=float('inf'))
+        try:
+            full = measure(standin, item_fields(), cleaner, columns, repeat)
+            projected = measure(standin, board_item_fields(columns, fields), cleaner, columns, repeat)
+        finally:
+            standin.stop()
+        results.append({'board': board, 'rows': rows, 'full': full, 'projected': projected})
+    return results
+
+
+def _mb(n):
+    return f"{n / 1e6:.1f}MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--extra-columns', type=int, default=30,
+                        help='unmapped long-text columns per item (board width)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{args.rows} rows, {args.extra_columns} unmapped columns per item")
+    print(f"{'board':<12} {'mode':<10} {'json':>9} {'gzip':>9} {'decode':>9} {'clean':>9}")
+    for r in run(args.rows, args.extra_columns, args.repeat):
+        for mode in ('full', 'projected'):
+            m = r[mode]
+            print(f"{r['board']:<12} {mode:<10} {_mb(m['bytes']):>9} {_mb(m['gzip_bytes']):>9} "
+                  f"{m['decode_s']:>8.3f}s {m['clean_s']:>8.3f}s")
+        f, p = r['full'], r['projected']
+        print(f"{'':<12} {'ratio':<10} {f['bytes'] / p['bytes']:>8.1f}x {f['gzip_bytes'] / p['gzip_bytes']:>8.1f}x "
+              f"{f['decode_s'] / p['decode_s']:>8.1f}x {f['clean_s'] / p['clean_s']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
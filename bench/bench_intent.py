@@ -0,0 +1,131 @@
+"""Rule-based intent matcher vs the intent model on a labelled corpus.
+
+    python -m bench.bench_intent [--live] [--llm-latency 0.8] [--repeat 200]
+
+For every question in bench/intent_corpus.jsonl this reports what the rule
+matcher (app.intent_rules) returns, its confidence and its latency. Answers
+at or above RULES_MIN_CONFIDENCE count as handled by the rules; the rest go
+to the model. With --live the model path is the real Gemini call (needs
+GEMINI_API_KEY) and its accuracy is measured too; without it the model is
+assumed correct and to take --llm-latency seconds, which is enough to see
+the end-to-end latency of the rules-first path.
+"""
+import argparse
+import json
+import os
+import time
+
+from app.intent_rules import match_intent, RULES_MIN_CONFIDENCE
+from bench.synthetic import SECTORS
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'intent_corpus.jsonl')
+
+
+def load_corpus(path=CORPUS):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def correct(intent, label):
+    if not intent:
+        return False
+    sector = (intent.get('sector') or None)
+    sector = sector.lower() if isinstance(sector, str) else sector
+    return (intent.get('board') == label['board'] and intent.get('metric') == label['metric']
+            and sector == label['sector'])
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(corpus, sectors, repeat=200, live=False, llm_latency=0.8):
+    rows = []
+    model_intent = None
+    if live:
+        from app.llm import model_intent
+    for label in corpus:
+        q = label['question']
+        intent, confidence = match_intent(q, sectors)
+        row = {
+            'question': q,
+            'rules': intent,
+            'confidence': confidence,
+            'confident': intent is not None and confidence >= RULES_MIN_CONFIDENCE,
+            'rules_ok': correct(intent, label),
+            'rules_s': best_of(lambda: match_intent(q, sectors), repeat),
+        }
+        if live:
+            start = time.perf_counter()
+            try:
+                llm = model_intent(q)
+            except Exception:
+                llm = None
+            row['llm_s'] = time.perf_counter() - start
+            row['llm_ok'] = correct(llm, label)
+        else:
+            row['llm_s'] = llm_latency
+            row['llm_ok'] = True
+        rows.append(row)
+    return rows
+
+
+def summarize(rows):
+    n = len(rows)
+    confident = [r for r in rows if r['confident']]
+    rules_first = [r['rules_s'] if r['confident'] else r['rules_s'] + r['llm_s'] for r in rows]
+    blended_ok = [r['rules_ok'] if r['confident'] else r['llm_ok'] for r in rows]
+    return {
+        'questions': n,
+        'rules_coverage': len(confident) / n,
+        'rules_accuracy_when_confident': sum(r['rules_ok'] for r in confident) / len(confident) if confident else 0.0,
+        'rules_accuracy_overall': sum(r['rules_ok'] for r in rows) / n,
+        'llm_accuracy': sum(r['llm_ok'] for r in rows) / n,
+        'rules_first_accuracy': sum(blended_ok) / n,
+        'rules_mean_us': sum(r['rules_s'] for r in rows) / n * 1e6,
+        'llm_mean_s': sum(r['llm_s'] for r in rows) / n,
+        'rules_first_mean_s': sum(rules_first) / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--live', action='store_true', help='call the real intent model for comparison')
+    parser.add_argument('--llm-latency', type=float, default=0.8,
+                        help='assumed model latency in seconds when not --live')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='print the raw results as JSON')
+    args = parser.parse_args()
+
+    sectors = [s.strip().lower() for s in SECTORS if s.strip()]
+    rows = run(load_corpus(), sectors, args.repeat, args.live, args.llm_latency)
+    summary = summarize(rows)
+    if args.json:
+        print(json.dumps({'summary': summary, 'rows': rows}, indent=2, default=str))
+        return
+
+    print(f"{'question':<52} {'rules':<26} {'conf':>5} {'ok':>3} {'rules':>8} {'model':>8}")
+    for r in rows:
+        got = f"{r['rules']['metric']}/{r['rules']['sector']}" if r['rules'] else '-'
+        mark = ('y' if r['rules_ok'] else 'n') + ('' if r['confident'] else '*')
+        print(f"{r['question'][:52]:<52} {got[:26]:<26} {r['confidence']:>5.2f} {mark:>3} "
+              f"{r['rules_s'] * 1e6:>6.1f}us {r['llm_s']:>7.3f}s")
+    print('* = below confidence threshold, sent to the model')
+    print()
+    print(f"rules handle {summary['rules_coverage']:.0%} of questions, "
+          f"{summary['rules_accuracy_when_confident']:.0%} correct when confident "
+          f"(threshold {RULES_MIN_CONFIDENCE})")
+    model = 'measured' if args.live else 'assumed'
+    print(f"model accuracy ({model}): {summary['llm_accuracy']:.0%}; "
+          f"rules-first accuracy: {summary['rules_first_accuracy']:.0%}")
+    print(f"mean latency: rules {summary['rules_mean_us']:.1f}us, model {summary['llm_mean_s']:.3f}s ({model}), "
+          f"rules-first {summary['rules_first_mean_s']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
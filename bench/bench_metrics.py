@@ -0,0 +1,66 @@
+"""List-of-dicts vs DataFrame metrics engine.
+
+    python -m bench.bench_metrics [--rows 10000 100000] [--repeat 5]
+"""
+import argparse
+import logging
+import time
+
+from app.cleaner import clean_deals_frame, clean_work_orders_frame, to_records
+from app.metrics import (
+    compute_deals_metrics,
+    compute_work_orders_metrics,
+    compute_deals_metrics_by_quarter,
+    get_leadership_summary,
+)
+from bench.synthetic import make_items, make_columns
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows, repeat=5):
+    results = []
+    for n in rows:
+        deals_df = clean_deals_frame(make_items('deals', n), make_columns('deals'))
+        wo_df = clean_work_orders_frame(make_items('work_orders', n, seed=1), make_columns('work_orders'))
+        deals, wos = to_records(deals_df), to_records(wo_df)
+        cases = (
+            ('compute_deals_metrics', compute_deals_metrics, (deals,), (deals_df,)),
+            ('compute_deals_metrics_by_quarter', compute_deals_metrics_by_quarter, (deals,), (deals_df,)),
+            ('compute_work_orders_metrics', compute_work_orders_metrics, (wos,), (wo_df,)),
+            ('get_leadership_summary', get_leadership_summary, (deals, wos), (deals_df, wo_df)),
+        )
+        for name, fn, list_args, frame_args in cases:
+            t_list = best_of(lambda: fn(*list_args), repeat)
+            t_frame = best_of(lambda: fn(*frame_args), repeat)
+            results.append({
+                'function': name,
+                'rows': n,
+                'list_s': t_list,
+                'frame_s': t_frame,
+                'speedup': t_list / t_frame if t_frame else float('inf'),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'function':<34} {'rows':>8} {'list':>10} {'frame':>10} {'speedup':>8}")
+    for r in run(args.rows, args.repeat):
+        print(f"{r['function']:<34} {r['rows']:>8} {r['list_s']:>9.4f}s {r['frame_s']:>9.4f}s {r['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
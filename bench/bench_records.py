@@ -0,0 +1,86 @@
+"""Memory per row: list of dicts vs RecordTable for cleaned records.
+
+    python -m bench.bench_records [--rows 10000 100000]
+
+For each board, two numbers per shape (tracemalloc, bytes per row):
+
+    on_frame     extra memory on top of the cleaned frame a snapshot already
+                 holds (BoardSnapshot.cleaned)
+    standalone   everything the records keep alive once the frame is gone
+                 (clean_deals / clean_work_orders)
+
+plus the time to build each shape and to read every row through `.get()`.
+"""
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+
+from app.cleaner import clean_deals_frame, clean_work_orders_frame, to_records, to_record_table
+from bench.synthetic import make_items, make_columns
+
+BOARDS = (
+    ('deals', clean_deals_frame, 'amount'),
+    ('work_orders', clean_work_orders_frame, 'revenue'),
+)
+SHAPES = (('dicts', to_records), ('table', to_record_table))
+
+
+def traced_bytes(fn):
+    """(bytes still allocated after `fn`, its result): memory the result keeps."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def run(rows):
+    results = []
+    for n in rows:
+        for board, cleaner, value in BOARDS:
+            items, cols = make_items(board, n), make_columns(board)
+            df = cleaner(items, cols)
+            for shape, convert in SHAPES:
+                on_frame, records = traced_bytes(lambda: convert(df))
+                del records
+
+                def standalone():
+                    frame = cleaner(items, cols)
+                    return convert(frame)
+
+                alone, records = traced_bytes(standalone)
+                start = time.perf_counter()
+                convert(df)
+                build_s = time.perf_counter() - start
+                start = time.perf_counter()
+                sum(r.get(value) or 0 for r in records)
+                read_s = time.perf_counter() - start
+                results.append({
+                    'board': board, 'rows': n, 'shape': shape,
+                    'on_frame_b': on_frame / n, 'standalone_b': alone / n,
+                    'build_s': build_s, 'read_s': read_s,
+                })
+                del records
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+    # synthetic boards are messy on purpose; the cleaner's parse errors are expected
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'board':<12} {'rows':>8} {'shape':<6} {'on_frame':>10} {'standalone':>11} {'build':>9} {'read':>9}")
+    for r in run(args.rows):
+        print(f"{r['board']:<12} {r['rows']:>8} {r['shape']:<6} {r['on_frame_b']:>8.0f}B/row "
+              f"{r['standalone_b']:>7.0f}B/row {r['build_s'] * 1000:>7.1f}ms {r['read_s'] * 1000:>7.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Startup cost: import times of the entry points and time to first /health.
+
+    python -m bench.bench_startup [--repeat 3] [--top 8] [--out startup.jsonl]
+
+Each measurement runs in a fresh interpreter. Import times come from
+`python -X importtime` (cumulative microseconds per module, with the
+heaviest direct dependencies listed); time to first response starts uvicorn
+on app.main and polls GET /health until it answers. With --out, one JSON
+line per run is appended (timestamp, git revision, numbers) so startup can
+be tracked over time.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['app.main', 'app.llm', 'app.agent', 'app.snapshot']
+
+
+def _env(store_dir):
+    env = dict(os.environ, PYTHONPATH=ROOT, SNAPSHOT_STORE_DIR=store_dir)
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+def importtime(module, env):
+    """(total seconds, [(seconds, name), ...] for the direct imports of `module`)."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         capture_output=True, text=True, env=env, cwd=ROOT, check=True).stderr
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((depth, int(cumulative) / 1e6, name.strip()))
+    total = next(s for d, s, n in reversed(rows) if n == module)
+    # modules imported at depth <= 1 are the target and what it (or the
+    # interpreter) pulls in directly; deeper ones are counted in their parents
+    direct = sorted(((s, n) for d, s, n in rows if d <= 1 and n != module), reverse=True)
+    return total, direct
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def first_response(env, timeout=60):
+    """Seconds from launching uvicorn to the first 200 from /health."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port),
+                             '--log-level', 'warning'], env=env, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f'uvicorn exited with {proc.returncode}')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('no response from /health')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=ROOT, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(repeat=3, top=8):
+    with tempfile.TemporaryDirectory() as store_dir:
+        env = _env(store_dir)
+        imports = {}
+        for module in MODULES:
+            runs = [importtime(module, env) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r[0])
+            imports[module] = {'seconds': best[0], 'top': [[n, s] for s, n in best[1][:top]]}
+        health = min(first_response(env) for _ in range(repeat))
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _revision(),
+        'python': sys.version.split()[0],
+        'imports': imports,
+        'first_health_s': health,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='best of N fresh interpreters')
+    parser.add_argument('--top', type=int, default=8, help='direct imports to list per module')
+    parser.add_argument('--out', help='append the result as one JSON line to this file')
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.top)
+    for module, r in result['imports'].items():
+        print(f"import {module:<14} {r['seconds'] * 1000:>8.1f}ms")
+        for name, s in r['top']:
+            print(f"    {name:<40} {s * 1000:>8.1f}ms")
+    print(f"uvicorn app.main -> first /health {result['first_health_s'] * 1000:>8.1f}ms")
+    if args.out:
+        with open(args.out, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
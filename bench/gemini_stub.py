@@ -0,0 +1,115 @@
+"""Offline stand-in for the Gemini model used by app.llm and the agent.
+
+Answers the prompts the app sends without a network call or API key:
+
+- intent prompts: JSON from the rule matcher (app.intent_rules), or a plain
+  deals pipeline intent when it finds nothing;
+- LangChain ReAct prompts: follows `agent_plan` (one tool call per step)
+  and then gives a final answer;
+- anything else (summaries): a short canned answer.
+
+`latency` is waited before the first chunk and `chunk_delay` between chunks
+of a streamed answer, so benchmarks see model-shaped timings:
+
+    stub = GeminiStub(latency=0.3)
+    with stub.installed():
+        generate_summary('total pipeline', metrics)
+    stub.calls, stub.prompt_tokens
+"""
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from app.context_builder import estimate_tokens
+
+DEFAULT_AGENT_PLAN = (
+    ('compute_deals_metrics', '{}'),
+    ('group_by_sector', '{}'),
+    ('filter_deals', '{"min_amount": 1000000}'),
+)
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubResponse:
+    """Looks like a GenerateContentResponse: `.text`, and iterable (sync or
+    async) over chunks when streamed."""
+
+    def __init__(self, text, chunks=4, chunk_delay=0.0):
+        self.text = text
+        words = text.split(' ')
+        step = max(1, -(-len(words) // max(1, chunks)))
+        self._parts = [' '.join(words[i:i + step]) + (' ' if i + step < len(words) else '')
+                       for i in range(0, len(words), step)]
+        self.chunk_delay = chunk_delay
+
+    def __iter__(self):
+        for i, part in enumerate(self._parts):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield _Chunk(part)
+
+    async def __aiter__(self):
+        for i, part in enumerate(self._parts):
+            if i and self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield _Chunk(part)
+
+
+class GeminiStub:
+    def __init__(self, latency=0.0, chunk_delay=0.0, chunks=4, agent_plan=DEFAULT_AGENT_PLAN):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+        self.agent_plan = agent_plan
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+        if 'You are an intent parser' in prompt:
+            from app.intent_rules import match_intent
+
+            question = prompt.rsplit('Question:', 1)[-1].strip()
+            intent, _ = match_intent(question)
+            return json.dumps(intent or {"board": "deals", "metric": "pipeline_value",
+                                         "sector": None, "timeframe": None})
+        if 'Action Input' in prompt:
+            # steps taken so far = observations in the scratchpad; the format
+            # instructions of the ReAct template show one more
+            step = prompt.count('Observation:') - prompt.count('Observation: the result of the action')
+            if step < len(self.agent_plan):
+                tool, tool_input = self.agent_plan[step]
+                return f"Thought: I need {tool}.\nAction: {tool}\nAction Input: {tool_input}"
+            return "Thought: I now know the final answer.\nFinal Answer: Infrastructure leads the pipeline."
+        return "The pipeline is led by infrastructure, with steady revenue from active work orders."
+
+    def generate_content(self, prompt, stream=False):
+        if self.latency:
+            time.sleep(self.latency)
+        return StubResponse(self._answer(prompt), self.chunks, self.chunk_delay)
+
+    async def generate_content_async(self, prompt, stream=False):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return StubResponse(self._answer(prompt), self.chunks, self.chunk_delay)
+
+    @contextmanager
+    def installed(self):
+        """Use this stub as app.llm's model (and so the agent's) within the block."""
+        import app.llm as llm
+
+        previous = llm.model
+        llm.model = self
+        try:
+            yield self
+        finally:
+            llm.model = previous
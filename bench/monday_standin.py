@@ -0,0 +1,321 @@
+"""Local stand-in for the monday.com GraphQL endpoint.
+
+Serves synthetic boards (bench.synthetic) over HTTP with just enough of the
+API to drive app.monday_client: `items_page` / `next_items_page` cursors,
+the `__last_updated__` filter used by delta syncs, column metadata,
+`activity_logs` (item removals), the `complexity` block and gzip. Every item
+was last updated on BASE_UPDATED_AT until `touch` marks it updated now;
+`remove` takes items off the board and logs their deletion. Faults can be
+queued to exercise the transport's retries and typed errors:
+
+    with StandIn({'111': ('deals', 5000)}) as server:
+        server.inject('rate_limit', retry_after=1)
+        set_transport(MondayTransport(url=server.url, token='x'))
+        ...
+
+or run it standalone and point the app at it with MONDAY_API_URL:
+
+    python -m bench.monday_standin --rows 20000 --port 8765
+"""
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench.synthetic import make_columns, SyntheticBoard
+
+BUDGET_PER_MINUTE = 10_000_000
+BASE_UPDATED_AT = '2024-01-01T00:00:00Z'
+
+_BOARD_IDS = re.compile(r'boards\s*\(\s*ids:\s*\[?\s*"?(\d+)')
+_LIMIT = re.compile(r'limit:\s*(\d+)')
+_CURSOR = re.compile(r'cursor:\s*"([^"]+)"')
+_COLUMN_IDS = re.compile(r'column_values\s*\(\s*ids:\s*\[([^\]]*)\]')
+_UPDATED_AFTER = re.compile(r'__last_updated__".*?compare_value:\s*\["EXACT",\s*"(\d{4}-\d{2}-\d{2})"\]')
+_LOGS_FROM = re.compile(r'activity_logs\s*\(\s*from:\s*"([^"]+)"')
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _project(item, query, updated_at=BASE_UPDATED_AT):
+    """Return only the item fields the query asks for."""
+    if 'column_values' not in query:
+        out = {'id': item['id']}
+        if re.search(r'\bname\b', query):
+            out['name'] = item['name']
+        return out
+    item = dict(item, updated_at=updated_at)
+    m = _COLUMN_IDS.search(query)
+    if m:
+        wanted = {c.strip().strip('"') for c in m.group(1).split(',')}
+        item['column_values'] = [cv for cv in item['column_values'] if cv['id'] in wanted]
+    return item
+
+
+class StandIn:
+    def __init__(self, boards, port=0, token=None, latency=0.0, budget=BUDGET_PER_MINUTE):
+        """`boards` maps board id -> (kind, rows) or (kind, columns, items).
+
+        With (kind, rows) items are generated as pages are served
+        (SyntheticBoard), so large boards cost no memory up front."""
+        self.boards = {}
+        for board_id, spec in boards.items():
+            if len(spec) == 2:
+                kind, rows = spec
+                spec = (make_columns(kind), SyntheticBoard(kind, rows))
+            else:
+                spec = spec[1:]
+            self.boards[str(board_id)] = spec
+        self.token = token
+        self.latency = latency
+        self.budget_limit = budget
+        self.budget = budget
+        self.budget_reset_at = time.monotonic() + 60
+        self.faults = []
+        # board id -> {item index: updated_at} for touched items
+        self.updated = {board_id: {} for board_id in self.boards}
+        # board id -> {item index: removed at}
+        self.removed = {board_id: {} for board_id in self.boards}
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v2'
+
+    def inject(self, kind, times=1, retry_after=1):
+        """Queue a fault for the next request(s): 'rate_limit' (HTTP 429),
+        'complexity' (budget exhausted), 'server' (500), 'auth' (401),
+        'query' (GraphQL error) or 'slow' (sleeps past a short read timeout)."""
+        with self._lock:
+            self.faults.extend([(kind, retry_after)] * times)
+
+    def touch(self, board_id, indexes):
+        """Mark the items at `indexes` as updated now (a delta sync fetches them)."""
+        now = _now()
+        with self._lock:
+            for i in indexes:
+                self.updated[str(board_id)][i] = now
+
+    def remove(self, board_id, indexes):
+        """Take the items at `indexes` off the board and log their deletion."""
+        now = _now()
+        with self._lock:
+            for i in indexes:
+                self.removed[str(board_id)][i] = now
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- GraphQL -----------------------------------------------------------------
+
+    def _charge(self, cost):
+        """Spend complexity budget; return ((before, after) or None if exhausted, reset_in)."""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self.budget_reset_at:
+                self.budget = self.budget_limit
+                self.budget_reset_at = now + 60
+            reset_in = max(0, int(self.budget_reset_at - now))
+            if cost > self.budget:
+                return None, reset_in
+            before = self.budget
+            self.budget -= cost
+            return (before, self.budget), reset_in
+
+    def _indexes(self, board_id, updated_after):
+        """Item indexes served for a query: live items, and with
+        `updated_after` (a YYYY-MM-DD day) only those updated after that day."""
+        _, items = self.boards[board_id]
+        with self._lock:
+            updated = dict(self.updated[board_id])
+            removed = set(self.removed[board_id])
+        if updated_after is not None and updated_after >= BASE_UPDATED_AT[:10]:
+            indexes = sorted(i for i, at in updated.items() if at[:10] > updated_after)
+        elif removed:
+            indexes = range(len(items))
+        else:
+            return None  # every item, in order
+        return [i for i in indexes if i not in removed]
+
+    def _items_page(self, board_id, offset, limit, query, updated_after=None):
+        _, items = self.boards[board_id]
+        indexes = self._indexes(board_id, updated_after)
+        if indexes is None:
+            chosen = list(range(offset, min(offset + limit, len(items))))
+            total = len(items)
+        else:
+            chosen = indexes[offset:offset + limit]
+            total = len(indexes)
+        end = offset + len(chosen)
+        updated = self.updated[board_id]
+        cursor = f'{board_id}:{end}:{updated_after or ""}' if end < total else None
+        page = items[offset:end] if indexes is None else [items[i] for i in chosen]
+        return {'cursor': cursor,
+                'items': [_project(it, query, updated.get(i, BASE_UPDATED_AT)) for i, it in zip(chosen, page)]}
+
+    def _activity_logs(self, board_id, query):
+        m = _LOGS_FROM.search(query)
+        since = m.group(1) if m else ''
+        _, items = self.boards[board_id]
+        with self._lock:
+            removed = sorted(self.removed[board_id].items())
+        return [{'event': 'delete_pulse', 'data': json.dumps({'pulse_id': items[i]['id']})}
+                for i, at in removed if at >= since]
+
+    def resolve(self, query):
+        """Return (status, body) for a GraphQL query string."""
+        limit = int((_LIMIT.search(query) or [0, 25])[1])
+        cost = 1000 + (limit * 10 if 'items' in query else 0)
+        spent, reset_in = self._charge(cost)
+        if spent is None:
+            return 200, {'errors': [{
+                'message': f'Complexity budget exhausted, budget resets in {reset_in} seconds',
+                'extensions': {'code': 'COMPLEXITY_BUDGET_EXHAUSTED', 'retry_in_seconds': reset_in},
+            }]}
+        data = {}
+        if 'complexity {' in query:
+            data['complexity'] = {'before': spent[0], 'after': spent[1], 'query': cost,
+                                  'reset_in_x_seconds': reset_in}
+
+        if 'next_items_page' in query:
+            board_id, offset, updated_after = _CURSOR.search(query).group(1).split(':')
+            data['next_items_page'] = self._items_page(board_id, int(offset), limit, query,
+                                                       updated_after or None)
+            return 200, {'data': data}
+
+        m = _BOARD_IDS.search(query)
+        board_id = m.group(1) if m else None
+        if board_id not in self.boards:
+            data['boards'] = []
+            return 200, {'data': data}
+        columns, items = self.boards[board_id]
+        board = {}
+        if 'items_page' in query:
+            m = _UPDATED_AFTER.search(query)
+            board['items_page'] = self._items_page(board_id, 0, limit, query, m.group(1) if m else None)
+        if re.search(r'\bcolumns\s*\{', query):
+            board['columns'] = columns
+        if 'activity_logs' in query:
+            board['activity_logs'] = self._activity_logs(board_id, query)
+        data['boards'] = [board]
+        return 200, {'data': data}
+
+    def _fault(self):
+        with self._lock:
+            return self.faults.pop(0) if self.faults else None
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                raw = json.dumps(body).encode('utf-8')
+                if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                    raw = gzip.compress(raw, compresslevel=5)
+                    headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(raw)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                try:
+                    self.wfile.write(raw)
+                except (BrokenPipeError, ConnectionResetError):
+                    # client gave up (e.g. read timeout)
+                    return
+                with standin._lock:
+                    standin.bytes_sent += len(raw)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with standin._lock:
+                    standin.requests += 1
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if standin.token and self.headers.get('Authorization') != standin.token:
+                    return self._send(401, {'errors': [{'message': 'Not Authenticated'}]})
+
+                fault = standin._fault()
+                if fault is not None:
+                    kind, retry_after = fault
+                    if kind == 'rate_limit':
+                        return self._send(429, {'error_message': 'Rate Limit Exceeded'},
+                                          {'Retry-After': str(retry_after)})
+                    if kind == 'complexity':
+                        return self._send(200, {'errors': [{
+                            'message': f'Complexity budget exhausted, budget resets in {retry_after} seconds',
+                            'extensions': {'code': 'COMPLEXITY_BUDGET_EXHAUSTED', 'retry_in_seconds': retry_after},
+                        }]})
+                    if kind == 'server':
+                        return self._send(500, {'error_message': 'Internal server error'})
+                    if kind == 'auth':
+                        return self._send(401, {'errors': [{'message': 'Not Authenticated'}]})
+                    if kind == 'query':
+                        return self._send(200, {'errors': [{
+                            'message': 'Field does not exist',
+                            'extensions': {'code': 'GRAPHQL_VALIDATION_FAILED'},
+                        }]})
+                    if kind == 'slow':
+                        time.sleep(retry_after)
+
+                status, body = standin.resolve(payload.get('query') or '')
+                self._send(status, body)
+
+        return Handler
+
+
+def main():
+    from app.config import DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    args = parser.parse_args()
+
+    boards = {
+        DEALS_BOARD_ID or '1001': ('deals', args.rows),
+        WORK_ORDERS_BOARD_ID or '1002': ('work_orders', args.rows),
+    }
+    server = StandIn(boards, port=args.port, latency=args.latency)
+    print(f'monday.com stand-in on {server.url} (boards: {", ".join(boards)})')
+    print(f'  MONDAY_API_URL={server.url}')
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""End-to-end benchmark: fetch -> clean -> metrics -> answer on synthetic boards.
+
+    python -m bench.suite [--rows 10000 100000] [--extra-columns 0] [--repeat 3]
+                          [--latency 0] [--model-latency 0]
+                          [--out results.json] [--compare base.json --threshold 0.2]
+
+No monday.com account or Gemini key is needed: boards are generated by
+bench.synthetic (up to ~1M rows), served over HTTP by bench.monday_standin
+and fetched through the real transport; the model is bench.gemini_stub.
+For each row count it times
+
+    fetch_deals, fetch_work_orders      all pages over HTTP
+    clean_deals, clean_work_orders      raw items -> cleaned records
+    compute_deals_metrics, compute_work_orders_metrics, get_leadership_summary
+    delta_refresh                       refresh of a loaded deals snapshot after 1% of
+                                        its items changed (delta fetch + re-clean)
+    answer                              intent -> metrics -> summary, per question
+    agent_tools                         the agent's tool chain in one agent run
+    run_agent                           the LangChain agent (when it can be built)
+
+and reports the best of --repeat runs, rows per second and peak Python
+memory (tracemalloc, measured in a separate untimed run). --out writes the
+results as JSON with the git revision; --compare prints the ratio against
+an earlier file and exits with status 1 when a case got slower than
+--threshold.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "total pipeline",
+    "pipeline for energy",
+    "how many deals this quarter",
+    "total revenue from work orders",
+    "which sectors are growing fastest",
+]
+AGENT_QUESTION = "Which sector has the largest pipeline, and how many of its deals are above 1M?"
+
+
+def _configure(store_dir):
+    """Point the app at the stand-in before app.config is imported."""
+    os.environ.setdefault('DEALS_BOARD_ID', '9001')
+    os.environ.setdefault('WORK_ORDERS_BOARD_ID', '9002')
+    os.environ['SNAPSHOT_STORE_DIR'] = store_dir
+    os.environ['INTENT_CACHE_PATH'] = ''
+    os.environ['RESPONSE_CACHE_PATH'] = ''
+
+
+def timed(fn, repeat):
+    """(best seconds, last result) over `repeat` runs."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    """Peak traced Python allocation (bytes) while running `fn` once."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def case(name, rows, fn, repeat, units=None, memory=True, **extra):
+    seconds, result = timed(fn, repeat)
+    units = rows if units is None else units
+    return {
+        'name': name,
+        'rows': rows,
+        'status': 'ok',
+        'seconds': seconds,
+        'per_s': units / seconds if seconds else None,
+        'peak_mb': peak_memory(fn) / 1e6 if memory else None,
+        **extra,
+    }, result
+
+
+def run_rows(rows, extra_columns=0, repeat=3, latency=0.0, model_latency=0.0):
+    from app.config import DEALS_BOARD_ID, WORK_ORDERS_BOARD_ID
+    from app.transport import MondayTransport, set_transport
+    from app.monday_client import fetch_deals, fetch_work_orders
+    from app.cleaner import clean_deals, clean_work_orders, clean_deals_frame, clean_work_orders_frame
+    from app.metrics import compute_deals_metrics, compute_work_orders_metrics, get_leadership_summary
+    from app.snapshot import invalidate, get_snapshots_async, load_snapshot, DEALS, WORK_ORDERS
+    from app.sync import get_board_sync
+    from app import agent, batch, llm
+    from bench.gemini_stub import GeminiStub
+    from bench.monday_standin import StandIn
+    from bench.synthetic import make_columns, SyntheticBoard
+
+    deals_columns = make_columns('deals', extra_columns)
+    wo_columns = make_columns('work_orders', extra_columns)
+    standin = StandIn({
+        DEALS_BOARD_ID: ('deals', deals_columns, SyntheticBoard('deals', rows, extra_columns)),
+        WORK_ORDERS_BOARD_ID: ('work_orders', wo_columns, SyntheticBoard('work_orders', rows, extra_columns, seed=1)),
+    }, latency=latency, budget=float('inf')).start()
+    set_transport(MondayTransport(url=standin.url, token='bench'))
+    stub = GeminiStub(latency=model_latency)
+    results = []
+    try:
+        with stub.installed():
+            sent = standin.bytes_sent
+            r, deals_items = case('fetch_deals', rows, fetch_deals, repeat, memory=False)
+            r['mb_per_fetch'] = (standin.bytes_sent - sent) / repeat / 1e6
+            results.append(r)
+            r, wo_items = case('fetch_work_orders', rows, fetch_work_orders, repeat, memory=False)
+            results.append(r)
+
+            results.append(case('clean_deals', rows, lambda: clean_deals(deals_items, deals_columns), repeat)[0])
+            results.append(case('clean_work_orders', rows, lambda: clean_work_orders(wo_items, wo_columns), repeat)[0])
+
+            deals_df = clean_deals_frame(deals_items, deals_columns)
+            wo_df = clean_work_orders_frame(wo_items, wo_columns)
+            results.append(case('compute_deals_metrics', rows, lambda: compute_deals_metrics(deals_df), repeat)[0])
+            results.append(case('compute_work_orders_metrics', rows,
+                                lambda: compute_work_orders_metrics(wo_df), repeat)[0])
+            results.append(case('get_leadership_summary', rows,
+                                lambda: get_leadership_summary(deals_df, wo_df), repeat)[0])
+
+            # answers and agent runs go through the snapshot cache, loaded once here
+            invalidate()
+            # the syncs are process-wide: start from a full download of this board size
+            get_board_sync(DEALS_BOARD_ID).reset()
+            get_board_sync(WORK_ORDERS_BOARD_ID).reset()
+            deals, wo = asyncio.run(get_snapshots_async(DEALS, WORK_ORDERS))
+
+            touched = range(0, rows, 100)
+
+            def delta_refresh():
+                standin.touch(DEALS_BOARD_ID, touched)
+                return load_snapshot(DEALS, prev=deals)
+
+            sent = standin.bytes_sent
+            results.append(case('delta_refresh', rows, delta_refresh, repeat, units=len(touched),
+                                memory=False, touched=len(touched))[0])
+            results[-1]['mb_per_refresh'] = (standin.bytes_sent - sent) / repeat / 1e6
+
+            def answer_all():
+                llm.intent_cache.clear()
+                llm.response_cache.clear()
+                for q in QUESTIONS:
+                    intent = llm.parse_intent(q)
+                    if 'error' not in intent:
+                        llm.generate_summary(q, batch.metrics_for_intent(intent, deals, wo))
+
+            calls = stub.calls
+            r, _ = case('answer', rows, answer_all, repeat, units=len(QUESTIONS))
+            r['model_calls_per_run'] = (stub.calls - calls) / (repeat + 1)
+            results.append(r)
+
+            tools = {getattr(t, 'name', None) or t.__name__[2:]: getattr(t, 'func', t) for t in agent._make_tools()}
+
+            def agent_tools():
+                with agent.agent_run():
+                    tools['compute_deals_metrics']()
+                    tools['group_by_sector']()
+                    tools['filter_deals'](min_amount=1_000_000)
+                    tools['compute_deals_metrics']()
+
+            results.append(case('agent_tools', rows, agent_tools, repeat, units=1)[0])
+
+            answer = agent.run_agent(AGENT_QUESTION)
+            if answer.startswith('[agent error]'):
+                results.append({'name': 'run_agent', 'rows': rows, 'status': 'unavailable', 'detail': answer})
+            else:
+                results.append(case('run_agent', rows, lambda: agent.run_agent(AGENT_QUESTION), repeat, units=1)[0])
+    finally:
+        standin.stop()
+    return results
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=ROOT, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(rows=(10_000,), extra_columns=0, repeat=3, latency=0.0, model_latency=0.0):
+    with tempfile.TemporaryDirectory() as store_dir:
+        _configure(store_dir)
+        results = []
+        for n in rows:
+            results.extend(run_rows(n, extra_columns, repeat, latency, model_latency))
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': _revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'rows': list(rows),
+            'extra_columns': extra_columns,
+            'repeat': repeat,
+            'latency': latency,
+            'model_latency': model_latency,
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=0.2):
+    """Print new vs old timings; return the cases slower by more than `threshold`."""
+    before = {(r['name'], r['rows']): r for r in old['results'] if r.get('status') == 'ok'}
+    slower = []
+    print(f"\nvs {old['meta'].get('revision')} ({old['meta'].get('timestamp')})")
+    print(f"{'case':<30} {'rows':>9} {'before':>10} {'after':>10} {'ratio':>7}")
+    for r in new['results']:
+        b = before.get((r['name'], r['rows']))
+        if b is None or r.get('status') != 'ok':
+            continue
+        ratio = r['seconds'] / b['seconds'] if b['seconds'] else float('inf')
+        flag = ' SLOWER' if ratio > 1 + threshold else ''
+        if flag:
+            slower.append(r['name'])
+        print(f"{r['name']:<30} {r['rows']:>9} {b['seconds'] * 1000:>8.1f}ms {r['seconds'] * 1000:>8.1f}ms "
+              f"{ratio:>6.2f}x{flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--extra-columns', type=int, default=0, help='unmapped long-text columns per item')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every stand-in response')
+    parser.add_argument('--model-latency', type=float, default=0.0, help='seconds per stubbed model call')
+    parser.add_argument('--out', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier --out file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown that counts as a regression')
+    args = parser.parse_args()
+    # synthetic boards are messy on purpose; the cleaner's parse errors are expected
+    logging.disable(logging.CRITICAL)
+
+    result = run(args.rows, args.extra_columns, args.repeat, args.latency, args.model_latency)
+    print(f"{'case':<30} {'rows':>9} {'time':>10} {'per s':>12} {'peak':>9}")
+    for r in result['results']:
+        if r['status'] != 'ok':
+            print(f"{r['name']:<30} {r['rows']:>9} {r['status']}")
+            continue
+        peak = f"{r['peak_mb']:.1f}MB" if r['peak_mb'] is not None else '-'
+        print(f"{r['name']:<30} {r['rows']:>9} {r['seconds'] * 1000:>8.1f}ms {r['per_s']:>12,.0f} {peak:>9}")
+    print(f"max RSS {result['meta']['max_rss_mb']:.0f}MB")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(json.load(f), result, args.threshold)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Synthetic monday.com boards shaped like the real deals / work orders boards.
+
+Items look like `items_page` payloads (id, name, column_values with id,
+text, type, value) so they exercise the same cleaning code as live data.
+`messy` is the share of amount / date cells that are not plain numbers or
+ISO dates (currency strings like "$1,200", other date formats, blanks and
+junk).
+
+`make_items` builds a list; `SyntheticBoard` is a sequence that generates
+items on access, for boards too large to hold in memory (up to ~1M rows
+served through bench.monday_standin).
+"""
+import json
+import random
+from datetime import date, timedelta
+
+SECTORS = ['Energy', 'Mining', 'Renewables', 'Infrastructure', 'Agriculture', 'Technology', ' powerline ', '']
+STAGES = ['Lead', 'Qualified', 'Proposal', 'Negotiation', 'Won', 'Lost', '']
+STATUSES = ['Active', 'In Progress', 'Completed', 'On Hold', 'Cancelled', '']
+
+DEALS_COLUMNS = [
+    {'id': 'name', 'title': 'Name', 'type': 'name'},
+    {'id': 'numeric_amount', 'title': 'Deal Amount', 'type': 'numbers'},
+    {'id': 'dropdown_sector', 'title': 'Sector', 'type': 'dropdown'},
+    {'id': 'date_close', 'title': 'Expected Close', 'type': 'date'},
+    {'id': 'status_stage', 'title': 'Deal Stage', 'type': 'status'},
+]
+
+WORK_ORDERS_COLUMNS = [
+    {'id': 'name', 'title': 'Name', 'type': 'name'},
+    {'id': 'numeric_revenue', 'title': 'Revenue', 'type': 'numbers'},
+    {'id': 'status_wo', 'title': 'Status', 'type': 'status'},
+    {'id': 'date_start', 'title': 'Start Date', 'type': 'date'},
+    {'id': 'date_end', 'title': 'End Date', 'type': 'date'},
+]
+
+
+def _money(rng, messy=0.45):
+    """Mostly clean numbers, some currency-formatted, some junk or empty."""
+    v = rng.uniform(1_000, 2_000_000)
+    roll = rng.random()
+    if roll >= messy:
+        return f"{v:.2f}"
+    roll /= messy
+    if roll < 0.55:
+        return f"${v:,.0f}"
+    if roll < 0.65:
+        return f"{v:,.2f}"
+    if roll < 0.78:
+        return ''
+    return rng.choice(['n/a', 'TBD', None])
+
+
+def _date(rng, base=date(2024, 1, 1), messy=0.2):
+    """Mostly ISO dates, some with a time part, a few odd formats or blanks."""
+    d = base + timedelta(days=rng.randint(0, 900))
+    roll = rng.random()
+    if roll >= messy:
+        return d.isoformat()
+    roll /= messy
+    if roll < 0.5:
+        return f"{d.isoformat()} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+    if roll < 0.6:
+        return d.strftime('%m/%d/%Y')
+    if roll < 0.7:
+        return d.strftime('%d %b %Y')
+    return rng.choice(['', None])
+
+
+def _filler_columns(width):
+    return [{'id': f'text_{i}', 'title': f'Notes {i}', 'type': 'long_text'} for i in range(width)]
+
+
+def _cv(cid, text, ctype, raw_value=True):
+    value = json.dumps({'text': text, 'changed_at': '2024-05-01T10:00:00Z'}) if (raw_value and text) else None
+    return {'id': cid, 'text': text, 'type': ctype, 'value': value}
+
+
+def make_columns(board, extra_columns=0):
+    base = DEALS_COLUMNS if board == 'deals' else WORK_ORDERS_COLUMNS
+    return [dict(c) for c in base] + _filler_columns(extra_columns)
+
+
+def _make_item(board, i, rng, filler, messy):
+    if board == 'deals':
+        cvs = [
+            _cv('numeric_amount', _money(rng, messy), 'numbers'),
+            _cv('dropdown_sector', rng.choice(SECTORS), 'dropdown'),
+            _cv('date_close', _date(rng, messy=messy / 2), 'date'),
+            _cv('status_stage', rng.choice(STAGES), 'status'),
+        ]
+        name = f'Deal {i}'
+    else:
+        cvs = [
+            _cv('numeric_revenue', _money(rng, messy), 'numbers'),
+            _cv('status_wo', rng.choice(STATUSES), 'status'),
+            _cv('date_start', _date(rng, messy=messy / 2), 'date'),
+            _cv('date_end', _date(rng, messy=messy / 2), 'date'),
+        ]
+        name = f'Work Order {i}'
+    for c in filler:
+        cvs.append(_cv(c['id'], f'note {rng.randint(0, 10**6)} ' * 8, 'long_text'))
+    return {
+        'id': str(10_000_000 + i),
+        'name': name,
+        'group': {'id': 'topics', 'title': 'Group Title'},
+        'column_values': cvs,
+    }
+
+
+def make_items(board, n, extra_columns=0, seed=0, messy=0.45):
+    """Return `n` synthetic raw items for `board` ('deals' or 'work_orders')."""
+    rng = random.Random(seed)
+    filler = _filler_columns(extra_columns)
+    return [_make_item(board, i, rng, filler, messy) for i in range(n)]
+
+
+class SyntheticBoard:
+    """Read-only sequence of `n` synthetic items, each generated when accessed.
+
+    Item `i` is always the same for a given seed, so pages served twice (or
+    by two processes) agree. Supports len(), indexing, slicing and iteration.
+    """
+
+    def __init__(self, board, n, extra_columns=0, seed=0, messy=0.45):
+        self.board = board
+        self.n = n
+        self.seed = seed
+        self.messy = messy
+        self.filler = _filler_columns(extra_columns)
+
+    def __len__(self):
+        return self.n
+
+    def _item(self, i):
+        return _make_item(self.board, i, random.Random(self.seed * 1_000_003 + i), self.filler, self.messy)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(self.n))]
+        if index < 0:
+            index += self.n
+        if not 0 <= index < self.n:
+            raise IndexError(index)
+        return self._item(index)
+
+    def __iter__(self):
+        return (self._item(i) for i in range(self.n))
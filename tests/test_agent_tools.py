@@ -0,0 +1,41 @@
+"""Agent row tools must survive whatever action input the ReAct agent sends."""
+import json
+
+import pytest
+
+from app import agent
+from app.cleaner import clean_deals_frame, clean_work_orders_frame
+from app.snapshot import DEALS, WORK_ORDERS, BoardSnapshot
+from bench.synthetic import make_columns, make_items
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    snaps = {}
+    for board, cleaner in ((DEALS, clean_deals_frame), (WORK_ORDERS, clean_work_orders_frame)):
+        items, columns = make_items(board, 60, seed=1), make_columns(board)
+        snaps[board] = BoardSnapshot(board, items, columns, cleaner(items, columns))
+    monkeypatch.setattr(agent, 'get_snapshot', snaps.__getitem__)
+    # plain callables instead of LangChain Tool objects
+    monkeypatch.setattr(agent, '_langchain', lambda: (None, None, None, None, None))
+    return {fn.__name__[2:]: fn for fn in agent._make_tools()}
+
+
+@pytest.mark.parametrize('name', ['fetch_deals', 'fetch_work_orders', 'fetch_deals_df'])
+@pytest.mark.parametrize('action_input', ['energy', '{"limit": 5}', 'limit=5', '', '3.0'])
+def test_row_tools_accept_non_numeric_input(tools, name, action_input):
+    result = tools[name](action_input)
+    assert result['offset'] == 0
+    assert 0 < result['returned'] <= agent.AGENT_PAGE_SIZE
+    json.dumps(result, default=str)
+
+
+def test_get_context_accepts_non_numeric_input(tools):
+    assert isinstance(tools['get_context']('energy'), str)
+
+
+def test_int_arg():
+    assert agent._int_arg('7', 1) == 7
+    assert agent._int_arg('7.0', 1) == 7
+    assert agent._int_arg('energy', 1) == 1
+    assert agent._int_arg(None, 1) == 1
@@ -0,0 +1,41 @@
+"""TTLCache persistence: debounced, ordered writes of the latest entries."""
+import json
+import threading
+
+from app.cache import TTLCache
+
+
+def test_changes_are_written_on_flush(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = TTLCache(16, 3600, path=str(path), flush_interval=60)
+    for i in range(10):
+        cache.set(f'q{i}', i)
+    # debounced: nothing written until the flush
+    assert not path.exists()
+    cache.flush()
+    assert TTLCache(16, 3600, path=str(path)).peek('q9') == 9
+
+
+def test_concurrent_setters_leave_latest_state_on_disk(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = TTLCache(1000, 3600, path=str(path), flush_interval=0)
+
+    def setter(n):
+        for i in range(50):
+            cache.set(f'{n}-{i}', i)
+    threads = [threading.Thread(target=setter, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with open(path) as f:
+        entries = json.load(f)['entries']
+    assert len(entries) == 200
+
+
+def test_clear_is_persisted(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = TTLCache(16, 3600, path=str(path), flush_interval=0)
+    cache.set('a', 1)
+    cache.clear()
+    assert TTLCache(16, 3600, path=str(path)).peek('a') is None
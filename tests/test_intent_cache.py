@@ -0,0 +1,35 @@
+"""Slotted intent cache: only known sector names fill the sector slot."""
+import pytest
+
+from app import llm
+from app.cache import TTLCache
+
+SECTORS = ('energy', 'mining', 'renewables')
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(llm, 'intent_cache', TTLCache(64, 3600))
+
+
+def test_known_sector_fills_slot():
+    llm.cache_intent('pipeline for energy', {'board': 'deals', 'metric': 'pipeline_value',
+                                             'sector': 'energy', 'timeframe': None})
+    intent = llm.cached_intent('pipeline for mining', sectors=SECTORS)
+    assert intent['metric'] == 'pipeline_value'
+    assert intent['sector'] == 'mining'
+
+
+@pytest.mark.parametrize('question', ['pipeline breakdown', 'pipeline forecast accuracy', 'pipeline for nuclear'])
+def test_unknown_words_miss(question):
+    llm.cache_intent('pipeline for energy', {'board': 'deals', 'metric': 'pipeline_value',
+                                             'sector': 'energy', 'timeframe': None})
+    assert llm.cached_intent(question, sectors=SECTORS) is None
+
+
+def test_no_vocabulary_only_exact_hits():
+    intent = {'board': 'deals', 'metric': 'deal_count', 'sector': None, 'timeframe': None}
+    llm.cache_intent('how many deals', intent)
+    assert llm.cached_intent('how many deals', sectors=()) == intent
+    llm.cache_intent('pipeline for energy', dict(intent, metric='pipeline_value', sector='energy'))
+    assert llm.cached_intent('pipeline for mining', sectors=()) is None
@@ -0,0 +1,22 @@
+"""Answer cache keys only fold case, whitespace and trailing punctuation."""
+from app import llm
+
+METRICS = {'deal_count': 12, 'pipeline_value': 3400.0}
+
+
+def test_different_questions_do_not_share_a_key():
+    questions = ['how many deals are there', 'show me the deals', 'which sector leads',
+                 'deals by sector', 'deals']
+    keys = {llm.response_key('summary', q, METRICS) for q in questions}
+    assert len(keys) == len(questions)
+
+
+def test_trivial_variants_share_a_key():
+    a = llm.response_key('summary', 'How many deals are there?', METRICS)
+    b = llm.response_key('summary', '  how many   deals are there ', METRICS)
+    assert a == b
+
+
+def test_key_depends_on_metrics():
+    assert (llm.response_key('summary', 'deals', METRICS)
+            != llm.response_key('summary', 'deals', dict(METRICS, deal_count=13)))
@@ -0,0 +1,54 @@
+"""A model stream that fails part-way is marked, recorded and not cached."""
+import asyncio
+
+import pytest
+
+from app import llm, tracing
+from app.cache import TTLCache
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+def _chunks_then_error():
+    yield Chunk("Pipeline is")
+    raise RuntimeError("connection reset")
+
+
+class FailingModel:
+    def generate_content(self, prompt, stream=False):
+        return _chunks_then_error()
+
+    async def generate_content_async(self, prompt, stream=False):
+        async def chunks():
+            for chunk in _chunks_then_error():
+                yield chunk
+        return chunks()
+
+
+@pytest.fixture(autouse=True)
+def failing_model(monkeypatch):
+    cache = TTLCache(16, 3600)
+    monkeypatch.setattr(llm, 'response_cache', cache)
+    monkeypatch.setattr(llm, 'cached_response', cache.get)
+    monkeypatch.setattr(llm, 'get_model', lambda: FailingModel())
+    tracing.reset()
+    return cache
+
+
+def test_interrupted_stream_is_marked_and_not_cached(failing_model):
+    stream = llm.stream_summary('total pipeline', {'pipeline_value': 1.0})
+    chunks = list(stream)
+    assert chunks == ["Pipeline is", llm.INTERRUPTED_MARKER]
+    assert len(failing_model) == 0
+    assert tracing.stage_errors.snapshot() == {('llm.generate_summary',): 1}
+
+
+def test_interrupted_async_stream_is_marked_and_not_cached(failing_model):
+    async def collect():
+        return [c async for c in llm.stream_summary_async('total pipeline', {'pipeline_value': 1.0})]
+    chunks = asyncio.run(collect())
+    assert chunks == ["Pipeline is", llm.INTERRUPTED_MARKER]
+    assert len(failing_model) == 0
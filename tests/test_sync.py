@@ -0,0 +1,37 @@
+"""BoardSync resuming from a generation published elsewhere (app.shared)."""
+from datetime import datetime, timezone
+
+from app import sync as sync_module
+from app.sync import BoardSync
+
+WATERMARK = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def test_restore_is_ignored_once_synced():
+    sync = BoardSync('1')
+    sync.restore(['a', 'b'], WATERMARK)
+    sync.restore(['a', 'b', 'c'], WATERMARK)
+    assert set(sync.items) == {'a', 'b'}
+
+
+def test_forced_restore_replaces_held_items():
+    sync = BoardSync('1')
+    sync.items = {'a': {'id': 'a', 'column_values': [{'id': 'x', 'text': '1'}]}}
+    sync.watermark = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    sync.restore(['a', 'b'], WATERMARK, force=True)
+    assert sync.items == {'a': {'id': 'a'}, 'b': {'id': 'b'}}
+    assert sync.watermark == WATERMARK
+    assert sync.partial
+
+
+def test_deletion_after_forced_restore_is_reported(monkeypatch):
+    # 'b' was created and deleted by another process's generations; after
+    # resuming from the newest one its deletion must still be seen
+    monkeypatch.setattr(sync_module, 'iter_board_items', lambda *a, **kw: iter(()))
+    monkeypatch.setattr(sync_module, 'fetch_removed_item_ids', lambda board_id, since: {'b'})
+    sync = BoardSync('1')
+    sync.restore(['a'], WATERMARK)
+    sync.restore(['a', 'b'], WATERMARK, force=True)
+    stats = sync.refresh()
+    assert stats['removed_ids'] == {'b'}
+    assert set(sync.items) == {'a'}